@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Adaptive Timeouts
+Per-step WebDriverWait timeouts derived from the latency this run has observed
+(p99 of the step's successful spans times a safety factor, clamped), so a missing
+element fails in a few seconds once the portal's normal pace is known, instead
+of always waiting the fixed worst case
+"""
+
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Used until a step has enough samples (the old fixed wait)
+DEFAULT_TIMEOUT = 20
+
+# Bounds for learned timeouts; a slow portal never waits longer than before
+MIN_TIMEOUT = 2
+MAX_TIMEOUT = 20
+
+# Learned timeout = p99 of the step's successful spans times this
+P99_FACTOR = 3
+
+# Successful spans of a step needed before its timeout is learned
+MIN_SAMPLES = 20
+
+# Sorting the samples is not free, so a learned timeout is refreshed every few spans
+REFRESH_EVERY = 10
+
+
+class AdaptiveTimeouts:
+    """
+    One per browser session. Timeouts come from the run's shared StepMetrics, so
+    pool workers learn from each other. A step that times out gets twice its
+    timeout next time (up to max_timeout) until it succeeds again, so a portal
+    that really did slow down is not starved by the timeouts it taught.
+    """
+
+    def __init__(self, metrics, default=DEFAULT_TIMEOUT, min_timeout=MIN_TIMEOUT,
+                 max_timeout=MAX_TIMEOUT, factor=P99_FACTOR, min_samples=MIN_SAMPLES):
+        self.metrics = metrics
+        self.default = default
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self.min_samples = min_samples
+        # step -> (sample count, learned timeout) at the last refresh
+        self.learned = {}
+        # step -> consecutive timeouts
+        self.misses = {}
+
+    def timeout(self, step):
+        """Seconds to wait for the element a step needs"""
+        count, p99 = self.metrics.latency(step, 0.99)
+        if count < self.min_samples:
+            base = self.default
+        else:
+            cached = self.learned.get(step)
+            if cached is None or count - cached[0] >= REFRESH_EVERY:
+                cached = (count, min(self.max_timeout, max(self.min_timeout, p99 * self.factor)))
+                self.learned[step] = cached
+            base = cached[1]
+        return min(self.max_timeout, base * 2 ** self.misses.get(step, 0))
+
+    def until(self, driver, step, condition):
+        """WebDriverWait(driver, timeout(step)).until(condition), keeping track of timeouts"""
+        try:
+            value = WebDriverWait(driver, self.timeout(step)).until(condition)
+        except TimeoutException:
+            self.misses[step] = min(self.misses.get(step, 0) + 1, 4)
+            raise
+        self.misses.pop(step, None)
+        return value
+
+    def learned_timeouts(self, steps):
+        """{step: timeout} for those of steps that have learned one, for the JSON summary"""
+        return {step: round(self.timeout(step), 2) for step in steps
+                if self.metrics.latency(step, 0.99)[0] >= self.min_samples}
+
+
+def probe(driver, by, value):
+    """
+    Near-instant check for an optional element (popups, banners): returns it if it
+    is on the page and visible right now, None otherwise. Never waits.
+    """
+    try:
+        for element in driver.find_elements(by, value):
+            if element.is_displayed():
+                return element
+    except (NoSuchElementException, StaleElementReferenceException):
+        pass
+    return None
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Automation Worker Service
+Durable SQLite job queue plus a bounded pool of long-running worker processes that
+run jobs through the existing automation classes. Workers keep their interpreter
+(and imports) warm and attach to the pre-warmed Chrome daemon, so a burst of
+uploads queues up instead of forking one cold Chrome per job.
+
+Usage:
+    python automation_worker.py serve [--workers 2] [--poll 1] [--no-daemon]
+    python automation_worker.py submit <service_id> <file_path> [--param key=value ...]
+    python automation_worker.py status <job_id>
+"""
+
+import importlib
+import inspect
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime
+
+DEFAULT_QUEUE_PATH = os.path.join("cache", "job_queue.sqlite3")
+
+# Service IDs as used by the server's /api/automation/start route, which submits its jobs here
+SERVICES = {
+    'damco-tracking-maersk': ('damco_tracking_maersk', 'DamcoTrackingAutomation'),
+    'ctg-port-tracking': ('ctg_port_tracking', 'CtgPortTrackingAutomation'),
+    'example-automation': ('example_automation', 'ExampleAutomation')
+}
+
+# A job whose worker died this many times is marked failed instead of requeued
+MAX_ATTEMPTS = 3
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except (OSError, TypeError, ValueError):
+        return False
+
+
+class JobQueue:
+    """Jobs table shared by the server-side submitter and every worker process"""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                service TEXT NOT NULL,
+                file_path TEXT NOT NULL,
+                params TEXT NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                worker_pid INTEGER,
+                log_file TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, created_at)")
+
+    def submit(self, service, file_path, params=None):
+        if service not in SERVICES:
+            raise ValueError(f"Service {service} is not yet implemented")
+        job_id = str(uuid.uuid4())
+        self.conn.execute(
+            "INSERT INTO jobs (id, service, file_path, params, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+            (job_id, service, file_path, json.dumps(params or {}), time.time())
+        )
+        return job_id
+
+    def claim(self):
+        """Atomically take the oldest queued job for this process, or return None"""
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                "UPDATE jobs SET status = 'running', worker_pid = ?, started_at = ?, attempts = attempts + 1 "
+                "WHERE id = ?",
+                (os.getpid(), time.time(), row[0])
+            )
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return self.get(row[0])
+
+    def set_log_file(self, job_id, log_file):
+        self.conn.execute("UPDATE jobs SET log_file = ? WHERE id = ?", (log_file, job_id))
+
+    def finish(self, job_id, success, error=None):
+        self.conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+            ('completed' if success else 'failed', error, time.time(), job_id)
+        )
+
+    def requeue_stale(self, logger):
+        """Put running jobs whose worker process is gone back in the queue"""
+        rows = self.conn.execute("SELECT id, worker_pid, attempts FROM jobs WHERE status = 'running'").fetchall()
+        for job_id, worker_pid, attempts in rows:
+            if _pid_alive(worker_pid):
+                continue
+            if attempts >= MAX_ATTEMPTS:
+                self.finish(job_id, False, error=f"Worker died {attempts} times")
+                logger.error(f"❌ Job {job_id} failed: worker died {attempts} times")
+            else:
+                self.conn.execute("UPDATE jobs SET status = 'queued', worker_pid = NULL WHERE id = ?", (job_id,))
+                logger.warning(f"⚠️ Requeued job {job_id} (worker {worker_pid} is gone)")
+
+    def get(self, job_id):
+        self.conn.row_factory = sqlite3.Row
+        try:
+            row = self.conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        finally:
+            self.conn.row_factory = None
+        if row is None:
+            return None
+        job = dict(row)
+        job['params'] = json.loads(job['params'])
+        return job
+
+    def close(self):
+        self.conn.close()
+
+
+def run_job(job):
+    """Run one job through its automation class, returns True on success"""
+    module_name, class_name = SERVICES[job['service']]
+    automation_class = getattr(importlib.import_module(module_name), class_name)
+    params = job['params']
+
+    # Pass through only the options this automation class understands
+    accepted = inspect.signature(automation_class.__init__).parameters
+    automation = automation_class(**{key: value for key, value in params.items() if key in accepted})
+
+    run_accepted = inspect.signature(automation.run_automation).parameters
+    run_kwargs = {'resume': params['resume']} if 'resume' in params and 'resume' in run_accepted else {}
+    return automation.run_automation(job['file_path'], params.get('headless', True), **run_kwargs)
+
+
+def worker_loop(worker_id, queue_path, poll_interval):
+    """Body of one long-running worker process"""
+    # Root handler set up front so each automation's setup_automation_logging() leaves
+    # the root logger alone, and job output can be routed to a per-job log file below
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+    logger = logging.getLogger('AutomationWorker')
+    queue = JobQueue(queue_path)
+    os.makedirs(os.path.join("logs", "jobs"), exist_ok=True)
+    logger.info(f"✅ Worker {worker_id} ready (pid {os.getpid()})")
+
+    while True:
+        job = queue.claim()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+
+        log_file = os.path.join("logs", "jobs", f"{job['id']}.log")
+        queue.set_log_file(job['id'], log_file)
+        handler = logging.FileHandler(log_file)
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        logging.getLogger().addHandler(handler)
+
+        logger.info(f"🚀 Job {job['id']}: {job['service']} ({job['file_path']})")
+        started = time.time()
+        try:
+            success = run_job(job)
+            queue.finish(job['id'], bool(success), error=None if success else "Automation reported failure")
+            logger.info(f"{'✅' if success else '❌'} Job {job['id']} finished in {time.time() - started:.1f}s")
+        except Exception as e:
+            queue.finish(job['id'], False, error=str(e))
+            logger.error(f"❌ Job {job['id']} failed: {str(e)}")
+        finally:
+            logging.getLogger().removeHandler(handler)
+            handler.close()
+
+
+def serve(workers=2, poll_interval=1.0, use_daemon=True, queue_path=DEFAULT_QUEUE_PATH):
+    """Supervise a fixed number of worker processes, restarting any that die"""
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+    logger = logging.getLogger('AutomationWorker')
+
+    if use_daemon:
+        # One warm Chrome for every worker; automation classes attach to it
+        try:
+            from browser_daemon import find_daemon, start_daemon
+            if not find_daemon():
+                start_daemon(headless=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Chrome daemon unavailable, workers will start their own Chrome: {str(e)}")
+
+    queue = JobQueue(queue_path)
+    queue.requeue_stale(logger)
+
+    def spawn(worker_id):
+        process = multiprocessing.Process(target=worker_loop, args=(worker_id, queue_path, poll_interval), daemon=True)
+        process.start()
+        return process
+
+    processes = {worker_id: spawn(worker_id) for worker_id in range(1, max(1, workers) + 1)}
+    logger.info(f"🧵 Automation worker service running with {len(processes)} workers")
+
+    try:
+        while True:
+            time.sleep(poll_interval)
+            for worker_id, process in list(processes.items()):
+                if not process.is_alive():
+                    logger.warning(f"⚠️ Worker {worker_id} exited (code {process.exitcode}), restarting")
+                    processes[worker_id] = spawn(worker_id)
+            queue.requeue_stale(logger)
+    except KeyboardInterrupt:
+        logger.info("🔒 Stopping automation workers...")
+    finally:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.join(timeout=10)
+        # Jobs interrupted by the shutdown are picked up again on the next start
+        queue.requeue_stale(logger)
+        queue.close()
+    return True
+
+
+def _parse_value(value):
+    """--param values: JSON scalars where possible (true, 4, 2.5), plain strings otherwise"""
+    try:
+        return json.loads(value)
+    except ValueError:
+        return value
+
+
+def main():
+    """Main function for command line usage"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("serve", "submit", "status"):
+        print("Usage: python automation_worker.py serve [--workers 2] [--poll 1] [--no-daemon]")
+        print("       python automation_worker.py submit <service_id> <file_path> [--param key=value ...]")
+        print("       python automation_worker.py status <job_id>")
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == "serve":
+        workers = 2
+        if '--workers' in sys.argv:
+            workers = int(sys.argv[sys.argv.index('--workers') + 1])
+        poll_interval = 1.0
+        if '--poll' in sys.argv:
+            poll_interval = float(sys.argv[sys.argv.index('--poll') + 1])
+        serve(workers, poll_interval, use_daemon='--no-daemon' not in sys.argv)
+        sys.exit(0)
+
+    queue = JobQueue()
+    try:
+        if command == "submit":
+            if len(sys.argv) < 4:
+                print("❌ submit needs a service id and a file path")
+                sys.exit(1)
+            params = {}
+            for position, arg in enumerate(sys.argv):
+                if arg == '--param':
+                    key, _, value = sys.argv[position + 1].partition("=")
+                    params[key] = _parse_value(value)
+            job_id = queue.submit(sys.argv[2], os.path.abspath(sys.argv[3]), params)
+            print(json.dumps({'job_id': job_id, 'status': 'queued'}))
+        else:
+            job = queue.get(sys.argv[2]) if len(sys.argv) > 2 else None
+            if job is None:
+                print(json.dumps({'error': 'Job not found'}))
+                sys.exit(1)
+            for key in ('created_at', 'started_at', 'finished_at'):
+                if job[key]:
+                    job[key] = datetime.fromtimestamp(job[key]).isoformat()
+            print(json.dumps(job))
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
+    finally:
+        queue.close()
+
+
+if __name__ == "__main__":
+    main()
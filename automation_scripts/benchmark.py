@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Offline Benchmark
+Serves local stand-in Maersk and CTG portals with configurable latency and error
+rates, runs the automation classes against them end to end and reports items/sec,
+per-item latency percentiles and peak RSS, optionally compared with a saved baseline.
+
+Usage:
+    python benchmark.py [--portals damco,ctg] [--items 20] [--latency 0.2] [--jitter 0.05]
+                        [--error-rate 0] [--workers 1] [--tabs 1] [--ctg-engine selenium|http]
+                        [--output pdf|data|both] [--max-wait 10] [--pacing] [--block-resources] [--full-reload]
+                        [--seed N]
+                        [--baseline FILE] [--save-baseline FILE] [--keep-workdir] [--verbose]
+"""
+
+import csv
+import html
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+from circuit_breaker import get_circuit_breaker
+from driver_lifecycle import process_tree_rss
+from identifier_preflight import iso6346_check_digit
+from rate_limiter import get_rate_limiter
+
+PORTALS = ('damco', 'ctg')
+
+MAERSK_PAGE = """<!DOCTYPE html>
+<html><head><title>Track - Maersk (benchmark)</title>
+<link rel="stylesheet" href="/assets/site.css"></head>
+<body><img src="/assets/banner.png" alt="">
+<div id="cookie-banner"><button data-test="coi-allow-all-button" onclick="this.parentNode.style.display='none'">Allow all</button></div>
+<div id="coach"><button data-test="finishButton" onclick="this.parentNode.style.display='none'">Got it</button></div>
+<input id="formInput" type="text">
+<button data-test="form-input-button" onclick="track()">Track</button>
+<div id="frame-host"></div>
+<script>
+function track() {
+    var host = document.getElementById('frame-host');
+    host.innerHTML = '';
+    var frame = document.createElement('iframe');
+    frame.id = 'damco-track';
+    frame.src = '/damco-track/search?fcr=' + encodeURIComponent(document.getElementById('formInput').value);
+    host.appendChild(frame);
+}
+</script>
+</body></html>"""
+
+DAMCO_SEARCH_PAGE = """<!DOCTYPE html>
+<html><body><div id="fcr_by_fcr_number"><a href="/damco-track/fcr/{quoted}">{number}</a></div></body></html>"""
+
+CTG_FORM_PAGE = """<!DOCTYPE html>
+<html><head><title>PCS (benchmark)</title>
+<link rel="stylesheet" href="/assets/site.css"></head>
+<body><img src="/assets/banner.png" alt=""><form method="post" action="/pcs/search">
+<input type="hidden" name="token" value="benchmark">
+<input id="containerLocation" name="containerLocation" type="text">
+<input type="submit" id="submit" name="submit" value="Search">
+</form></body></html>"""
+
+RESULT_PAGE = """<!DOCTYPE html>
+<html><head><link rel="stylesheet" href="/assets/site.css"></head>
+<body><img src="/assets/banner.png" alt=""><h2>{number}</h2>
+<table class="result"><tr><th>Event Date</th><th>Status</th><th>Location</th><th>Vessel</th></tr>{rows}</table>
+</body></html>"""
+
+# Static assets standing in for the portals' page weight; the image and the font are
+# what a blocking profile is expected to skip, the stylesheet must still load
+ASSETS = {
+    "/assets/site.css": ("text/css", b"@font-face { font-family: Bench; src: url(/assets/bench.woff2); }\n"
+                                     b"body { font-family: Bench, sans-serif; }\n"),
+    "/assets/bench.woff2": ("font/woff2", b"\0" * (64 * 1024)),
+    "/assets/banner.png": ("image/png", b"\0" * (256 * 1024))
+}
+
+ERROR_PAGE = "<!DOCTYPE html><html><body><h1>503 Service Unavailable</h1></body></html>"
+
+EVENTS = [('Gate in', 'Chittagong CY'), ('Loaded on vessel', 'Chittagong Port'), ('Discharged', 'Colombo')]
+
+
+def make_identifiers(portal, count):
+    if portal == 'damco':
+        return [f"BNC{n:07d}" for n in range(1, count + 1)]
+    numbers = []
+    for n in range(1, count + 1):
+        code = f"BNCU{n:06d}"
+        numbers.append(f"{code}{iso6346_check_digit(code)}")
+    return numbers
+
+
+def render_result(number):
+    rows = "".join(
+        f"<tr><td>2026-01-{day:02d} 10:00</td><td>{status}</td><td>{location}</td><td>BENCH STAR</td></tr>"
+        for day, (status, location) in enumerate(EVENTS, start=1)
+    )
+    return RESULT_PAGE.format(number=html.escape(number), rows=rows)
+
+
+class MockPortalServer:
+    """
+    Local HTTP server with both portal flows. Lookup requests (Damco iframe search,
+    FCR page and CTG search) are delayed by latency +/- jitter seconds and answered
+    with a 503 page at error_rate; the landing pages are served immediately.
+    """
+
+    def __init__(self, latency=0.2, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.lookups = 0
+        self.errors = 0
+
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_page(self, body, status=200, content_type="text/html; charset=utf-8"):
+                data = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def lookup(self, render):
+                if portal.delay_lookup():
+                    self.send_page(ERROR_PAGE, status=503)
+                else:
+                    self.send_page(render())
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/mymaersk-scm-track/":
+                    self.send_page(MAERSK_PAGE)
+                elif url.path == "/damco-track/search":
+                    number = parse_qs(url.query).get("fcr", [""])[0]
+                    self.lookup(lambda: DAMCO_SEARCH_PAGE.format(quoted=quote(number), number=html.escape(number)))
+                elif url.path.startswith("/damco-track/fcr/"):
+                    number = unquote(url.path.rsplit("/", 1)[1])
+                    self.lookup(lambda: render_result(number))
+                elif url.path == "/pcs/":
+                    self.send_page(CTG_FORM_PAGE)
+                elif url.path in ASSETS:
+                    content_type, data = ASSETS[url.path]
+                    self.send_page(data, content_type=content_type)
+                else:
+                    self.send_page("Not found", status=404)
+
+            def do_POST(self):
+                fields = parse_qs(self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8"))
+                if urlparse(self.path).path == "/pcs/search":
+                    number = fields.get("containerLocation", [""])[0]
+                    self.lookup(lambda: render_result(number))
+                else:
+                    self.send_page("Not found", status=404)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def maersk_url(self):
+        return f"{self.base_url}/mymaersk-scm-track/"
+
+    @property
+    def ctg_url(self):
+        return f"{self.base_url}/pcs/"
+
+    def delay_lookup(self):
+        """Sleep for one simulated portal response, returns True if it should fail"""
+        with self.lock:
+            delay = max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            failed = self.random.random() < self.error_rate
+            self.lookups += 1
+            self.errors += 1 if failed else 0
+        time.sleep(delay)
+        return failed
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class RssSampler:
+    """Samples process tree RSS in the background and keeps the peak"""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while True:
+            self.peak = max(self.peak, self.current())
+            if self.stopped.wait(self.interval):
+                break
+
+    @staticmethod
+    def current():
+        if os.path.isdir("/proc"):
+            return process_tree_rss(os.getpid())
+        import resource
+        # Fallback without /proc: this process only (kilobytes on Linux, bytes on macOS)
+        usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return usage if sys.platform == "darwin" else usage * 1024
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+def run_portal(portal, server, settings, workdir, logger):
+    """Run one automation end to end against the mock server, returns its stats dict"""
+    identifiers = make_identifiers(portal, settings['items'])
+    input_path = os.path.join(workdir, f"{portal}_input.csv")
+    with open(input_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["fcr_number" if portal == 'damco' else "container_number"])
+        writer.writerows([identifier] for identifier in identifiers)
+
+    lookups_before, errors_before = server.lookups, server.errors
+    if portal == 'damco':
+        from damco_tracking_maersk import DamcoTrackingAutomation
+        automation = DamcoTrackingAutomation(headless=True, workers=settings['workers'],
+                                             max_wait=settings['max_wait'], cache_ttl=0, use_daemon=False,
+                                             output=settings['output'], portal_url=server.maersk_url,
+                                             block_resources=settings['block_resources'],
+                                             retries=settings['retries'])
+    else:
+        from ctg_port_tracking import CtgPortTrackingAutomation
+        automation = CtgPortTrackingAutomation(headless=True, tabs=settings['tabs'], max_wait=settings['max_wait'],
+                                               engine=settings['ctg_engine'], base_url=server.ctg_url,
+                                               cache_ttl=0, use_daemon=False, output=settings['output'],
+                                               block_resources=settings['block_resources'],
+                                               reuse_form=not settings['full_reload'],
+                                               retries=settings['retries'])
+
+    logger.info(f"🏁 {portal}: {len(identifiers)} items against {server.base_url}")
+    started = time.perf_counter()
+    with RssSampler() as sampler:
+        success = automation.run_automation(input_path, True)
+    wall = time.perf_counter() - started
+
+    # Totals come from the run's result journal (absent if the run stopped before opening it)
+    journal = automation.journal
+    items = journal.total if journal else 0
+    lookup = automation.metrics.summary().get('lookup', {})
+    network = automation.metrics.counters()
+    return {
+        'success': bool(success),
+        'items': items,
+        'failed': journal.failed if journal else 0,
+        'wall_seconds': round(wall, 3),
+        'items_per_sec': round(items / wall, 3) if wall else 0.0,
+        'p50': lookup.get('p50', 0.0),
+        'p95': lookup.get('p95', 0.0),
+        'peak_rss_mb': round(sampler.peak / (1024 * 1024), 1),
+        # Browser traffic seen by PageReadiness (not measured in multi-tab or HTTP engine mode)
+        'kb_per_lookup': round(network.get('network_bytes', 0) / 1024 / lookup['count'], 1) if lookup else 0.0,
+        'blocked_requests': network.get('blocked_requests', 0),
+        'retries': network.get('retries', 0),
+        'server_lookups': server.lookups - lookups_before,
+        'server_errors': server.errors - errors_before
+    }
+
+
+def _change(current, baseline):
+    if not baseline:
+        return "n/a"
+    return f"{(current - baseline) / baseline * 100:+.1f}%"
+
+
+def compare_with_baseline(report, baseline, logger):
+    """Log the relative change of each headline number against a saved baseline report"""
+    for portal, stats in report['portals'].items():
+        base = baseline.get('portals', {}).get(portal)
+        if not base:
+            logger.warning(f"⚠️ {portal}: not in baseline")
+            continue
+        logger.info(f"📈 {portal} vs baseline: items/s {_change(stats['items_per_sec'], base['items_per_sec'])}, "
+                    f"p50 {_change(stats['p50'], base['p50'])}, p95 {_change(stats['p95'], base['p95'])}, "
+                    f"peak RSS {_change(stats['peak_rss_mb'], base['peak_rss_mb'])}, "
+                    f"KB/lookup {_change(stats['kb_per_lookup'], base.get('kb_per_lookup', 0))}")
+    if baseline.get('settings') != report['settings']:
+        logger.warning("⚠️ Baseline was recorded with different settings, numbers may not be comparable")
+
+
+def run_benchmark(settings, logger, keep_workdir=False):
+    """Start the mock portals, run each selected automation and return the report dict"""
+    output_dir = os.path.join(os.getcwd(), "results")
+    workdir = tempfile.mkdtemp(prefix="spf_benchmark_")
+    original_cwd = os.getcwd()
+    server = MockPortalServer(settings['latency'], settings['jitter'], settings['error_rate'],
+                              settings['seed']).start()
+    report = {'created_at': datetime.now().isoformat(), 'settings': settings, 'portals': {}}
+    try:
+        # Automations write results/, logs/ and cache/ relative to the working directory
+        os.chdir(workdir)
+        # Registered before the automations so they share this limiter; a fresh state
+        # directory keeps pacing learned from the real portals out of the measurement
+        limiter_options = {} if settings['pacing'] else {'initial_interval': 0.0, 'min_interval': 0.0}
+        get_rate_limiter("127.0.0.1", logger, state_dir=os.path.join(workdir, "rate_limits"), **limiter_options)
+        # Same for the circuit breaker, with pauses short enough for a benchmark
+        get_circuit_breaker("127.0.0.1", logger, cooldown=1.0, max_cooldown=5.0)
+
+        for portal in settings['portals']:
+            stats = run_portal(portal, server, settings, workdir, logger)
+            report['portals'][portal] = stats
+            logger.info(f"📊 {portal}: {stats['items']} items ({stats['failed']} failed) in "
+                        f"{stats['wall_seconds']:.1f}s, {stats['items_per_sec']:.2f} items/s, "
+                        f"p50 {stats['p50']:.2f}s, p95 {stats['p95']:.2f}s, peak RSS {stats['peak_rss_mb']:.0f} MB, "
+                        f"{stats['kb_per_lookup']:.0f} KB/lookup")
+    finally:
+        os.chdir(original_cwd)
+        server.stop()
+        if keep_workdir:
+            logger.info(f"📁 Benchmark files kept in {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    os.makedirs(output_dir, exist_ok=True)
+    report_path = os.path.join(output_dir, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"📋 Benchmark report saved: {report_path}")
+    return report
+
+
+def main():
+    """Main function for command line usage"""
+    if '--help' in sys.argv or '-h' in sys.argv:
+        print("Usage: python benchmark.py [--portals damco,ctg] [--items 20] [--latency 0.2] [--jitter 0.05]")
+        print("       [--error-rate 0] (fraction of portal lookups answered with a 503 page)")
+        print("       [--workers 1] [--tabs 1] [--ctg-engine selenium|http] [--output pdf|data|both]")
+        print("       [--max-wait 10] [--pacing] (keep the adaptive rate limiter's request spacing)")
+        print("       [--block-resources] (use the lean page-load profiles, compare against a full-load baseline)")
+        print("       [--full-reload] (CTG: reload the portal per lookup instead of reusing the search form)")
+        print("       [--retries 0] (retry failed lookups with backoff like a real run; off so failures stay visible)")
+        print("       [--seed N] [--baseline FILE] [--save-baseline FILE] [--keep-workdir] [--verbose]")
+        sys.exit(0)
+
+    def option(name, default, convert=str):
+        return convert(sys.argv[sys.argv.index(name) + 1]) if name in sys.argv else default
+
+    settings = {
+        'portals': option('--portals', ",".join(PORTALS)).split(","),
+        'items': option('--items', 20, int),
+        'latency': option('--latency', 0.2, float),
+        'jitter': option('--jitter', 0.05, float),
+        'error_rate': option('--error-rate', 0.0, float),
+        'workers': option('--workers', 1, int),
+        'tabs': option('--tabs', 1, int),
+        'ctg_engine': option('--ctg-engine', 'selenium'),
+        'output': option('--output', 'pdf'),
+        'max_wait': option('--max-wait', 10.0, float),
+        'pacing': '--pacing' in sys.argv,
+        'block_resources': '--block-resources' in sys.argv,
+        'full_reload': '--full-reload' in sys.argv,
+        'retries': option('--retries', 0, int),
+        'seed': option('--seed', 1, int)
+    }
+    unknown = [portal for portal in settings['portals'] if portal not in PORTALS]
+    if unknown:
+        print(f"❌ Unknown portal: {', '.join(unknown)} (use {', '.join(PORTALS)})")
+        sys.exit(1)
+
+    # Root handler first so the automations' logging.basicConfig() is a no-op and
+    # their per-item logging stays quiet unless --verbose is given
+    logging.basicConfig(level=logging.INFO if '--verbose' in sys.argv else logging.WARNING,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+                        handlers=[logging.StreamHandler(sys.stdout)])
+    logger = logging.getLogger('Benchmark')
+    logger.setLevel(logging.INFO)
+
+    report = run_benchmark(settings, logger, keep_workdir='--keep-workdir' in sys.argv)
+
+    if '--baseline' in sys.argv:
+        with open(option('--baseline', None)) as f:
+            compare_with_baseline(report, json.load(f), logger)
+    if '--save-baseline' in sys.argv:
+        with open(option('--save-baseline', None), "w") as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"💾 Baseline saved: {option('--save-baseline', None)}")
+
+    sys.exit(0 if all(stats['success'] for stats in report['portals'].values()) else 1)
+
+
+if __name__ == "__main__":
+    main()
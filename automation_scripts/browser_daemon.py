@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Pre-warmed Chrome Daemon
+Keeps one long-lived Chrome running with a DevTools port so automation scripts
+can attach to it instead of cold-starting a browser for every job
+
+Usage: python browser_daemon.py start|stop|status [--port 9222] [--headless]
+"""
+
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+STATE_PATH = os.path.join(tempfile.gettempdir(), "spf_chrome_daemon.json")
+PROFILE_DIR = os.path.join(tempfile.gettempdir(), "spf_chrome_daemon_profile")
+
+CHROME_BINARIES = [
+    'google-chrome',
+    'google-chrome-stable',
+    'chromium',
+    'chromium-browser'
+]
+
+
+def _port_open(port):
+    try:
+        with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+            return True
+    except OSError:
+        return False
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+        return True
+    except (OSError, ValueError):
+        return False
+
+
+def _load_state():
+    try:
+        with open(STATE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def find_daemon():
+    """Return the DevTools address of a running daemon ("127.0.0.1:9222"), or None"""
+    state = _load_state()
+    if state and _pid_alive(state['pid']) and _port_open(state['port']):
+        return f"127.0.0.1:{state['port']}"
+    return None
+
+
+def attach_options(debugger_address, launch_options):
+    """
+    Chrome options for attaching to the daemon. Launch-only flags are dropped
+    (the daemon already runs with them); per-session settings are kept.
+    """
+    from selenium.webdriver.chrome.options import Options
+
+    options = Options()
+    options.debugger_address = debugger_address
+    options.page_load_strategy = launch_options.page_load_strategy
+    logging_prefs = launch_options.capabilities.get("goog:loggingPrefs")
+    if logging_prefs:
+        options.set_capability("goog:loggingPrefs", logging_prefs)
+    return options
+
+
+def find_chrome_binary():
+    configured = os.environ.get("CHROME_BINARY")
+    if configured:
+        return configured
+    for name in CHROME_BINARIES:
+        path = shutil.which(name)
+        if path:
+            return path
+    raise Exception("Chrome not found. Install google-chrome or chromium, or set CHROME_BINARY")
+
+
+def start_daemon(port=9222, headless=True):
+    """Launch Chrome detached from this process and record where it listens"""
+    address = find_daemon()
+    if address:
+        print(f"✅ Chrome daemon already running at {address}")
+        return True
+
+    args = [
+        find_chrome_binary(),
+        f"--remote-debugging-port={port}",
+        f"--user-data-dir={PROFILE_DIR}",
+        "--disable-gpu",
+        "--no-sandbox",
+        "--disable-dev-shm-usage",
+        "--no-first-run",
+        "--no-default-browser-check",
+        "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
+        "about:blank"
+    ]
+    if headless:
+        args.insert(1, "--headless=new")
+
+    process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+
+    # Wait for the DevTools port to come up
+    deadline = time.time() + 20
+    while time.time() < deadline:
+        if _port_open(port):
+            with open(STATE_PATH, "w") as f:
+                json.dump({'pid': process.pid, 'port': port, 'started': time.time()}, f)
+            print(f"✅ Chrome daemon started at 127.0.0.1:{port} (pid {process.pid})")
+            return True
+        if process.poll() is not None:
+            break
+        time.sleep(0.1)
+
+    print("❌ Chrome daemon failed to start")
+    process.kill()
+    return False
+
+
+def stop_daemon():
+    state = _load_state()
+    if not state or not _pid_alive(state['pid']):
+        print("⚠️ Chrome daemon is not running")
+    else:
+        os.kill(state['pid'], signal.SIGTERM)
+        print(f"🔒 Chrome daemon stopped (pid {state['pid']})")
+    if os.path.exists(STATE_PATH):
+        os.remove(STATE_PATH)
+    return True
+
+
+def main():
+    """Main function for command line usage"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ("start", "stop", "status"):
+        print("Usage: python browser_daemon.py start|stop|status [--port 9222] [--headless]")
+        sys.exit(1)
+
+    command = sys.argv[1]
+    port = 9222
+    if '--port' in sys.argv:
+        port = int(sys.argv[sys.argv.index('--port') + 1])
+
+    if command == "start":
+        success = start_daemon(port, headless='--headless' in sys.argv or '--no-gui' in sys.argv)
+    elif command == "stop":
+        success = stop_daemon()
+    else:
+        address = find_daemon()
+        print(f"✅ Chrome daemon running at {address}" if address else "⚠️ Chrome daemon is not running")
+        success = address is not None
+
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
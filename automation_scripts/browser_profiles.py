@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Persistent Browser Profiles
+A small pool of locked Chrome user-data directories per portal, so cookie consent
+and dismissed popups survive across runs. Each concurrent browser holds its own
+slot; a slot is never shared while locked.
+"""
+
+import json
+import os
+import time
+
+try:
+    import fcntl  # POSIX only; persistent profiles are disabled without it
+except ImportError:
+    fcntl = None
+
+PROFILE_ROOT = os.path.join("cache", "profiles")
+
+# Concurrent browsers per portal that can get a persistent slot
+DEFAULT_SLOTS = 8
+
+# Remembered popup dismissals are re-checked in full after this long
+STATE_TTL = 7 * 24 * 3600
+
+
+class ProfileSlot:
+    """A locked user-data directory plus a small JSON state file of what was set up in it"""
+
+    def __init__(self, path, lock_file):
+        self.path = path
+        self.lock_file = lock_file
+        self.state_path = os.path.join(path, "spf_state.json")
+
+    def load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def remembers(self, key, ttl=STATE_TTL):
+        """True if key (e.g. "popups_dismissed") was marked in this profile within ttl seconds"""
+        marked_at = self.load_state().get(key)
+        return bool(marked_at) and time.time() - marked_at <= ttl
+
+    def mark(self, key):
+        state = self.load_state()
+        state[key] = time.time()
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def release(self):
+        if self.lock_file and not self.lock_file.closed:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+            self.lock_file.close()
+
+
+def acquire_profile(portal, logger, slots=DEFAULT_SLOTS, root=PROFILE_ROOT):
+    """
+    Lock the first free profile slot for portal and return it, or None when every
+    slot is in use (or locking is unsupported) and the caller should use a fresh profile.
+    The lock is held until release(), or until the process exits.
+    """
+    if fcntl is None:
+        logger.warning("⚠️ Persistent browser profiles need POSIX file locks, using a fresh profile")
+        return None
+
+    for number in range(1, slots + 1):
+        path = os.path.abspath(os.path.join(root, portal, f"slot{number}"))
+        os.makedirs(path, exist_ok=True)
+        lock_file = open(os.path.join(root, portal, f"slot{number}.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        logger.info(f"🗃️ Using persistent {portal} profile slot {number}")
+        return ProfileSlot(path, lock_file)
+
+    logger.warning(f"⚠️ All {slots} persistent {portal} profiles are in use, using a fresh profile")
+    return None
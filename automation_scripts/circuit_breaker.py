@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Portal Circuit Breaker
+Pauses all lookups against a portal when most recent ones timed out or hit
+server errors, instead of letting every remaining item wait out its own timeout.
+After a cool-down one probe lookup is let through; its outcome closes the
+breaker or re-opens it for longer.
+"""
+
+import threading
+import time
+from collections import deque
+
+from retry_queue import PORTAL_FAILURES, PortalUnavailableError
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+def get_circuit_breaker(host, logger, **kwargs):
+    """Return the process-wide breaker for a portal host"""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host, logger, **kwargs)
+        return _breakers[host]
+
+
+class CircuitBreaker:
+    """
+    Trips when at least failure_ratio of the last window outcomes (and no fewer
+    than min_requests) were portal failures. Each consecutive trip doubles the
+    cool-down up to max_cooldown; after give_up_after seconds without a successful
+    probe, wait() raises PortalUnavailableError so the rest of the run fails fast.
+    Probes keep going after that, so the breaker closes once the portal recovers;
+    begin_run() gives the next run (watch cycle, worker job) a fresh give-up clock.
+    """
+
+    def __init__(self, host, logger, window=20, min_requests=10, failure_ratio=0.6,
+                 cooldown=15.0, max_cooldown=240.0, give_up_after=900.0, metrics=None):
+        self.host = host
+        self.logger = logger
+        self.window = window
+        self.min_requests = min_requests
+        self.failure_ratio = failure_ratio
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.give_up_after = give_up_after
+        self.metrics = metrics
+        self.condition = threading.Condition()
+        self.outcomes = deque(maxlen=window)
+        self.state = CLOSED
+        self.trips = 0
+        self.retry_at = 0.0
+        self.failing_since = None
+
+    def wait(self):
+        """Block while the breaker is open; returns once this caller may send a lookup"""
+        with self.condition:
+            while True:
+                if self.state == CLOSED:
+                    return
+                if self.state == HALF_OPEN and time.time() >= self.retry_at + self.max_cooldown:
+                    # The probe never reported back; let another one through
+                    self.state = OPEN
+                if self.state == OPEN and time.time() >= self.retry_at:
+                    # This caller is the probe; everyone else keeps waiting for its outcome
+                    self.state = HALF_OPEN
+                    self.logger.info(f"🔌 {self.host}: sending a probe lookup")
+                    return
+                # Checked after the probe so a given-up portal can still be found recovered
+                if self.failing_since and time.time() - self.failing_since >= self.give_up_after:
+                    raise PortalUnavailableError(f"{self.host} unavailable for "
+                                                 f"{self.give_up_after / 60:.0f} min, giving up")
+                timeout = self.retry_at - time.time() if self.state == OPEN else None
+                self.condition.wait(max(0.05, timeout) if timeout is not None else 1.0)
+
+    def begin_run(self):
+        """Restart the give-up clock for a new run; an open breaker stays open until a probe succeeds"""
+        with self.condition:
+            if self.failing_since is not None:
+                self.failing_since = time.time()
+
+    def record(self, error_kind):
+        """Report a finished lookup (error_kind None on success)"""
+        failed = error_kind in PORTAL_FAILURES
+        with self.condition:
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._trip()
+                else:
+                    self.logger.info(f"🔌 {self.host} answering again, resuming lookups")
+                    self.state = CLOSED
+                    self.trips = 0
+                    self.failing_since = None
+                    self.outcomes.clear()
+                self.condition.notify_all()
+                return
+
+            self.outcomes.append(failed)
+            if self.state == CLOSED and len(self.outcomes) >= self.min_requests:
+                if sum(self.outcomes) >= self.failure_ratio * len(self.outcomes):
+                    self._trip()
+
+    def _trip(self):
+        self.trips += 1
+        delay = min(self.max_cooldown, self.cooldown * 2 ** (self.trips - 1))
+        self.state = OPEN
+        self.retry_at = time.time() + delay
+        if self.failing_since is None:
+            self.failing_since = time.time()
+        self.outcomes.clear()
+        if self.metrics:
+            self.metrics.add("breaker_trips")
+        self.logger.warning(f"⛔ {self.host} failing, pausing lookups for {delay:.0f}s")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+CTG Port Authority HTTP Engine
+Browserless container lookups: submits the portal's search form over a pooled
+keep-alive HTTP connection and parses the result HTML directly
+"""
+
+import re
+from html.parser import HTMLParser
+from urllib.parse import urlencode, urljoin
+
+import urllib3  # Installed alongside selenium
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+
+class HTTPStatusError(Exception):
+    """The portal answered with an error status (kept on .status for retry decisions)"""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} from {url}")
+        self.status = status
+
+
+class SearchFormParser(HTMLParser):
+    """Finds the form that contains the container input and collects its fields"""
+
+    def __init__(self, input_id):
+        super().__init__()
+        self.input_id = input_id
+        self.forms = []
+        self.current = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "form":
+            self.current = {
+                'action': attrs.get('action', ''),
+                'method': attrs.get('method', 'get').lower(),
+                'fields': {},
+                'hidden': [],
+                'input_name': None
+            }
+            self.forms.append(self.current)
+        elif self.current is not None and tag in ("input", "button", "select", "textarea"):
+            name = attrs.get('name')
+            if attrs.get('id') == self.input_id:
+                self.current['input_name'] = name or self.input_id
+                return
+            if not name:
+                return
+            input_type = attrs.get('type', 'text').lower()
+            if input_type in ("checkbox", "radio") and 'checked' not in attrs:
+                return
+            # Browsers never submit these
+            if input_type in ("reset", "file") or (tag == "input" and input_type == "button"):
+                return
+            # Only the submit control with id "submit" is sent, like a real click
+            if input_type == "submit" or tag == "button":
+                if attrs.get('id') != "submit":
+                    return
+            if input_type == "hidden":
+                self.current['hidden'].append(name)
+            self.current['fields'][name] = attrs.get('value', '')
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self.current = None
+
+    def search_form(self):
+        for form in self.forms:
+            if form['input_name']:
+                return form
+        return None
+
+
+class TableParser(HTMLParser):
+    """Collects every <table> as a list of rows of cell text"""
+
+    def __init__(self):
+        super().__init__()
+        self.tables = []
+        self.stack = []
+        self.row = None
+        self.cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self.stack.append([])
+        elif tag == "tr" and self.stack:
+            self.row = []
+        elif tag in ("td", "th") and self.row is not None:
+            self.cell = []
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self.cell is not None:
+            self.row.append(" ".join("".join(self.cell).split()))
+            self.cell = None
+        elif tag == "tr" and self.row is not None:
+            if any(self.row):
+                self.stack[-1].append(self.row)
+            self.row = None
+        elif tag == "table" and self.stack:
+            table = self.stack.pop()
+            if table:
+                self.tables.append(table)
+
+    def handle_data(self, data):
+        if self.cell is not None:
+            self.cell.append(data)
+
+
+def parse_tables(html):
+    """Return all tables in the page as lists of rows of cell text"""
+    parser = TableParser()
+    parser.feed(html)
+    return parser.tables
+
+
+def has_results(html):
+    """A result page without any filled-in table means the portal has no such container"""
+    return bool(parse_tables(html))
+
+
+def add_base_href(html, url):
+    """Point relative CSS/image URLs of a saved page back at the portal"""
+    base_tag = f'<base href="{url}">'
+    match = re.search(r"<head[^>]*>", html, re.IGNORECASE)
+    if match:
+        return html[:match.end()] + base_tag + html[match.end():]
+    return base_tag + html
+
+
+class CtgHttpEngine:
+    """Submits CTG container searches without a browser"""
+
+    def __init__(self, base_url, logger, timeout=20, pool_size=4, input_id="containerLocation"):
+        self.base_url = base_url
+        self.logger = logger
+        self.input_id = input_id
+        self.http = urllib3.PoolManager(
+            num_pools=2,
+            maxsize=pool_size,
+            timeout=urllib3.Timeout(connect=10, read=timeout),
+            retries=False,
+            headers={'User-Agent': USER_AGENT}
+        )
+        self.cookies = {}
+        self.form = None
+
+    def request(self, method, url, fields=None):
+        headers = {}
+        if self.cookies:
+            headers['Cookie'] = "; ".join(f"{k}={v}" for k, v in self.cookies.items())
+
+        body = None
+        if fields is not None and method == "POST":
+            body = urlencode(fields)
+            headers['Content-Type'] = "application/x-www-form-urlencoded"
+        elif fields is not None:
+            url = f"{url}{'&' if '?' in url else '?'}{urlencode(fields)}"
+
+        response = self.http.request(method, url, body=body, headers=headers, redirect=False)
+
+        for cookie in response.headers.getlist('Set-Cookie'):
+            name, _, value = cookie.split(";", 1)[0].partition("=")
+            self.cookies[name.strip()] = value.strip()
+
+        # Follow redirects ourselves so cookies set along the way are kept
+        if response.status in (301, 302, 303, 307, 308) and response.headers.get('Location'):
+            next_method = method if response.status in (307, 308) else "GET"
+            next_fields = fields if response.status in (307, 308) else None
+            return self.request(next_method, urljoin(url, response.headers['Location']), next_fields)
+
+        if response.status >= 400:
+            raise HTTPStatusError(response.status, url)
+        return url, response.data.decode(self._charset(response), errors="replace")
+
+    @staticmethod
+    def _charset(response):
+        match = re.search(r"charset=([\w-]+)", response.headers.get('Content-Type', ''))
+        return match.group(1) if match else "utf-8"
+
+    def load_form(self):
+        """Fetch the search page and remember how its form is submitted"""
+        url, html = self.request("GET", self.base_url)
+        parser = SearchFormParser(self.input_id)
+        parser.feed(html)
+        form = parser.search_form()
+        if form is None:
+            raise Exception(f"Search form with #{self.input_id} not found on {url}")
+
+        form['url'] = urljoin(url, form['action'] or url)
+        # Hidden fields usually carry per-page tokens, so such forms are reloaded per lookup
+        form['reusable'] = not form['hidden']
+        self.form = form
+        return form
+
+    def lookup(self, container_number):
+        """Submit one container search, returns (result_url, result_html)"""
+        form = self.form if self.form and self.form['reusable'] else self.load_form()
+
+        fields = dict(form['fields'])
+        fields[form['input_name']] = container_number
+        method = "POST" if form['method'] == "post" else "GET"
+        return self.request(method, form['url'], fields)
+
+    def close(self):
+        self.http.clear()
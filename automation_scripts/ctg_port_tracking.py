@@ -7,9 +7,6 @@ Automates the process of tracking container numbers through CTG Port Authority p
 import os
 import sys
 import time
-import logging
-import pandas as pd
-import base64
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -17,36 +14,94 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import json
+from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+import itertools
+from urllib.parse import urlparse
+from page_readiness import PageReadiness
+from input_reader import open_identifier_stream
+from identifier_preflight import IdentifierPreflight
+from rate_limiter import get_rate_limiter
+from browser_daemon import find_daemon, attach_options
+from ctg_http_engine import CtgHttpEngine, add_base_href, has_results
+from lookup_cache import LookupCache
+from run_journal import RunJournal
+from watchlist import Watchlist
+from step_metrics import StepMetrics
+from adaptive_timeouts import AdaptiveTimeouts
+from logging_setup import log_item, setup_automation_logging
+from resource_blocking import apply_resource_blocking, chrome_arguments
+from driver_lifecycle import DEFAULT_MAX_ITEMS, DEFAULT_MAX_RSS_MB, DriverRecycler
+from retry_queue import DEFAULT_RETRIES, NOT_FOUND, NotFoundError, PortalUnavailableError, RetryQueue, classify_error
+from circuit_breaker import get_circuit_breaker
+from pdf_combiner import IncrementalPdfCombiner
+from pdf_capture import print_page_to_pdf, write_pdf_atomic
+from tracking_extractor import (TrackingDataWriter, extract_tracking_records,
+                                records_from_json, records_to_json)
 
 class CtgPortTrackingAutomation:
-    def __init__(self, headless=True):
-        self.setup_logging()
+    # A filled-in cell of the results table; the search form's layout table and the
+    # empty table of a "No information found" page must not count as results
+    RESULT_SELECTOR = "table.result td:not(:empty)"
+    # Portal key used in the shared lookup cache
+    CACHE_PORTAL = "ctg"
+    # Seconds to wait for the search form after going back in history
+    FORM_BACK_WAIT = 2
+    # Steps whose element waits use learned timeouts (reported in the JSON summary)
+    WAIT_STEPS = ("navigate", "form_input", "submit", "form_load")
+    
+    def __init__(self, headless=True, tabs=1, max_wait=10, engine='selenium', render_pdfs=True,
+                 base_url="https://cpatos.gov.bd/pcs/", cache_ttl=3600, use_daemon=True, output='pdf',
+                 block_resources=False, reuse_form=True, validate_ids=True, log_verbosity='normal',
+                 recycle_after=DEFAULT_MAX_ITEMS, max_browser_mb=DEFAULT_MAX_RSS_MB, retries=DEFAULT_RETRIES):
+        self.setup_logging(log_verbosity)
         self.driver = None
-        self.wait = None
+        self.use_daemon = use_daemon
+        self.attached = False
+        self.owned_windows = []
+        self.readiness = None
         self.headless = headless
-        self.results = []
-        self.base_url = "https://cpatos.gov.bd/pcs/"
-        
-    def setup_logging(self):
-        """Setup logging configuration"""
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        log_filename = f"ctg_port_tracking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        log_path = os.path.join(log_dir, log_filename)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_path),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger('CtgPortTracking')
+        self.tabs = max(1, tabs)
+        self.max_wait = max_wait
+        self.engine = engine
+        self.render_pdfs = render_pdfs
+        self.http_engine = None
+        # Outcome of the container processed last; every outcome is streamed to the journal
+        self.last_result = None
+        self.base_url = base_url
+        # Skip third-party trackers, embeds and web fonts via the portal's blocking profile (resource_blocking.py)
+        self.block_resources = block_resources
+        # Submit from the already-loaded search form instead of reloading the portal per lookup
+        self.reuse_form = reuse_form
+        # Replace the browser after recycle_after items, past max_browser_mb or when lookups slow down
+        self.recycler = DriverRecycler(self.logger, max_items=recycle_after, max_rss_mb=max_browser_mb)
+        # Identifier pre-flight of the current input file (identifier_preflight.py)
+        self.validate_ids = validate_ids
+        self.preflight = None
+        self.rate_limiter = get_rate_limiter(urlparse(base_url).hostname, self.logger)
+        # Failed lookups come back through this queue up to retries more times (set per run)
+        self.retries = retries
+        self.retry_queue = None
+        self.cache = LookupCache(self.logger, ttl=cache_ttl) if cache_ttl > 0 else None
+        self.journal = None
+        self.combiner = None
+        # 'pdf', 'data' (tracking records only) or 'both'
+        self.output = output
+        self.data_writer = None
+        self.data_file = None
+        self.watchlist = None
+        # Watch mode, HTTP engine: html filename -> (change, records) until the page is rendered
+        self.pending_changes = {}
+        self.tab_handles = None
+        self.metrics = StepMetrics("ctg", self.logger)
+        # Element waits time out after a multiple of the step's observed p99 instead of a fixed 20 s
+        self.timeouts = AdaptiveTimeouts(self.metrics)
+        # Pauses lookups (every tab) while the portal is failing
+        self.breaker = get_circuit_breaker(urlparse(base_url).hostname, self.logger, metrics=self.metrics)
+        self.resumed = {}
+        
+    def setup_logging(self, verbosity='normal'):
+        """Setup logging configuration (queued, rotating JSON file in logs/ plus console)"""
+        self.logger = setup_automation_logging('CtgPortTracking', 'ctg_port_tracking', verbosity)
         
     def setup_driver(self):
         """Setup Chrome WebDriver with options"""
@@ -64,7 +119,20 @@ class CtgPortTrackingAutomation:
         # Disable automation detection
         chrome_options.add_experimental_option("useAutomationExtension", False)
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        PageReadiness.enable_network_events(chrome_options)
+        if self.block_resources:
+            for argument in chrome_arguments():
+                chrome_options.add_argument(argument)
+        
+        # In multi-tab mode navigation must not block, so other tabs can be driven meanwhile
+        if self.tabs > 1:
+            chrome_options.page_load_strategy = 'none'
         
+        # Attach to the pre-warmed Chrome daemon when one is running (see browser_daemon.py)
+        debugger_address = find_daemon() if self.use_daemon else None
+        if debugger_address:
+            chrome_options = attach_options(debugger_address, chrome_options)
+            
         try:
             # Use system-installed chromedriver for WebContainer compatibility
             chromedriver_paths = [
@@ -84,7 +152,17 @@ class CtgPortTrackingAutomation:
                 
             service = Service(chromedriver_path)
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.wait = WebDriverWait(self.driver, 20)
+            if debugger_address:
+                # Work in a tab of our own so concurrent jobs on the daemon don't collide
+                self.driver.switch_to.new_window('tab')
+                self.owned_windows.append(self.driver.current_window_handle)
+                self.attached = True
+                self.logger.info(f"⚡ Attached to Chrome daemon at {debugger_address}")
+            if self.block_resources:
+                apply_resource_blocking(self.driver, self.CACHE_PORTAL, self.logger)
+            # Network events are shared by all tabs, so multi-tab mode relies on DOM signals only
+            self.readiness = PageReadiness(self.driver, self.logger, max_wait=self.max_wait,
+                                           use_network=self.tabs == 1, metrics=self.metrics)
             
             # Ensure results directories exist
             os.makedirs("results", exist_ok=True)
@@ -103,7 +181,7 @@ class CtgPortTrackingAutomation:
             self.driver.get(self.base_url)
             
             # Wait for page to load
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            self.timeouts.until(self.driver, "navigate", EC.presence_of_element_located((By.TAG_NAME, "body")))
             self.logger.info("📍 Successfully navigated to CTG Port Authority portal")
             return True
             
@@ -111,201 +189,784 @@ class CtgPortTrackingAutomation:
             self.logger.error(f"❌ Failed to navigate to CTG Port Authority portal: {str(e)}")
             return False
             
+    def warm_up(self):
+        """Start a browser session and open the portal (HTTP engine: browser only, for rendering)"""
+        with self.metrics.span("driver_setup"):
+            if not self.setup_driver():
+                return False
+        if self.engine == 'http':
+            return True
+        with self.metrics.span("navigate"):
+            if not self.navigate_to_portal():
+                return False
+        if self.tabs > 1:
+            self.tab_handles = self.open_tabs()
+        return True
+        
+    def restart_driver_if_due(self):
+        """Quit a worn-out browser session and warm up a fresh one"""
+        reason = self.recycler.due
+        if not reason:
+            return
+        self.recycler.log_restart(reason)
+        self.metrics.add("driver_restarts")
+        self.close_driver()
+        self.tab_handles = None
+        if not self.warm_up():
+            # Still due, so the next lookup tries again
+            raise Exception("Chrome could not be restarted")
+        self.recycler.reset()
+        
     def process_container_number(self, container_number, index):
-        """Process a single container number"""
+        """Process a single container number, reusing resumed or cached results when possible"""
+        if container_number in self.resumed:
+            restored = True
+            self.restore_resumed_container(container_number)
+        else:
+            with self.metrics.span("cache_lookup"):
+                restored = self.restore_cached_container(container_number, index)
+        if not restored:
+            self.lookup_container(container_number, index)
+            
+        if self.retry_queue and self.retry_queue.defer(index, container_number, self.last_result):
+            # Comes back later through the retry queue; nothing is recorded yet
+            self.last_result = dict(self.last_result, status='retrying')
+            return None
+            
+        # Checkpoint the outcome so an interrupted run can resume from here
+        if self.journal:
+            self.journal.write(index, self.last_result)
+        # Data-only runs succeed without a PDF or result page
+        result_filename = self.last_result.get('pdf_file') or self.last_result.get('html_file')
+        self.add_to_report(index, result_filename)
+        return result_filename
+        
+    def lookup_container(self, container_number, index):
+        """Fetch a container from the portal, pacing the request and reporting the outcome to the limiter and breaker"""
+        try:
+            # Sit out a tripped breaker, then wait for a slot; the limiter adapts to portal health
+            with self.metrics.span("rate_limit_wait"):
+                self.breaker.wait()
+                self.rate_limiter.acquire()
+        except PortalUnavailableError as e:
+            self.record_error(container_number, e)
+            return
+        started = time.time()
+        
+        with self.metrics.span("lookup"):
+            if self.engine == 'http':
+                result_filename, records = self.process_container_number_http(container_number, index)
+            else:
+                result_filename, records = self.fetch_container_number(container_number, index)
+            
+        self.record_outcome(time.time() - started)
+        if self.last_result['status'] == 'success':
+            self.store_cached_container(container_number, result_filename, records)
+            
+    def record_outcome(self, latency):
+        """Report the lookup that produced last_result to the rate limiter, breaker and driver recycler"""
+        error_kind = self.last_result.get('error_kind')
+        if self.last_result['status'] == 'success' or error_kind == NOT_FOUND:
+            # A "not found" page is still a healthy, timely answer
+            self.rate_limiter.record_success(latency)
+        else:
+            self.rate_limiter.record_failure()
+        self.breaker.record(error_kind)
+        if self.driver:
+            # A worn-out session is replaced before the next lookup, not in the middle of this one
+            self.recycler.record(self.driver, latency)
+            
+    def add_to_report(self, index, result_filename):
+        """Append a finished container to the combined report (None marks a failed one)"""
+        if not self.combiner:
+            return
+        if result_filename and result_filename.endswith(".html"):
+            # Reported by render_html_results once the page has been printed
+            return
+        pdf_path = os.path.join("results", "pdfs", result_filename) if result_filename else None
+        self.combiner.add(index, pdf_path)
+        
+    def restore_resumed_container(self, container_number):
+        """Reuse the output and/or records of a container that succeeded in the run being resumed"""
+        entry = self.resumed[container_number]
+        self.logger.info(f"⏭️ Already completed in previous run: {container_number}")
+        result = {
+            'container_number': container_number,
+            'status': 'success',
+            'resumed': True,
+            'timestamp': entry['timestamp']
+        }
+        if entry.get('pdf_file'):
+            result['pdf_file'] = entry['pdf_file']
+        elif entry.get('html_file'):
+            result['html_file'] = entry['html_file']
+        if self.data_writer and 'records_at' in entry:
+            # Records of resumed containers were kept next to the journal
+            records = self.journal.read_records(entry['records_at'])
+            if records is None:
+                self.logger.warning(f"⚠️ Journal records for {container_number} unreadable, not in the data file")
+            else:
+                self.data_writer.write(records_from_json(records))
+                result['records'] = len(records)
+        self.last_result = result
+        # Data-only runs have neither a PDF nor a result page
+        return result.get('pdf_file') or result.get('html_file')
+        
+    def restore_cached_container(self, container_number, index):
+        """Restore a fresh cached PDF and/or tracking records for this container, returns True on a hit"""
+        if not self.cache:
+            return False
+        cached = self.cache.get(self.CACHE_PORTAL, container_number)
+        if not cached:
+            return False
+        records = (cached['status'] or {}).get('records')
+        if (self.output != 'data' and not cached['pdf']) or (self.output != 'pdf' and records is None):
+            return False
+            
+        result = {
+            'container_number': container_number,
+            'status': 'success',
+            'cached': True,
+            'timestamp': datetime.now().isoformat()
+        }
+        if self.output != 'data':
+            pdf_filename = f"{index:03d}_{container_number}_tracking.pdf"
+            write_pdf_atomic(os.path.join("results", "pdfs", pdf_filename), cached['pdf'])
+            result['pdf_file'] = pdf_filename
+        if self.output != 'pdf':
+            self.write_records(container_number, records_from_json(records))
+            result['records'] = len(records)
+            
+        fetched_at = datetime.fromtimestamp(cached['fetched_at']).strftime('%Y-%m-%d %H:%M:%S')
+        self.logger.info(f"♻️ Using cached result for {container_number} (fetched {fetched_at})")
+        self.last_result = result
+        return True
+        
+    def store_cached_container(self, container_number, result_filename, records=None, keep_records=False):
+        """
+        Save a freshly rendered PDF and/or extracted tracking records in the lookup cache
+        (HTML result pages are not cached). keep_records keeps the records stored at
+        lookup time when the PDF is only rendered afterwards.
+        """
+        if not self.cache:
+            return
+        pdf_filename = result_filename if result_filename and result_filename.endswith(".pdf") else None
+        if not pdf_filename and records is None:
+            return
         try:
+            pdf = None
+            if pdf_filename:
+                with open(os.path.join("results", "pdfs", pdf_filename), "rb") as f:
+                    pdf = f.read()
+            status = {'status': 'success'}
+            if records is not None:
+                status['records'] = records_to_json(records)
+            elif keep_records:
+                cached = self.cache.get(self.CACHE_PORTAL, container_number)
+                cached_records = ((cached or {}).get('status') or {}).get('records')
+                if cached_records is not None:
+                    status['records'] = cached_records
+            self.cache.put(self.CACHE_PORTAL, container_number, pdf=pdf, status=status)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not cache result for {container_number}: {str(e)}")
+            
+    def fetch_container_number(self, container_number, index):
+        """Look up a single container number in the browser"""
+        try:
+            self.restart_driver_if_due()
             self.logger.info(f"🔍 Processing container number {index}: {container_number}")
             
-            # Navigate to the portal (in case we need to refresh)
-            self.driver.get(self.base_url)
+            # Get the search form back, reloading the portal only when it can't be reused
+            with self.metrics.span("navigate"):
+                reused = self.open_search_form()
+            
+            try:
+                self.submit_container_search(container_number)
+            except (TimeoutException, StaleElementReferenceException):
+                if not reused:
+                    raise
+                self.logger.warning("⚠️ Reused search form went stale, reloading the portal")
+                with self.metrics.span("navigate"):
+                    self.reload_search_form()
+                self.submit_container_search(container_number)
             
+            # Wait until the results page has actually loaded
+            with self.metrics.span("page_ready"):
+                ready = self.readiness.wait_until_ready(self.RESULT_SELECTOR, label=f"Container {container_number}")
+            self.check_found(container_number, ready)
+            
+            return self.save_results(container_number, index)
+            
+        except Exception as e:
+            self.record_error(container_number, e)
+            return None, None
+            
+    def check_found(self, container_number, ready):
+        """
+        A page that finished loading without a filled-in tracking table means the
+        portal has no such container (the same test the HTTP engine applies)
+        """
+        if ready and not has_results(self.driver.page_source):
+            raise NotFoundError(f"Container {container_number} not found on the portal")
+            
+    def open_search_form(self):
+        """
+        Make the search form available on the current tab, cheapest way first: the
+        page already shows it, or it is one step back in history. Falls back to a
+        full reload; returns True if the form was reused without one.
+        """
+        if self.reuse_form and self.on_portal():
+            if self.search_form_present():
+                self.metrics.add("form_reused")
+                return True
+            try:
+                self.driver.back()
+                WebDriverWait(self.driver, self.FORM_BACK_WAIT).until(
+                    EC.visibility_of_element_located((By.ID, "containerLocation"))
+                )
+                self.metrics.add("form_back")
+                return True
+            except Exception:
+                self.logger.info("🔄 Search form not in history, reloading the portal")
+        self.reload_search_form()
+        return False
+        
+    def reload_search_form(self):
+        self.driver.get(self.base_url)
+        self.metrics.add("form_reloaded")
+        
+    def on_portal(self):
+        """True if the current tab shows a portal page (not a blank tab or a local file)"""
+        try:
+            return urlparse(self.driver.current_url).netloc == urlparse(self.base_url).netloc
+        except Exception:
+            return False
+        
+    def search_form_present(self):
+        """Instant check for a usable search form on the current page"""
+        try:
+            fields = self.driver.find_elements(By.ID, "containerLocation")
+            return bool(fields) and fields[0].is_displayed() and fields[0].is_enabled()
+        except StaleElementReferenceException:
+            return False
+        
+    def submit_container_search(self, container_number):
+        """Fill the search form on the current page and submit it"""
+        with self.metrics.span("form_input"):
             # Wait for the input field to be present
-            input_field = self.wait.until(
-                EC.presence_of_element_located((By.ID, "containerLocation"))
+            input_field = self.timeouts.until(
+                self.driver, "form_input", EC.presence_of_element_located((By.ID, "containerLocation"))
             )
             
             # Clear and enter container number
             input_field.clear()
             input_field.send_keys(container_number)
-            self.logger.info(f"✅ Entered container number: {container_number}")
-            
-            # Find and click the search button
-            submit_button = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "submit"))
+        self.logger.info(f"✅ Entered container number: {container_number}")
+        
+        # Find and click the search button
+        with self.metrics.span("submit"):
+            submit_button = self.timeouts.until(
+                self.driver, "submit", EC.element_to_be_clickable((By.ID, "submit"))
             )
+            self.readiness.arm()
             submit_button.click()
-            self.logger.info("✅ Clicked search button")
-            
-            # Wait for the results page to load
-            time.sleep(5)  # Allow page to fully load
-            
-            # Check if results are loaded by waiting for page content
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        self.logger.info("✅ Clicked search button")
+        
+    def print_pdf(self, pdf_path):
+        """Print the current page to a PDF file using Chrome DevTools Protocol"""
+        print_page_to_pdf(self.driver, pdf_path)
             
+    def save_results(self, container_number, index):
+        """
+        Extract tracking records and/or print the current results page to PDF and
+        record the result, returns (pdf_filename, records)
+        """
+        result = {
+            'container_number': container_number,
+            'status': 'success',
+            'timestamp': datetime.now().isoformat()
+        }
+        
+        records = None
+        change = None
+        print_pdf = self.output != 'data'
+        if self.output != 'pdf':
+            records = self.extract_records(container_number, self.driver.page_source)
+            result['records'] = len(records)
+            if self.watchlist:
+                # Watch mode: unchanged containers need no new PDF
+                change = self.snapshot_change(container_number, records)
+                result['changed'] = change is not None
+                print_pdf = print_pdf and result['changed']
+        
+        pdf_filename = None
+        if print_pdf:
             # Generate PDF of the results page
             pdf_filename = f"{index:03d}_{container_number}_tracking.pdf"
             pdf_path = os.path.join("results", "pdfs", pdf_filename)
-            
-            # Generate PDF using Chrome DevTools Protocol
-            pdf_data = self.driver.execute_cdp_cmd("Page.printToPDF", {
-                "format": "A4",
-                "printBackground": True,
-                "marginTop": 0.4,
-                "marginBottom": 0.4,
-                "marginLeft": 0.4,
-                "marginRight": 0.4
-            })
-            
-            with open(pdf_path, "wb") as f:
-                f.write(base64.b64decode(pdf_data['data']))
+            with self.metrics.span("pdf_print"):
+                self.print_pdf(pdf_path)
+            result['pdf_file'] = pdf_filename
             
             self.logger.info(f"✅ Saved PDF for {container_number}: {pdf_filename}")
+        
+        # The new snapshot is stored only now that the container's outputs are written
+        if change:
+            self.watchlist.commit(change, records)
+        
+        # Record successful result
+        self.last_result = result
+        
+        return pdf_filename, records
+        
+    def extract_records(self, container_number, html):
+        """Parse the results page into tracking records and stream them to the data file"""
+        with self.metrics.span("extract"):
+            records = extract_tracking_records(html, container_number, self.CACHE_PORTAL)
+        if self.data_writer:
+            self.write_records(container_number, records)
+        self.logger.info(f"✅ Extracted {len(records)} tracking records for {container_number}")
+        return records
+        
+    def write_records(self, container_number, records):
+        """Stream records to the data file, keeping a copy next to the journal for --resume"""
+        self.data_writer.write(records)
+        if self.journal:
+            self.journal.write_records(container_number, records_to_json(records))
+        
+    def snapshot_change(self, container_number, records):
+        """Diff fresh records against the watchlist snapshot, returns the change event or None"""
+        event = self.watchlist.check(self.CACHE_PORTAL, container_number, records)
+        if event is None:
+            self.logger.info(f"💤 No change for {container_number}")
+            return None
+        self.logger.info(f"🔔 {container_number} {event['change']}: {event['previous_status']} → {event['status']}")
+        return event
+        
+    def commit_rendered_change(self, html_filename, rendered):
+        """
+        Store the watchlist snapshot behind a saved result page once its PDF exists.
+        An unrendered page's change is dropped, so the next cycle reports it again.
+        """
+        pending = self.pending_changes.pop(html_filename, None)
+        if pending and rendered:
+            self.watchlist.commit(*pending)
+        
+    def process_container_number_http(self, container_number, index):
+        """Look up a single container number without a browser"""
+        try:
+            self.logger.info(f"🔍 Processing container number {index}: {container_number}")
+            
+            with self.metrics.span("http_lookup"):
+                result_url, html = self.http_engine.lookup(container_number)
+            if not has_results(html):
+                raise NotFoundError(f"Container {container_number} not found on the portal")
             
-            # Record successful result
-            self.results.append({
+            result = {
                 'container_number': container_number,
                 'status': 'success',
-                'pdf_file': pdf_filename,
                 'timestamp': datetime.now().isoformat()
-            })
+            }
             
-            return pdf_filename
+            # Records come straight from the fetched HTML; no browser is involved
+            records = None
+            change = None
+            keep_page = self.output != 'data'
+            if self.output != 'pdf':
+                records = self.extract_records(container_number, html)
+                result['records'] = len(records)
+                if self.watchlist:
+                    # Watch mode: only changed containers are rendered to PDF
+                    change = self.snapshot_change(container_number, records)
+                    result['changed'] = change is not None
+                    keep_page = keep_page and result['changed']
             
-        except Exception as e:
-            self.logger.error(f"❌ Error processing container {container_number}: {str(e)}")
-            self.results.append({
-                'container_number': container_number,
-                'status': 'error',
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            })
-            return None
+            html_filename = None
+            if keep_page:
+                # Keep the result page so it can be rendered to PDF after all lookups
+                html_filename = f"{index:03d}_{container_number}_tracking.html"
+                html_path = os.path.join("results", "html", html_filename)
+                with open(html_path, "w", encoding="utf-8") as f:
+                    f.write(add_base_href(html, result_url))
+                result['html_file'] = html_filename
+                
+                self.logger.info(f"✅ Saved result page for {container_number}: {html_filename}")
             
-    def read_container_numbers_from_file(self, file_path):
-        """Read container numbers from CSV or Excel file"""
-        try:
-            self.logger.info(f"📋 Reading container numbers from file...")
-            self.logger.info(f"📁 File path: {file_path}")
+            if change and html_filename and self.render_pdfs:
+                # Stored by render_html_results once the page has been printed
+                self.pending_changes[html_filename] = (change, records)
+            elif change:
+                self.watchlist.commit(change, records)
             
-            # Auto-detect file type
-            ext = os.path.splitext(file_path)[1].lower()
-            self.logger.info(f"📄 File extension detected: {ext}")
+            self.last_result = result
             
-            if ext == ".csv":
-                self.logger.info("📊 Reading as CSV file...")
-                df = pd.read_csv(file_path)
-            elif ext in [".xls", ".xlsx"]:
-                self.logger.info("📊 Reading as Excel file...")
-                df = pd.read_excel(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {ext}. Please use .csv or .xlsx")
+            return html_filename, records
             
-            self.logger.info(f"📊 File loaded successfully with {len(df)} rows")
-            self.logger.info(f"📋 Columns found: {list(df.columns)}")
+        except Exception as e:
+            self.record_error(container_number, e)
+            return None, None
             
-            # Look for container column (flexible column names)
-            container_column = None
-            possible_columns = ['container_number', 'container number', 'container', 'number', 'tracking', 'reference']
+    def render_html_results(self, html_files):
+        """Render saved result pages to PDF in one browser session, returns the PDF files"""
+        if not self.render_pdfs:
+            self.logger.info("⏭️ PDF rendering skipped, keeping HTML result pages")
+            return html_files
+        if not html_files:
+            return []
+        if self.driver is None:
+            with self.metrics.span("driver_setup"):
+                ready = self.setup_driver()
+            if not ready:
+                self.logger.error("❌ Could not start Chrome to render PDFs, keeping HTML result pages")
+                for html_filename in html_files:
+                    self.commit_rendered_change(html_filename, False)
+                return html_files
             
-            for col in df.columns:
-                col_lower = col.lower().strip()
-                if col_lower in possible_columns or any(term in col_lower for term in ['container', 'number', 'tracking']):
-                    container_column = col
-                    break
-                    
-            if container_column is None:
-                # If no specific column found, use first column
-                container_column = df.columns[0]
-                self.logger.warning(f"⚠️ No container column found, using first column: {container_column}")
-            else:
-                self.logger.info(f"📋 Using column: {container_column}")
+        self.logger.info(f"🖨️ Rendering {len(html_files)} result pages to PDF...")
+        pdf_files = []
+        
+        for html_filename in html_files:
+            if html_filename.endswith(".pdf"):
+                # Restored from the lookup cache, nothing to render
+                pdf_files.append(html_filename)
+                continue
+            pdf_filename = html_filename[:-len(".html")] + ".pdf"
+            # Saved as <index>_<container>_tracking.html
+            index, container_number = html_filename.split("_")[:2]
+            index = int(index)
+            try:
+                self.restart_driver_if_due()
+                html_path = os.path.abspath(os.path.join("results", "html", html_filename))
+                started = time.time()
+                with self.metrics.span("pdf_render"):
+                    self.driver.get("file://" + html_path)
+                    self.print_pdf(os.path.join("results", "pdfs", pdf_filename))
+                self.recycler.record(self.driver, time.time() - started)
+                pdf_files.append(pdf_filename)
+                self.commit_rendered_change(html_filename, True)
+                self.store_cached_container(container_number, pdf_filename, keep_records=True)
+                self.add_to_report(index, pdf_filename)
+            except Exception as e:
+                self.logger.error(f"❌ Failed to render {html_filename}: {str(e)}")
+                self.commit_rendered_change(html_filename, False)
+                self.add_to_report(index, None)
+                
+        self.logger.info(f"✅ Rendered {len(pdf_files)} PDFs")
+        return pdf_files
+        
+    def record_error(self, container_number, error):
+        """Record a failed container lookup, classified so retries and the breaker can tell timeouts from misses"""
+        error_kind = classify_error(error)
+        self.logger.error(f"❌ Error processing container {container_number} ({error_kind}): {str(error)}")
+        self.last_result = {
+            'container_number': container_number,
+            'status': 'error',
+            'error': str(error),
+            'error_kind': error_kind,
+            'timestamp': datetime.now().isoformat()
+        }
             
-            # Get the data from the column
-            column_data = df[container_column].dropna()
-            self.logger.info(f"📊 Raw column data: {column_data.tolist()}")
+    def open_tabs(self):
+        """Open one isolated browser context (or plain tab) per concurrent lookup"""
+        handles = [self.driver.current_window_handle]
+        
+        for _ in range(self.tabs - 1):
+            try:
+                # Separate browser context = separate cookies/storage inside the same Chrome process
+                context = self.driver.execute_cdp_cmd("Target.createBrowserContext", {"disposeOnDetach": True})
+                target = self.driver.execute_cdp_cmd("Target.createTarget", {
+                    "url": "about:blank",
+                    "browserContextId": context['browserContextId']
+                })
+                handle = target['targetId']
+                if handle not in self.driver.window_handles:
+                    raise Exception("context target not visible to WebDriver")
+            except Exception as e:
+                self.logger.warning(f"⚠️ Isolated context unavailable, using a plain tab: {str(e)}")
+                self.driver.switch_to.new_window('tab')
+                handle = self.driver.current_window_handle
+            if self.block_resources:
+                # Blocked URLs are per tab
+                self.driver.switch_to.window(handle)
+                apply_resource_blocking(self.driver, self.CACHE_PORTAL, self.logger)
+            handles.append(handle)
+            self.owned_windows.append(handle)
             
-            # Convert to string and clean up
-            container_numbers = column_data.astype(str).tolist()
+        self.logger.info(f"🗂️ Opened {len(handles)} browser tabs for concurrent lookups")
+        return handles
+        
+    def process_container_batch(self, slots):
+        """
+        Run one lookup per tab concurrently. Page loads overlap because the driver
+        only triggers navigation in each tab and moves on (page load strategy 'none').
+        """
+        # A worn-out session is replaced between batches, which also reopens the tabs
+        try:
+            self.restart_driver_if_due()
+        except Exception as e:
+            for slot in slots:
+                slot['error'] = e
+        for slot, handle in zip(slots, self.tab_handles or []):
+            slot['handle'] = handle
+            
+        # Phase 1: get the search form back in every tab, reusing the one on screen or in history
+        for slot in slots:
+            if 'error' in slot:
+                continue
+            try:
+                with self.metrics.span("rate_limit_wait"):
+                    self.breaker.wait()
+                    self.rate_limiter.acquire()
+            except PortalUnavailableError as e:
+                # Never sent, so its failure says nothing new about the portal
+                slot['error'] = e
+                slot['sent'] = False
+                continue
+            started = time.time()
+            try:
+                self.driver.switch_to.window(slot['handle'])
+                with log_item(slot['container']):
+                    self.logger.info(f"🔍 Processing container number {slot['index']}: {slot['container']}")
+                with self.metrics.span("navigate"):
+                    slot['form'] = self.start_search_form_in_tab()
+            except Exception as e:
+                slot['error'] = e
+            self.add_slot_latency(slot, started)
+                
+        # Phase 2: fill and submit the form in every tab
+        for slot in slots:
+            if 'error' in slot:
+                continue
+            started = time.time()
+            try:
+                self.driver.switch_to.window(slot['handle'])
+                with log_item(slot['container']):
+                    self.submit_search_in_tab(slot)
+            except Exception as e:
+                slot['error'] = e
+            self.add_slot_latency(slot, started)
+                
+        # Phase 3: wait for each results page and print/extract it from its own tab
+        pdf_filenames = []
+        for slot in slots:
+            slot['records'] = None
+            started = time.time()
+            with log_item(slot['container']):
+                if 'error' in slot:
+                    self.record_error(slot['container'], slot['error'])
+                    pdf_filenames.append(None)
+                else:
+                    try:
+                        self.driver.switch_to.window(slot['handle'])
+                        with self.metrics.span("page_ready"):
+                            ready = self.readiness.wait_until_ready(self.RESULT_SELECTOR,
+                                                                    label=f"Container {slot['container']}")
+                        self.check_found(slot['container'], ready)
+                        pdf_filename, slot['records'] = self.save_results(slot['container'], slot['index'])
+                        pdf_filenames.append(pdf_filename)
+                    except Exception as e:
+                        self.record_error(slot['container'], e)
+                        pdf_filenames.append(None)
+            self.add_slot_latency(slot, started)
+            slot['result'] = self.last_result
+                
+        return pdf_filenames
+        
+    @staticmethod
+    def add_slot_latency(slot, started):
+        """
+        A tab's lookup latency is the time spent driving that tab, so overlapping
+        lookups each report their own cost rather than the whole batch's
+        """
+        slot['latency'] = slot.get('latency', 0.0) + time.time() - started
+        
+    def start_search_form_in_tab(self):
+        """
+        Non-blocking counterpart of open_search_form for the current tab: keep the
+        form on screen, or start going back to it or reloading the portal. Returns
+        'reused', 'back' or 'reload'; submit_search_in_tab waits for the page.
+        """
+        if self.reuse_form and self.on_portal():
+            if self.search_form_present():
+                self.metrics.add("form_reused")
+                return 'reused'
+            # Mark the old document so the form is never looked for in a page being replaced
+            self.driver.execute_script("window.__ctgStale = true;")
+            self.driver.back()
+            return 'back'
+        self.driver.execute_script("window.__ctgStale = true;")
+        self.reload_search_form()
+        return 'reload'
+        
+    def submit_search_in_tab(self, slot):
+        """Wait for the form started by start_search_form_in_tab and submit the slot's container"""
+        if slot['form'] != 'reused':
+            with self.metrics.span("form_load"):
+                self.timeouts.until(self.driver, "form_load",
+                                    lambda d: d.execute_script("return window.__ctgStale !== true"))
+        if slot['form'] == 'back':
+            try:
+                WebDriverWait(self.driver, self.FORM_BACK_WAIT).until(
+                    EC.visibility_of_element_located((By.ID, "containerLocation"))
+                )
+                self.metrics.add("form_back")
+            except TimeoutException:
+                self.logger.info("🔄 Search form not in history, reloading the portal")
+                slot['form'] = self.reload_search_form_in_tab()
+        try:
+            self.submit_container_search(slot['container'])
+        except (TimeoutException, StaleElementReferenceException):
+            if slot['form'] == 'reload':
+                raise
+            self.logger.warning("⚠️ Reused search form went stale, reloading the portal")
+            slot['form'] = self.reload_search_form_in_tab()
+            self.submit_container_search(slot['container'])
             
-            # Remove any empty strings or whitespace-only entries
-            container_numbers = [container.strip() for container in container_numbers if container.strip()]
+    def reload_search_form_in_tab(self):
+        """Reload the portal in the current tab and wait for the form (blocking, the fallback path)"""
+        with self.metrics.span("navigate"):
+            self.driver.execute_script("window.__ctgStale = true;")
+            self.reload_search_form()
+        with self.metrics.span("form_load"):
+            self.timeouts.until(self.driver, "form_load",
+                                lambda d: d.execute_script("return window.__ctgStale !== true"))
+        return 'reload'
+        
+    def process_all_containers_in_tabs(self, items):
+        """Process (index, container number) pairs concurrently in several tabs of one Chrome instance"""
+        successful_pdfs = []
+        failed_containers = []
+        # Tabs stay open across watch cycles
+        if self.tab_handles is None:
+            self.tab_handles = self.open_tabs()
+        
+        def run_batch(batch):
+            # Tab handles are assigned by process_container_batch, after any browser restart
+            slots = [{'index': index, 'container': container} for index, container in batch]
             
-            # Remove 'nan' values that might come from pandas
-            container_numbers = [container for container in container_numbers if container.lower() != 'nan']
+            for slot, pdf_filename in zip(slots, self.process_container_batch(slots)):
+                self.last_result = slot['result']
+                if slot.get('sent', True):
+                    self.record_outcome(slot.get('latency', 0.0))
+                if self.retry_queue.defer(slot['index'], slot['container'], slot['result']):
+                    continue
+                if self.journal:
+                    self.journal.write(slot['index'], slot['result'])
+                self.add_to_report(slot['index'], pdf_filename)
+                if slot['result']['status'] == 'success':
+                    self.store_cached_container(slot['container'], pdf_filename, slot['records'])
+                    if pdf_filename:
+                        successful_pdfs.append(pdf_filename)
+                else:
+                    failed_containers.append(slot['container'])
+                    
+        # Cached containers are restored right away; the rest fill up one tab batch at a time
+        pending = []
+        for entry in items:
+            if entry is None:
+                # The retry queue is waiting on the partial batch
+                run_batch(pending)
+                pending = []
+                continue
+            index, container = entry
+            if container in self.resumed:
+                pdf_filename = self.restore_resumed_container(container)
+                self.retry_queue.defer(index, container, self.last_result)
+                if self.journal:
+                    self.journal.write(index, self.last_result)
+                self.add_to_report(index, pdf_filename)
+                if pdf_filename:
+                    successful_pdfs.append(pdf_filename)
+                continue
+            if self.restore_cached_container(container, index):
+                self.retry_queue.defer(index, container, self.last_result)
+                if self.journal:
+                    self.journal.write(index, self.last_result)
+                pdf_filename = self.last_result.get('pdf_file')
+                self.add_to_report(index, pdf_filename)
+                if pdf_filename:
+                    successful_pdfs.append(pdf_filename)
+                continue
+            pending.append((index, container))
+            if len(pending) == self.tabs:
+                run_batch(pending)
+                pending = []
+        if pending:
+            run_batch(pending)
             
-            # Log the actual container numbers being processed
-            self.logger.info(f"📊 Container numbers to process:")
-            for i, container in enumerate(container_numbers, 1):
-                self.logger.info(f"   {i}. {container}")
+        # Keep report order by input row even though cached items finished first
+        successful_pdfs.sort(key=lambda filename: int(filename.split("_", 1)[0]))
+        return successful_pdfs, failed_containers
+        
+    def iter_container_numbers_from_file(self, file_path):
+        """Stream container numbers from CSV or Excel file without loading the whole sheet"""
+        try:
+            self.logger.info(f"📋 Reading container numbers from file...")
+            self.logger.info(f"📁 File path: {file_path}")
             
-            self.logger.info(f"📊 Found {len(container_numbers)} container numbers to process")
+            # Look for container column by header only (flexible column names)
+            possible_columns = ['container_number', 'container number', 'container', 'number', 'tracking', 'reference']
+            match_terms = ['container', 'number', 'tracking']
             
-            return container_numbers
+            rows = open_identifier_stream(file_path, possible_columns, match_terms, self.logger,
+                                          label="container numbers", with_rows=True)
+            # Normalize, validate and de-duplicate before anything reaches the portal
+            self.preflight = IdentifierPreflight('container', self.logger, validate=self.validate_ids)
+            return self.preflight.filter(rows)
             
         except Exception as e:
             self.logger.error(f"❌ Failed to read file: {str(e)}")
             self.logger.error(f"❌ File path was: {file_path}")
             self.logger.error(f"❌ File exists: {os.path.exists(file_path)}")
-            return []
+            return iter([])
+            
+    def read_container_numbers_from_file(self, file_path):
+        """Read container numbers from CSV or Excel file"""
+        return list(self.iter_container_numbers_from_file(file_path))
             
     def process_all_containers(self, container_numbers):
-        """Process all container numbers"""
+        """Process all container numbers, retrying failed lookups once the rest have had their turn"""
+        self.retry_queue = RetryQueue(self.logger, retries=self.retries, metrics=self.metrics)
+        # The breaker is process-wide; a portal given up on by an earlier run gets another chance
+        self.breaker.begin_run()
+        if self.tabs > 1 and self.engine != 'http':
+            items = self.retry_queue.items(enumerate(container_numbers, start=1), batches=True)
+            return self.process_all_containers_in_tabs(items)
+            
         successful_pdfs = []
         failed_containers = []
         
-        for i, container in enumerate(container_numbers, start=1):
-            self.logger.info(f"🔍 Processing container number {i}/{len(container_numbers)}: {container}")
-            
-            pdf_filename = self.process_container_number(container, i)
+        for i, container in self.retry_queue.items(enumerate(container_numbers, start=1)):
+            with log_item(container):
+                self.logger.info(f"🔍 Processing container number {i}: {container}")
+                
+                pdf_filename = self.process_container_number(container, i)
             
-            if pdf_filename:
-                successful_pdfs.append(pdf_filename)
-            else:
+            if self.last_result['status'] == 'retrying':
+                continue
+            if self.last_result['status'] != 'success':
                 failed_containers.append(container)
-                
-            # Wait between requests to avoid rate limiting
-            time.sleep(3)
+            elif pdf_filename:
+                successful_pdfs.append(pdf_filename)
                 
         return successful_pdfs, failed_containers
         
     def generate_combined_report(self, successful_pdfs):
-        """Generate combined PDF report"""
+        """Finish the combined PDF report that was built while containers were processed"""
         try:
-            if not successful_pdfs:
+            if self.combiner is None:
+                # Not built during the run; combine the finished PDFs now
+                self.open_report()
+                for i, pdf_filename in enumerate(successful_pdfs, start=1):
+                    self.add_to_report(i, pdf_filename)
+                    
+            # HTML-only runs (--engine http --no-pdf) have nothing to combine
+            combiner, self.combiner = self.combiner, None
+            if not combiner.close():
                 return None
                 
-            self.logger.info("📦 Combining all PDFs into a single report...")
-            
-            # Create combined report filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            combined_filename = f"ctg_port_tracking_report_{timestamp}.pdf"
-            combined_path = os.path.join("results", combined_filename)
-            
-            # Try to combine PDFs using PyPDF2
-            try:
-                from PyPDF2 import PdfMerger
-                
-                merger = PdfMerger()
-                
-                for pdf_filename in successful_pdfs:
-                    pdf_path = os.path.join("results", "pdfs", pdf_filename)
-                    if os.path.exists(pdf_path):
-                        merger.append(pdf_path)
-                        self.logger.info(f"📄 Added {pdf_filename} to combined report")
-                
-                merger.write(combined_path)
-                merger.close()
-                
-                self.logger.info(f"✅ Combined {len(successful_pdfs)} PDFs into single report")
-                
-            except ImportError:
-                # Fallback: copy first PDF if PyPDF2 not available
-                self.logger.warning("⚠️ PyPDF2 not available, using first PDF as combined report")
-                if successful_pdfs:
-                    import shutil
-                    first_pdf_path = os.path.join("results", "pdfs", successful_pdfs[0])
-                    shutil.copy2(first_pdf_path, combined_path)
-                
+            combined_filename = os.path.basename(combiner.path)
+            self.logger.info(f"✅ Combined {combiner.document_count} PDFs into single report")
             self.logger.info(f"💾 Combined report saved: {combined_filename}")
             return combined_filename
             
@@ -321,6 +982,9 @@ class CtgPortTrackingAutomation:
             # Generate timestamp
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
+            # Totals were counted as results streamed in; data-only runs succeed without PDFs
+            journal = self.journal
+            
             # Create automation log file
             log_filename = f"ctg_port_automation_log_{timestamp}.txt"
             log_path = os.path.join("results", log_filename)
@@ -328,10 +992,10 @@ class CtgPortTrackingAutomation:
             with open(log_path, 'w') as f:
                 f.write("=== CTG PORT AUTHORITY TRACKING AUTOMATION LOG ===\n")
                 f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total Processed: {len(self.results)}\n")
-                f.write(f"Successful: {len(successful_pdfs)}\n")
-                f.write(f"Failed: {len(failed_containers)}\n")
-                f.write(f"Success Rate: {(len(successful_pdfs) / len(self.results) * 100):.1f}%\n\n")
+                f.write(f"Total Processed: {journal.total}\n")
+                f.write(f"Successful: {journal.successful}\n")
+                f.write(f"Failed: {journal.failed}\n")
+                f.write(f"Success Rate: {journal.success_rate()}\n\n")
                 
                 f.write("=== SUCCESSFUL PDFS ===\n")
                 for pdf in successful_pdfs:
@@ -341,11 +1005,16 @@ class CtgPortTrackingAutomation:
                 for container in failed_containers:
                     f.write(f"❌ {container}\n")
                 
+                if self.preflight and self.preflight.invalid:
+                    f.write("\n=== SKIPPED ROWS ===\n")
+                    for row in self.preflight.invalid:
+                        f.write(f"⏭️ Row {row['row']}: {row['value']} ({row['error']})\n")
+                
                 f.write("\n=== DETAILED RESULTS ===\n")
-                for result in self.results:
+                for result in journal.entries():
                     f.write(f"Container: {result['container_number']} | Status: {result['status']} | Time: {result['timestamp']}\n")
                     if 'error' in result:
-                        f.write(f"   Error: {result['error']}\n")
+                        f.write(f"   Error ({result.get('error_kind', 'error')}): {result['error']}\n")
             
             # Generate JSON summary
             summary_filename = f"ctg_port_tracking_summary_{timestamp}.json"
@@ -353,17 +1022,23 @@ class CtgPortTrackingAutomation:
             
             summary_data = {
                 'timestamp': datetime.now().isoformat(),
-                'total_processed': len(self.results),
-                'successful': len(successful_pdfs),
-                'failed': len(failed_containers),
-                'success_rate': f"{(len(successful_pdfs) / len(self.results) * 100):.1f}%" if self.results else "0%",
+                'total_processed': journal.total,
+                'successful': journal.successful,
+                'failed': journal.failed,
+                'success_rate': journal.success_rate(),
+                'errors_by_kind': dict(journal.error_kinds),
                 'successful_pdfs': successful_pdfs,
                 'failed_containers': failed_containers,
-                'detailed_results': self.results
+                'data_file': self.data_file,
+                'timings': self.metrics.summary(),
+                'step_timeouts': self.timeouts.learned_timeouts(self.WAIT_STEPS),
+                'resource_blocking': self.block_resources,
+                'network': self.metrics.counters(),
+                'preflight': self.preflight.report() if self.preflight else None,
+                'journal': journal.path
             }
-            
-            with open(summary_path, 'w') as f:
-                json.dump(summary_data, f, indent=2)
+            # detailed_results are streamed from the journal
+            journal.write_summary(summary_path, summary_data)
                 
             self.logger.info(f"📋 Summary report saved: {summary_filename}")
             self.logger.info(f"📋 Log file saved: {log_filename}")
@@ -376,35 +1051,103 @@ class CtgPortTrackingAutomation:
             
     def cleanup(self):
         """Clean up resources"""
+        try:
+            if self.http_engine:
+                self.http_engine.close()
+        except Exception as e:
+            self.logger.error(f"❌ Error during cleanup: {str(e)}")
+        self.close_driver()
+            
+    def close_driver(self):
+        """Quit this job's browser session (only its own tabs when attached to the daemon)"""
         try:
             if self.driver:
                 self.logger.info("🔒 Closing browser and cleaning up...")
+                if self.attached:
+                    # Leave the daemon running; only close the tabs this job opened
+                    for handle in self.owned_windows:
+                        self.driver.switch_to.window(handle)
+                        self.driver.close()
                 self.driver.quit()
                 self.logger.info("✅ Cleanup completed")
         except Exception as e:
             self.logger.error(f"❌ Error during cleanup: {str(e)}")
+        finally:
+            self.driver = None
+            self.attached = False
+            self.owned_windows = []
+            
+    def open_journal(self, resume=None):
+        """Start a new checkpoint journal, or continue the one of the run being resumed"""
+        if resume:
+            self.resumed = RunJournal.load_completed(resume, 'container_number', self.logger, self.output)
+        journal_path = resume or RunJournal.new_path("ctg_port_tracking")
+        self.journal = RunJournal(journal_path, self.logger)
+        self.logger.info(f"📒 Checkpoint journal: {journal_path}")
+        
+    def open_report(self):
+        """Start the combined PDF report; each container is appended as soon as it finishes"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        combined_path = os.path.join("results", f"ctg_port_tracking_report_{timestamp}.pdf")
+        self.combiner = IncrementalPdfCombiner(combined_path, self.logger)
+        
+    def open_data_writer(self):
+        """Start the tracking data file when records are requested (--output data|both)"""
+        if self.output != 'pdf':
+            self.data_writer = TrackingDataWriter("ctg_port_tracking_data", self.logger)
+            self.logger.info(f"🗃️ Tracking data file: {self.data_writer.filename}")
             
-    def run_automation(self, file_path, headless=True):
+    def close_data_writer(self):
+        """Finish the tracking data file, returns its filename or None"""
+        if self.data_writer:
+            self.data_file = self.data_writer.close()
+            self.data_writer = None
+        return self.data_file
+        
+    def write_metrics(self):
+        """Write the run's step metrics, also when it failed or stopped early"""
+        try:
+            os.makedirs("results", exist_ok=True)
+            self.logger.info(f"⏱️ Step metrics saved: {self.metrics.write_prometheus('ctg_port_tracking')}")
+            self.metrics.log_summary()
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not write step metrics: {str(e)}")
+            
+    def run_automation(self, file_path, headless=True, resume=None):
         """Main automation workflow"""
         try:
             self.logger.info("🚀 Starting CTG Port Authority tracking automation...")
             
-            # Setup WebDriver
-            if not self.setup_driver():
-                return False
-                
-            # Navigate to CTG Port Authority portal
-            if not self.navigate_to_portal():
+            if self.engine == 'http':
+                # Browserless lookups; Chrome is only started afterwards to render PDFs
+                self.logger.info("⚡ Using HTTP engine for container lookups")
+                os.makedirs("results/html", exist_ok=True)
+                os.makedirs("results/pdfs", exist_ok=True)
+                self.http_engine = CtgHttpEngine(self.base_url, self.logger)
+            elif not self.warm_up():
+                # Chrome could not be started or the portal did not load
                 return False
             
             # Read container numbers from file
-            container_numbers = self.read_container_numbers_from_file(file_path)
-            if not container_numbers:
+            # Stream container numbers from file; the first lookup starts as soon as one is read
+            container_numbers = self.iter_container_numbers_from_file(file_path)
+            first_container = next(container_numbers, None)
+            if first_container is None:
                 self.logger.error("❌ No container numbers found in file")
                 return False
+            container_numbers = itertools.chain([first_container], container_numbers)
                 
+            self.open_journal(resume)
+            self.open_report()
+            self.open_data_writer()
+            
             # Process all containers
             successful_pdfs, failed_containers = self.process_all_containers(container_numbers)
+            self.preflight.log_summary()
+            data_file = self.close_data_writer()
+            
+            if self.engine == 'http':
+                successful_pdfs = self.render_html_results(successful_pdfs)
             
             # Generate combined report
             combined_report = self.generate_combined_report(successful_pdfs)
@@ -416,14 +1159,16 @@ class CtgPortTrackingAutomation:
             result_files = []
             if combined_report:
                 result_files.append(combined_report)
+            if data_file:
+                result_files.append(data_file)
             result_files.extend(successful_pdfs)
             result_files.extend(summary_files)
             
             # Log final results
             self.logger.info("🎉 CTG Port Authority tracking automation completed successfully!")
-            self.logger.info(f"📊 Total processed: {len(container_numbers)}")
-            self.logger.info(f"✅ Successful: {len(successful_pdfs)}")
-            self.logger.info(f"❌ Failed: {len(failed_containers)}")
+            self.logger.info(f"📊 Total processed: {self.journal.total}")
+            self.logger.info(f"✅ Successful: {self.journal.successful}")
+            self.logger.info(f"❌ Failed: {self.journal.failed}")
             
             if successful_pdfs:
                 self.logger.info("📄 Generated PDF files:")
@@ -437,23 +1182,196 @@ class CtgPortTrackingAutomation:
             return False
         finally:
             self.cleanup()
+            if self.cache:
+                self.cache.close()
+            if self.journal:
+                self.journal.close()
+            if self.combiner:
+                self.combiner.discard()
+            if self.data_writer:
+                self.data_writer.discard()
+            self.write_metrics()
+                
+    def run_watch(self, file_path, interval, cycles=0):
+        """
+        Watchlist mode: re-poll the same containers every interval seconds (cycles=0 runs
+        until interrupted). Each poll is diffed against the stored snapshot; change events
+        go to a JSONL file and PDFs are only rendered for containers that changed.
+        """
+        try:
+            self.logger.info(f"👀 Starting CTG Port Authority tracking watch (every {interval:g}s)...")
+            
+            # Snapshots are built from tracking records, and every poll must reach the portal
+            if self.output == 'pdf':
+                self.output = 'both'
+            if self.cache:
+                self.cache.close()
+                self.cache = None
+            
+            if self.engine == 'http':
+                self.logger.info("⚡ Using HTTP engine for container lookups")
+                os.makedirs("results/html", exist_ok=True)
+                os.makedirs("results/pdfs", exist_ok=True)
+                self.http_engine = CtgHttpEngine(self.base_url, self.logger)
+            elif not self.warm_up():
+                return False
+                
+            container_numbers = self.read_container_numbers_from_file(file_path)
+            if not container_numbers:
+                self.logger.error("❌ No container numbers found in file")
+                return False
+                
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            events_path = os.path.join("results", f"ctg_port_tracking_events_{timestamp}.jsonl")
+            self.watchlist = Watchlist(self.logger, events_path)
+            self.logger.info(f"🔔 Change events: {events_path}")
+            
+            # One journal per poll, rewritten each cycle, so progress stays readable mid-cycle
+            journal_path = RunJournal.new_path("ctg_port_tracking_watch")
+            
+            cycle = 0
+            while True:
+                cycle += 1
+                started = time.time()
+                self.journal = RunJournal(journal_path, self.logger, fresh=True)
+                self.logger.info(f"🔁 Watch cycle {cycle}: polling {len(container_numbers)} container numbers")
+                
+                self.open_report()
+                changed_pdfs, _ = self.process_all_containers(container_numbers)
+                if self.engine == 'http':
+                    changed_pdfs = self.render_html_results(changed_pdfs)
+                combined_report = self.generate_combined_report(changed_pdfs)
+                journal = self.journal
+                journal.close()
+                self.logger.info(f"📊 Cycle {cycle}: {journal.changed} changed, "
+                                 f"{journal.successful - journal.changed} unchanged, "
+                                 f"{journal.failed} failed in {time.time() - started:.1f}s")
+                if combined_report:
+                    self.logger.info(f"📄 Changes report: {combined_report}")
+                self.metrics.write_prometheus("ctg_port_tracking_watch", timestamped=False)
+                    
+                if cycles and cycle >= cycles:
+                    break
+                time.sleep(max(0, interval - (time.time() - started)))
+                
+            return True
+            
+        except KeyboardInterrupt:
+            self.logger.info("⏹️ Watch stopped")
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Watch failed: {str(e)}")
+            return False
+        finally:
+            self.cleanup()
+            if self.watchlist:
+                self.watchlist.close()
+            if self.journal:
+                self.journal.close()
+            if self.combiner:
+                self.combiner.discard()
 
 def main():
     """Main function for command line usage"""
     if len(sys.argv) < 2:
-        print("Usage: python ctg_port_tracking.py <file_path> [--headless]")
+        print("Usage: python ctg_port_tracking.py <file_path> [--headless] [--tabs N] [--max-wait SECONDS]")
+        print("       [--engine http|selenium] [--no-pdf] [--base-url URL]")
+        print("       [--cache-ttl SECONDS] (0 disables the lookup cache)")
+        print("       [--resume JOURNAL] (skip items that already succeeded in that run)")
+        print("       [--no-daemon] (always start a fresh Chrome instead of attaching to browser_daemon.py)")
+        print("       [--output pdf|data|both] (data = tracking records only, no PDF printing)")
+        print("       [--watch SECONDS [--cycles N]] (re-poll on a schedule, PDFs only for changed containers)")
+        print("       [--block-resources] (skip third-party analytics, ads, embeds and web fonts while loading pages)")
+        print("       [--skip-validation] (only normalize and de-duplicate, no format or check digit test)")
+        print("       [--log-verbosity normal|summary] (summary folds per-item log lines into periodic counts)")
+        print("       [--full-reload] (reload the portal for every lookup instead of reusing the search form)")
+        print("       [--recycle-after 500] (restart Chrome after N items, 0 = never)")
+        print("       [--max-browser-mb 2048] (restart Chrome once it uses more memory, 0 = no limit)")
+        print("       [--retries 2] (retry timed-out or failed lookups with backoff, 0 = never)")
         print("Supported file types: .csv, .xlsx, .xls")
         sys.exit(1)
         
     file_path = sys.argv[1]
     headless = '--headless' in sys.argv or '--no-gui' in sys.argv
     
+    tabs = 1
+    if '--tabs' in sys.argv:
+        tabs = int(sys.argv[sys.argv.index('--tabs') + 1])
+    
+    max_wait = 10
+    if '--max-wait' in sys.argv:
+        max_wait = float(sys.argv[sys.argv.index('--max-wait') + 1])
+    
+    engine = 'selenium'
+    if '--engine' in sys.argv:
+        engine = sys.argv[sys.argv.index('--engine') + 1]
+        if engine not in ('http', 'selenium'):
+            print(f"❌ Unknown engine: {engine} (use http or selenium)")
+            sys.exit(1)
+    render_pdfs = '--no-pdf' not in sys.argv
+    
+    output = 'pdf'
+    if '--output' in sys.argv:
+        output = sys.argv[sys.argv.index('--output') + 1]
+        if output not in ('pdf', 'data', 'both'):
+            print(f"❌ Unknown output: {output} (use pdf, data or both)")
+            sys.exit(1)
+    
+    base_url = "https://cpatos.gov.bd/pcs/"
+    if '--base-url' in sys.argv:
+        base_url = sys.argv[sys.argv.index('--base-url') + 1]
+    
+    cache_ttl = 3600
+    if '--cache-ttl' in sys.argv:
+        cache_ttl = float(sys.argv[sys.argv.index('--cache-ttl') + 1])
+    
+    resume = None
+    if '--resume' in sys.argv:
+        resume = sys.argv[sys.argv.index('--resume') + 1]
+    
     if not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
         sys.exit(1)
     
-    automation = CtgPortTrackingAutomation(headless=headless)
-    success = automation.run_automation(file_path, headless)
+    watch = None
+    if '--watch' in sys.argv:
+        watch = float(sys.argv[sys.argv.index('--watch') + 1])
+    
+    cycles = 0
+    if '--cycles' in sys.argv:
+        cycles = int(sys.argv[sys.argv.index('--cycles') + 1])
+    
+    log_verbosity = 'normal'
+    if '--log-verbosity' in sys.argv:
+        log_verbosity = sys.argv[sys.argv.index('--log-verbosity') + 1]
+        if log_verbosity not in ('normal', 'summary'):
+            print(f"❌ Unknown log verbosity: {log_verbosity} (use normal or summary)")
+            sys.exit(1)
+    
+    recycle_after = DEFAULT_MAX_ITEMS
+    if '--recycle-after' in sys.argv:
+        recycle_after = int(sys.argv[sys.argv.index('--recycle-after') + 1])
+    
+    max_browser_mb = DEFAULT_MAX_RSS_MB
+    if '--max-browser-mb' in sys.argv:
+        max_browser_mb = int(sys.argv[sys.argv.index('--max-browser-mb') + 1])
+    
+    retries = DEFAULT_RETRIES
+    if '--retries' in sys.argv:
+        retries = int(sys.argv[sys.argv.index('--retries') + 1])
+    
+    automation = CtgPortTrackingAutomation(headless=headless, tabs=tabs, max_wait=max_wait, engine=engine,
+                                           render_pdfs=render_pdfs, base_url=base_url, cache_ttl=cache_ttl,
+                                           use_daemon='--no-daemon' not in sys.argv, output=output,
+                                           block_resources='--block-resources' in sys.argv,
+                                           reuse_form='--full-reload' not in sys.argv,
+                                           validate_ids='--skip-validation' not in sys.argv,
+                                           log_verbosity=log_verbosity, recycle_after=recycle_after,
+                                           max_browser_mb=max_browser_mb, retries=retries)
+    if watch is not None:
+        success = automation.run_watch(file_path, watch, cycles=cycles)
+    else:
+        success = automation.run_automation(file_path, headless, resume=resume)
     
     sys.exit(0 if success else 1)
 
@@ -7,10 +7,6 @@ Automates the process of tracking FCR numbers through Maersk portal and generati
 import os
 import sys
 import time
-import logging
-import pandas as pd
-import base64
-import openpyxl  # For Excel file support
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -18,35 +14,110 @@ from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-import json
+from selenium.common.exceptions import TimeoutException
+import itertools
+from urllib.parse import urlparse
+from worker_pool import BrowserWorkerPool
+from page_readiness import PageReadiness
+from input_reader import open_identifier_stream
+from identifier_preflight import IdentifierPreflight
+from rate_limiter import get_rate_limiter
+from browser_daemon import find_daemon, attach_options
+from lookup_cache import LookupCache
+from run_journal import RunJournal
+from watchlist import Watchlist
+from step_metrics import StepMetrics
+from adaptive_timeouts import AdaptiveTimeouts, probe
+from logging_setup import log_item, setup_automation_logging
+from resource_blocking import apply_resource_blocking, chrome_arguments
+from browser_profiles import acquire_profile
+from driver_lifecycle import DEFAULT_MAX_ITEMS, DEFAULT_MAX_RSS_MB, DriverRecycler
+from retry_queue import DEFAULT_RETRIES, NOT_FOUND, NotFoundError, PortalUnavailableError, RetryQueue, classify_error
+from circuit_breaker import get_circuit_breaker
+from pdf_combiner import IncrementalPdfCombiner
+from pdf_capture import print_page_to_pdf, write_pdf_atomic
+from tracking_extractor import (TrackingDataWriter, extract_tracking_records,
+                                records_from_json, records_to_json)
 
 class DamcoTrackingAutomation:
-    def __init__(self, headless=True):
-        self.setup_logging()
+    # A filled-in data cell of the tracking table inside the damco-track iframe, so a
+    # layout table or an empty table skeleton does not count as the rendered FCR page
+    RESULT_SELECTOR = "table td:not(:empty)"
+    
+    # Portal key used in the shared lookup cache
+    CACHE_PORTAL = "maersk"
+    
+    # Optional popups, only ever probed for (a missing popup must not cost a wait)
+    COOKIE_BUTTON = (By.CSS_SELECTOR, "button[data-test='coi-allow-all-button']")
+    COACH_BUTTON = (By.CSS_SELECTOR, "button[data-test='finishButton']")
+    
+    # Lookups of a fresh session that probe again for popups the warm-up did not see
+    POPUP_LATE_CHECKS = 3
+    
+    # Steps whose element waits use learned timeouts (reported in the JSON summary)
+    WAIT_STEPS = ("navigate", "form_input", "submit", "iframe_switch", "fcr_link")
+    
+    def __init__(self, headless=True, workers=1, max_wait=10, cache_ttl=3600, use_daemon=True,
+                 output='pdf', logger=None, cache=None, metrics=None,
+                 portal_url="https://www.maersk.com/mymaersk-scm-track/", block_resources=False,
+                 persistent_profile=False, validate_ids=True, log_verbosity='normal',
+                 recycle_after=DEFAULT_MAX_ITEMS, max_browser_mb=DEFAULT_MAX_RSS_MB, retries=DEFAULT_RETRIES):
+        if logger is None:
+            self.setup_logging(log_verbosity)
+        else:
+            self.logger = logger
         self.driver = None
-        self.wait = None
+        self.use_daemon = use_daemon
+        self.attached = False
+        self.owned_windows = []
+        self.readiness = None
         self.headless = headless
-        self.results = []
+        self.workers = max(1, workers)
+        self.max_wait = max_wait
+        self.portal_url = portal_url
+        # Skip third-party trackers, embeds and web fonts via the portal's blocking profile (resource_blocking.py)
+        self.block_resources = block_resources
+        # Keep cookie consent and popup dismissal in a locked per-portal profile (browser_profiles.py)
+        self.persistent_profile = persistent_profile
+        self.profile = None
+        # Replace the browser after recycle_after items, past max_browser_mb or when lookups slow down
+        self.recycle_after = recycle_after
+        self.max_browser_mb = max_browser_mb
+        self.recycler = DriverRecycler(self.logger, max_items=recycle_after, max_rss_mb=max_browser_mb)
+        # Identifier pre-flight of the current input file (identifier_preflight.py)
+        self.validate_ids = validate_ids
+        self.preflight = None
+        self.rate_limiter = get_rate_limiter(urlparse(portal_url).hostname, self.logger)
+        self.cache_ttl = cache_ttl
+        self.cache = cache
+        if self.cache is None and cache_ttl > 0:
+            self.cache = LookupCache(self.logger, ttl=cache_ttl)
+        self.journal = None
+        self.combiner = None
+        # 'pdf', 'data' (tracking records only) or 'both'
+        self.output = output
+        self.data_writer = None
+        self.data_file = None
+        self.watchlist = None
+        # Step timings, shared with pool workers so a run has one set of histograms
+        self.metrics = metrics or StepMetrics("damco", self.logger)
+        # Element waits time out after a multiple of the step's observed p99 instead of a fixed 20 s
+        self.timeouts = AdaptiveTimeouts(self.metrics)
+        # Popup dismissers not yet seen this session, re-probed for popup_checks_left lookups
+        self.pending_popups = []
+        self.popup_checks_left = 0
+        # Pauses every worker's lookups while the portal is failing
+        self.breaker = get_circuit_breaker(urlparse(portal_url).hostname, self.logger, metrics=self.metrics)
+        # Failed lookups come back through this queue up to retries more times (set per run)
+        self.retries = retries
+        self.retry_queue = None
+        self.resumed = {}
+        # Outcome of the booking processed last; every outcome is streamed to the journal
+        self.last_result = None
         
-    def setup_logging(self):
-        """Setup logging configuration"""
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        log_filename = f"damco_tracking_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        log_path = os.path.join(log_dir, log_filename)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_path),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger('DamcoTrackingMaersk')
+    def setup_logging(self, verbosity='normal'):
+        """Setup logging configuration (queued, rotating JSON file in logs/ plus console)"""
+        self.logger = setup_automation_logging('DamcoTrackingMaersk', 'damco_tracking', verbosity)
         
     def setup_driver(self):
         """Setup Chrome WebDriver with options"""
@@ -64,7 +135,22 @@ class DamcoTrackingAutomation:
         # Disable automation detection
         chrome_options.add_experimental_option("useAutomationExtension", False)
         chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+        PageReadiness.enable_network_events(chrome_options)
+        if self.block_resources:
+            for argument in chrome_arguments():
+                chrome_options.add_argument(argument)
         
+        # Attach to the pre-warmed Chrome daemon when one is running (see browser_daemon.py)
+        debugger_address = find_daemon() if self.use_daemon else None
+        if debugger_address:
+            chrome_options = attach_options(debugger_address, chrome_options)
+        elif self.persistent_profile:
+            # A restarted session keeps the slot it already holds
+            if self.profile is None:
+                self.profile = acquire_profile(self.CACHE_PORTAL, self.logger)
+            if self.profile:
+                chrome_options.add_argument(f"--user-data-dir={self.profile.path}")
+            
         try:
             # Use system-installed chromedriver for WebContainer compatibility
             chromedriver_paths = [
@@ -84,7 +170,15 @@ class DamcoTrackingAutomation:
                 
             service = Service(chromedriver_path)
             self.driver = webdriver.Chrome(service=service, options=chrome_options)
-            self.wait = WebDriverWait(self.driver, 20)
+            if debugger_address:
+                # Work in a tab of our own so concurrent jobs on the daemon don't collide
+                self.driver.switch_to.new_window('tab')
+                self.owned_windows.append(self.driver.current_window_handle)
+                self.attached = True
+                self.logger.info(f"⚡ Attached to Chrome daemon at {debugger_address}")
+            if self.block_resources:
+                apply_resource_blocking(self.driver, self.CACHE_PORTAL, self.logger)
+            self.readiness = PageReadiness(self.driver, self.logger, max_wait=self.max_wait, metrics=self.metrics)
             
             # Ensure results directories exist
             os.makedirs("results", exist_ok=True)
@@ -94,16 +188,17 @@ class DamcoTrackingAutomation:
             return True
         except Exception as e:
             self.logger.error(f"❌ Failed to setup Chrome WebDriver: {str(e)}")
+            self.release_profile()
             return False
             
     def navigate_to_maersk(self):
         """Navigate to Maersk tracking portal"""
         try:
             self.logger.info("🌐 Navigating to Maersk tracking portal...")
-            self.driver.get("https://www.maersk.com/mymaersk-scm-track/")
+            self.driver.get(self.portal_url)
             
             # Wait for page to load
-            self.wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+            self.timeouts.until(self.driver, "navigate", EC.presence_of_element_located((By.TAG_NAME, "body")))
             self.logger.info("📍 Successfully navigated to Maersk portal")
             return True
             
@@ -112,254 +207,500 @@ class DamcoTrackingAutomation:
             return False
             
     def accept_cookies(self):
-        """Handle cookie consent popup"""
+        """Click "Allow all" if the cookie consent popup is showing, returns True if it was"""
         try:
-            self.logger.info("🍪 Handling cookie consent popup...")
-            
-            # Wait for and click "Allow all" button
-            allow_btn = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-test='coi-allow-all-button']"))
-            )
+            allow_btn = probe(self.driver, *self.COOKIE_BUTTON)
+            if allow_btn is None:
+                return False
             allow_btn.click()
-            self.logger.info("✅ Accepted cookies")
+            self.logger.info("🍪 Accepted cookies")
             
-            # Wait a moment for the popup to disappear
-            time.sleep(2)
+            # Wait for the popup to disappear
+            self.wait_until_gone(self.COOKIE_BUTTON)
             return True
             
-        except TimeoutException:
-            self.logger.warning("⚠️ No cookie banner found")
-            return True
         except Exception as e:
             self.logger.error(f"❌ Failed to handle cookie consent: {str(e)}")
             return False
             
     def close_coach_popup(self):
-        """Handle welcome coach popup"""
+        """Click "Got it" if the welcome coach popup is showing, returns True if it was"""
         try:
-            self.logger.info("👋 Dismissing welcome coach popup...")
-            
-            # Wait for and click "Got it" button
-            got_it_btn = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-test='finishButton']"))
-            )
+            got_it_btn = probe(self.driver, *self.COACH_BUTTON)
+            if got_it_btn is None:
+                return False
             got_it_btn.click()
-            self.logger.info("✅ Closed coach popup")
+            self.logger.info("👋 Closed coach popup")
             
-            # Wait a moment for the popup to disappear
-            time.sleep(2)
+            # Wait for the popup to disappear
+            self.wait_until_gone(self.COACH_BUTTON)
             return True
             
-        except TimeoutException:
-            self.logger.warning("⚠️ No coach popup found")
-            return True
         except Exception as e:
             self.logger.error(f"❌ Failed to handle coach popup: {str(e)}")
             return False
             
+    def wait_until_gone(self, locator, timeout=5):
+        """Wait for a dismissed popup to leave the page instead of sleeping a fixed time"""
+        try:
+            WebDriverWait(self.driver, timeout).until(EC.invisibility_of_element_located(locator))
+        except TimeoutException:
+            self.logger.warning("⚠️ Popup still visible, continuing anyway")
+            
     def process_booking(self, booking_number, index):
-        """Process a single booking number"""
+        """Process a single booking number, reusing resumed or cached results when possible"""
+        if booking_number in self.resumed:
+            restored = True
+            self.restore_resumed_booking(booking_number)
+        else:
+            with self.metrics.span("cache_lookup"):
+                restored = self.restore_cached_booking(booking_number, index)
+        if not restored:
+            self.lookup_booking(booking_number, index)
+            
+        if self.retry_queue and self.retry_queue.defer(index, booking_number, self.last_result):
+            # Comes back later through the retry queue; nothing is recorded yet
+            self.last_result = dict(self.last_result, status='retrying')
+            return None
+            
+        # Checkpoint the outcome so an interrupted run can resume from here
+        if self.journal:
+            self.journal.write(index, self.last_result)
+        # Data-only runs succeed without a PDF
+        pdf_filename = self.last_result.get('pdf_file')
+        self.add_to_report(index, pdf_filename)
+        return pdf_filename
+        
+    def lookup_booking(self, booking_number, index):
+        """Fetch a booking from the portal, pacing the request and reporting the outcome to the limiter and breaker"""
         try:
+            # Sit out a tripped breaker, then wait for a slot; the limiter adapts to portal health
+            with self.metrics.span("rate_limit_wait"):
+                self.breaker.wait()
+                self.rate_limiter.acquire()
+        except PortalUnavailableError as e:
+            self.record_error(booking_number, e)
+            return
+        started = time.time()
+        
+        with self.metrics.span("lookup"):
+            pdf_filename, records = self.fetch_booking(booking_number, index)
+        
+        error_kind = self.last_result.get('error_kind')
+        if self.last_result['status'] == 'success':
+            self.rate_limiter.record_success(time.time() - started)
+            self.store_cached_booking(booking_number, pdf_filename, records)
+        elif error_kind == NOT_FOUND:
+            # The portal answered fine, it just has no such booking
+            self.rate_limiter.record_success(time.time() - started)
+        else:
+            self.rate_limiter.record_failure()
+        self.breaker.record(error_kind)
+        if self.driver:
+            # A worn-out session is replaced before the next lookup, not in the middle of this one
+            self.recycler.record(self.driver, time.time() - started)
+            
+    def add_to_report(self, index, pdf_filename):
+        """Append a finished booking to the combined report (None marks a failed one)"""
+        if self.combiner:
+            pdf_path = os.path.join("results", "pdfs", pdf_filename) if pdf_filename else None
+            self.combiner.add(index, pdf_path)
+        
+    def restore_resumed_booking(self, booking_number):
+        """Reuse the PDF and/or records of a booking that succeeded in the run being resumed"""
+        entry = self.resumed[booking_number]
+        self.logger.info(f"⏭️ Already completed in previous run: {booking_number}")
+        self.last_result = {
+            'fcr_number': booking_number,
+            'status': 'success',
+            'resumed': True,
+            'timestamp': entry['timestamp']
+        }
+        if entry.get('pdf_file'):
+            self.last_result['pdf_file'] = entry['pdf_file']
+        if self.data_writer and 'records_at' in entry:
+            # Records of resumed bookings were kept next to the journal
+            records = self.journal.read_records(entry['records_at'])
+            if records is None:
+                self.logger.warning(f"⚠️ Journal records for {booking_number} unreadable, not in the data file")
+            else:
+                self.data_writer.write(records_from_json(records))
+                self.last_result['records'] = len(records)
+        return self.last_result.get('pdf_file')
+        
+    def write_records(self, booking_number, records):
+        """Stream records to the data file, keeping a copy next to the journal for --resume"""
+        self.data_writer.write(records)
+        if self.journal:
+            self.journal.write_records(booking_number, records_to_json(records))
+        
+    def restore_cached_booking(self, booking_number, index):
+        """Restore a fresh cached PDF and/or tracking records for this booking, returns True on a hit"""
+        if not self.cache:
+            return False
+        cached = self.cache.get(self.CACHE_PORTAL, booking_number)
+        if not cached:
+            return False
+        records = (cached['status'] or {}).get('records')
+        if (self.output != 'data' and not cached['pdf']) or (self.output != 'pdf' and records is None):
+            return False
+            
+        result = {
+            'fcr_number': booking_number,
+            'status': 'success',
+            'cached': True,
+            'timestamp': datetime.now().isoformat()
+        }
+        if self.output != 'data':
+            pdf_filename = f"{index:03d}_{booking_number}_tracking.pdf"
+            write_pdf_atomic(os.path.join("results", "pdfs", pdf_filename), cached['pdf'])
+            result['pdf_file'] = pdf_filename
+        if self.output != 'pdf':
+            self.write_records(booking_number, records_from_json(records))
+            result['records'] = len(records)
+            
+        fetched_at = datetime.fromtimestamp(cached['fetched_at']).strftime('%Y-%m-%d %H:%M:%S')
+        self.logger.info(f"♻️ Using cached result for {booking_number} (fetched {fetched_at})")
+        self.last_result = result
+        return True
+        
+    def store_cached_booking(self, booking_number, pdf_filename, records):
+        """Save a freshly fetched PDF and/or extracted tracking records in the lookup cache"""
+        if not self.cache:
+            return
+        try:
+            pdf = None
+            if pdf_filename:
+                with open(os.path.join("results", "pdfs", pdf_filename), "rb") as f:
+                    pdf = f.read()
+            status = {'status': 'success'}
+            if records is not None:
+                status['records'] = records_to_json(records)
+            self.cache.put(self.CACHE_PORTAL, booking_number, pdf=pdf, status=status)
+        except Exception as e:
+            self.logger.warning(f"⚠️ Could not cache result for {booking_number}: {str(e)}")
+            
+    def fetch_booking(self, booking_number, index):
+        """Look up a single booking number on the Maersk portal"""
+        try:
+            self.restart_driver_if_due()
             self.logger.info(f"🔍 Processing FCR number {index}: {booking_number}")
             
+            self.dismiss_late_popups()
+            
             # Input booking number
-            input_box = self.wait.until(EC.presence_of_element_located((By.ID, "formInput")))
-            input_box.clear()
-            input_box.send_keys(booking_number)
+            with self.metrics.span("form_input"):
+                input_box = self.timeouts.until(self.driver, "form_input",
+                                                EC.presence_of_element_located((By.ID, "formInput")))
+                input_box.clear()
+                input_box.send_keys(booking_number)
             self.logger.info(f"✅ Entered booking number: {booking_number}")
             
             # Submit search
-            submit_btn = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[data-test='form-input-button']")))
-            self.driver.execute_script("arguments[0].click();", submit_btn)
+            with self.metrics.span("submit"):
+                submit_btn = self.timeouts.until(self.driver, "submit", EC.element_to_be_clickable(
+                    (By.CSS_SELECTOR, "button[data-test='form-input-button']")
+                ))
+                self.driver.execute_script("arguments[0].click();", submit_btn)
             self.logger.info("✅ Clicked submit button")
             
             # Wait for iframe to load and switch to it
-            self.wait.until(EC.frame_to_be_available_and_switch_to_it((By.ID, "damco-track")))
+            with self.metrics.span("iframe_switch"):
+                self.timeouts.until(self.driver, "iframe_switch",
+                                    EC.frame_to_be_available_and_switch_to_it((By.ID, "damco-track")))
             
             # Click FCR link
-            fcr_link = self.wait.until(EC.element_to_be_clickable(
-                (By.XPATH, f"//div[@id='fcr_by_fcr_number']//a[contains(text(), '{booking_number}')]")
-            ))
-            fcr_link.click()
+            with self.metrics.span("fcr_link"):
+                try:
+                    fcr_link = self.timeouts.until(self.driver, "fcr_link", EC.element_to_be_clickable(
+                        (By.XPATH, f"//div[@id='fcr_by_fcr_number']//a[contains(text(), '{booking_number}')]")
+                    ))
+                except TimeoutException:
+                    # Search results rendered without a link for it: the portal has no such FCR
+                    if self.driver.find_elements(By.ID, "fcr_by_fcr_number"):
+                        raise NotFoundError(f"FCR {booking_number} not found on the portal")
+                    raise
+                self.readiness.arm()
+                fcr_link.click()
             self.logger.info(f"✅ Clicked FCR link for {booking_number}")
             
-            # Allow page to fully load
-            time.sleep(5)
+            # Wait until the FCR page has actually loaded
+            with self.metrics.span("page_ready"):
+                self.readiness.wait_until_ready(self.RESULT_SELECTOR, label=f"FCR {booking_number}")
             
-            # Save page as PDF using Chrome DevTools Protocol
-            pdf_filename = f"{index:03d}_{booking_number}_tracking.pdf"
-            pdf_path = os.path.join("results", "pdfs", pdf_filename)
+            result = {
+                'fcr_number': booking_number,
+                'status': 'success',
+                'timestamp': datetime.now().isoformat()
+            }
             
-            # Generate PDF
-            pdf_data = self.driver.execute_cdp_cmd("Page.printToPDF", {
-                "format": "A4",
-                "printBackground": True,
-                "marginTop": 0.4,
-                "marginBottom": 0.4,
-                "marginLeft": 0.4,
-                "marginRight": 0.4
-            })
+            # Parse the tracking table into records (page_source is the iframe document here)
+            records = None
+            change = None
+            print_pdf = self.output != 'data'
+            if self.output != 'pdf':
+                with self.metrics.span("extract"):
+                    records = extract_tracking_records(self.driver.page_source, booking_number, self.CACHE_PORTAL)
+                if self.data_writer:
+                    self.write_records(booking_number, records)
+                result['records'] = len(records)
+                self.logger.info(f"✅ Extracted {len(records)} tracking records for {booking_number}")
+                if self.watchlist:
+                    # Watch mode: unchanged bookings need no new PDF
+                    change = self.snapshot_change(booking_number, records)
+                    result['changed'] = change is not None
+                    print_pdf = print_pdf and result['changed']
             
-            with open(pdf_path, "wb") as f:
-                f.write(base64.b64decode(pdf_data['data']))
+            # Save page as PDF using Chrome DevTools Protocol
+            pdf_filename = None
+            if print_pdf:
+                pdf_filename = f"{index:03d}_{booking_number}_tracking.pdf"
+                pdf_path = os.path.join("results", "pdfs", pdf_filename)
+                
+                # Generate PDF (streamed to disk, renamed into place once complete)
+                with self.metrics.span("pdf_print"):
+                    print_page_to_pdf(self.driver, pdf_path)
+                result['pdf_file'] = pdf_filename
+                
+                self.logger.info(f"✅ Saved PDF for {booking_number}: {pdf_filename}")
             
-            self.logger.info(f"✅ Saved PDF for {booking_number}: {pdf_filename}")
+            # The new snapshot is stored only now that the booking's outputs are written
+            if change:
+                self.watchlist.commit(change, records)
             
             # Record successful result
-            self.results.append({
-                'fcr_number': booking_number,
-                'status': 'success',
-                'pdf_file': pdf_filename,
-                'timestamp': datetime.now().isoformat()
-            })
+            self.last_result = result
             
-            return pdf_filename
+            return pdf_filename, records
             
         except Exception as e:
-            self.logger.error(f"❌ Error processing FCR {booking_number}: {str(e)}")
-            self.results.append({
-                'fcr_number': booking_number,
-                'status': 'error',
-                'error': str(e),
-                'timestamp': datetime.now().isoformat()
-            })
-            return None
+            self.record_error(booking_number, e)
+            return None, None
             
         finally:
-            # Always switch back to default content
-            self.driver.switch_to.default_content()
+            # Always switch back to default content (there is no driver if a restart failed)
+            if self.driver:
+                self.driver.switch_to.default_content()
+                
+    def record_error(self, booking_number, error):
+        """Record a failed booking lookup, classified so retries and the breaker can tell timeouts from misses"""
+        error_kind = classify_error(error)
+        self.logger.error(f"❌ Error processing FCR {booking_number} ({error_kind}): {str(error)}")
+        self.last_result = {
+            'fcr_number': booking_number,
+            'status': 'error',
+            'error': str(error),
+            'error_kind': error_kind,
+            'timestamp': datetime.now().isoformat()
+        }
+            
+    def snapshot_change(self, booking_number, records):
+        """Diff fresh records against the watchlist snapshot, returns the change event or None"""
+        event = self.watchlist.check(self.CACHE_PORTAL, booking_number, records)
+        if event is None:
+            self.logger.info(f"💤 No change for {booking_number}")
+            return None
+        self.logger.info(f"🔔 {booking_number} {event['change']}: {event['previous_status']} → {event['status']}")
+        return event
+        
+    def warm_up(self):
+        """Start a browser session and prepare the portal for lookups"""
+        with self.metrics.span("driver_setup"):
+            if not self.setup_driver():
+                return False
             
-    def read_booking_numbers_from_file(self, file_path):
-        """Read booking numbers from CSV or Excel file"""
+        # Navigate to Maersk portal
+        with self.metrics.span("navigate"):
+            if not self.navigate_to_maersk():
+                return False
+            
+        # Handle cookie consent and coach popup ONCE per browser session
+        with self.metrics.span("popups"):
+            self.dismiss_popups()
+        return True
+        
+    def restart_driver_if_due(self):
+        """Quit a worn-out browser session and warm up a fresh one"""
+        reason = self.recycler.due
+        if not reason:
+            return
+        self.recycler.log_restart(reason)
+        self.metrics.add("driver_restarts")
+        self.close_driver()
+        if not self.warm_up():
+            # Still due, so the next booking tries again
+            raise Exception("Chrome could not be restarted")
+        self.recycler.reset()
+        
+    def dismiss_popups(self):
+        """
+        Accept cookies and close the coach popup if they are showing. Popups are
+        probed for, never waited on: a fresh profile first lets the portal settle so
+        script-injected popups have rendered, and popups still not seen are probed
+        again before the first few lookups. A persistent profile that already
+        dismissed them skips the settling.
+        """
+        if self.profile and self.profile.remembers("popups_dismissed"):
+            self.logger.info("⚡ Popups already dismissed in this profile, quick check only")
+        else:
+            self.readiness.wait_until_ready(label="Maersk portal")
+        self.pending_popups = [dismiss for dismiss in (self.accept_cookies, self.close_coach_popup) if not dismiss()]
+        self.popup_checks_left = self.POPUP_LATE_CHECKS if self.pending_popups else 0
+        if self.pending_popups:
+            self.logger.info(f"⚡ {len(self.pending_popups)} popup(s) not showing, continuing without waiting")
+        elif self.profile:
+            self.profile.mark("popups_dismissed")
+            
+    def dismiss_late_popups(self):
+        """Instant re-check for popups the warm-up did not see (first few lookups of a session only)"""
+        if not self.popup_checks_left:
+            return
+        self.popup_checks_left -= 1
+        self.pending_popups = [dismiss for dismiss in self.pending_popups if not dismiss()]
+        if not self.pending_popups:
+            self.popup_checks_left = 0
+            if self.profile:
+                self.profile.mark("popups_dismissed")
+        
+    def create_worker(self, worker_id):
+        """Create a warmed-up worker with its own browser session for the pool"""
+        worker = DamcoTrackingAutomation(headless=self.headless, max_wait=self.max_wait,
+                                         cache_ttl=self.cache_ttl, use_daemon=self.use_daemon,
+                                         output=self.output, logger=self.logger, cache=self.cache,
+                                         metrics=self.metrics, portal_url=self.portal_url,
+                                         block_resources=self.block_resources,
+                                         persistent_profile=self.persistent_profile,
+                                         recycle_after=self.recycle_after,
+                                         max_browser_mb=self.max_browser_mb)
+        worker.retry_queue = self.retry_queue
+        worker.journal = self.journal
+        worker.combiner = self.combiner
+        worker.data_writer = self.data_writer
+        worker.watchlist = self.watchlist
+        worker.resumed = self.resumed
+        if not worker.warm_up():
+            self.logger.error(f"❌ Worker {worker_id} could not reach the Maersk portal")
+            worker.cleanup()
+            return None
+        self.logger.info(f"✅ Worker {worker_id} ready")
+        return worker
+            
+    def iter_booking_numbers_from_file(self, file_path):
+        """Stream FCR numbers from CSV or Excel file without loading the whole sheet"""
         try:
             self.logger.info(f"📋 Reading FCR numbers from file...")
             self.logger.info(f"📁 File path: {file_path}")
             
-            # Auto-detect file type
-            ext = os.path.splitext(file_path)[1].lower()
-            self.logger.info(f"📄 File extension detected: {ext}")
-            
-            if ext == ".csv":
-                self.logger.info("📊 Reading as CSV file...")
-                df = pd.read_csv(file_path)
-            elif ext in [".xls", ".xlsx"]:
-                self.logger.info("📊 Reading as Excel file...")
-                # Try different engines for Excel files
-                try:
-                    df = pd.read_excel(file_path, engine='openpyxl')
-                except Exception as e:
-                    self.logger.warning(f"⚠️ openpyxl failed, trying xlrd: {e}")
-                    df = pd.read_excel(file_path, engine='xlrd')
-                df = pd.read_excel(file_path)
-            else:
-                raise ValueError(f"Unsupported file type: {ext}. Please use .csv or .xlsx")
-            
-            self.logger.info(f"📊 File loaded successfully with {len(df)} rows")
-            self.logger.info(f"📋 Columns found: {list(df.columns)}")
-            
-            # Look for booking/FCR column (flexible column names)
-            booking_column = None
+            # Look for booking column by header only (flexible column names)
             possible_columns = ['booking_number', 'fcr_number', 'fcr number', 'fcr', 'booking', 'reference', 'container', 'number']
+            match_terms = ['fcr', 'booking', 'reference', 'number']
             
-            for col in df.columns:
-                col_lower = col.lower().strip()
-                if col_lower in possible_columns or any(term in col_lower for term in ['fcr', 'booking', 'reference', 'number']):
-                    booking_column = col
-                    break
-                    
-            if booking_column is None:
-                # If no specific column found, use first column
-                booking_column = df.columns[0]
-                self.logger.warning(f"⚠️ No FCR column found, using first column: {booking_column}")
-            else:
-                self.logger.info(f"📋 Using column: {booking_column}")
-            
-            # Get the data from the column
-            column_data = df[booking_column].dropna()
-            self.logger.info(f"📊 Raw column data: {column_data.tolist()}")
-            
-            # Convert to string and clean up
-            booking_numbers = column_data.astype(str).tolist()
-            
-            # Remove any empty strings or whitespace-only entries
-            booking_numbers = [fcr.strip() for fcr in booking_numbers if fcr.strip()]
-            
-            # Remove 'nan' values that might come from pandas
-            booking_numbers = [fcr for fcr in booking_numbers if fcr.lower() != 'nan']
-            
-            # Log the actual FCR numbers being processed
-            self.logger.info(f"📊 FCR numbers to process:")
-            for i, fcr in enumerate(booking_numbers, 1):
-                self.logger.info(f"   {i}. {fcr}")
-            
-            self.logger.info(f"📊 Found {len(booking_numbers)} FCR numbers to process")
-            
-            return booking_numbers
+            rows = open_identifier_stream(file_path, possible_columns, match_terms, self.logger,
+                                          label="FCR numbers", with_rows=True)
+            # Normalize, validate and de-duplicate before anything reaches the portal
+            self.preflight = IdentifierPreflight('fcr', self.logger, validate=self.validate_ids)
+            return self.preflight.filter(rows)
             
         except Exception as e:
             self.logger.error(f"❌ Failed to read file: {str(e)}")
             self.logger.error(f"❌ File path was: {file_path}")
             self.logger.error(f"❌ File exists: {os.path.exists(file_path)}")
-            return []
+            return iter([])
+            
+    def read_booking_numbers_from_file(self, file_path):
+        """Read FCR numbers from CSV or Excel file"""
+        return list(self.iter_booking_numbers_from_file(file_path))
             
     def process_all_bookings(self, booking_numbers):
-        """Process all booking numbers"""
+        """Process all booking numbers, retrying failed lookups once the rest have had their turn"""
+        self.retry_queue = RetryQueue(self.logger, retries=self.retries, metrics=self.metrics)
+        # The breaker is process-wide; a portal given up on by an earlier run gets another chance
+        self.breaker.begin_run()
+        items = self.retry_queue.items(enumerate(booking_numbers, start=1))
+        if self.workers > 1:
+            return self.process_all_bookings_parallel(items)
+            
         successful_pdfs = []
         failed_bookings = []
         
-        for i, booking in enumerate(booking_numbers, start=1):
-            self.logger.info(f"🔍 Processing FCR number {i}/{len(booking_numbers)}: {booking}")
-            
-            pdf_filename = self.process_booking(booking, i)
+        for i, booking in items:
+            with log_item(booking):
+                self.logger.info(f"🔍 Processing FCR number {i}: {booking}")
+                
+                pdf_filename = self.process_booking(booking, i)
             
-            if pdf_filename:
-                successful_pdfs.append(pdf_filename)
-            else:
+            if self.last_result['status'] == 'retrying':
+                continue
+            if self.last_result['status'] != 'success':
                 failed_bookings.append(booking)
+            elif pdf_filename:
+                successful_pdfs.append(pdf_filename)
+                
+        return successful_pdfs, failed_bookings
+        
+    def process_all_bookings_parallel(self, items):
+        """Process (index, booking number) pairs across a pool of browser workers"""
+        successful_pdfs = []
+        failed_bookings = []
+        
+        def handle(worker, index, booking):
+            with log_item(booking):
+                self.logger.info(f"🔍 Processing FCR number {index}: {booking}")
+                try:
+                    pdf_filename = worker.process_booking(booking, index)
+                except Exception:
+                    self.retry_queue.release(index)
+                    raise
+            return pdf_filename, worker.last_result
+            
+        pool = BrowserWorkerPool(self.create_worker, self.workers, self.logger)
+        try:
+            if not pool.start():
+                raise Exception("No browser workers could be started")
                 
-            # Wait between requests to avoid rate limiting
-            time.sleep(2)
+            outcomes = pool.run(items, handle)
+        finally:
+            pool.close()
+            
+        # Merge per-worker outcomes in input order so numbering stays stable
+        for index, booking, outcome in outcomes:
+            if outcome is None:
+                self.add_to_report(index, None)
+                outcome = (None, {
+                    'fcr_number': booking,
+                    'status': 'error',
+                    'error': 'Worker failed to process booking',
+                    'timestamp': datetime.now().isoformat()
+                })
+                if self.journal:
+                    self.journal.write(index, outcome[1])
+            pdf_filename, result = outcome
+            if result['status'] == 'retrying':
+                # Superseded by the outcome of its retry
+                continue
+            
+            if result['status'] != 'success':
+                failed_bookings.append(booking)
+            elif pdf_filename:
+                successful_pdfs.append(pdf_filename)
                 
         return successful_pdfs, failed_bookings
         
     def generate_combined_report(self, successful_pdfs):
-        """Generate combined PDF report"""
+        """Finish the combined PDF report that was built while bookings were processed"""
         try:
-            if not successful_pdfs:
+            if self.combiner is None:
+                # Not built during the run; combine the finished PDFs now
+                self.open_report()
+                for i, pdf_filename in enumerate(successful_pdfs, start=1):
+                    self.add_to_report(i, pdf_filename)
+                    
+            combiner, self.combiner = self.combiner, None
+            if not combiner.close():
                 return None
                 
-            self.logger.info("📦 Combining all PDFs into a single report...")
-            
-            # Create combined report filename
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            combined_filename = f"damco_tracking_report_{timestamp}.pdf"
-            combined_path = os.path.join("results", combined_filename)
-            
-            # Try to combine PDFs using PyPDF2
-            try:
-                from PyPDF2 import PdfMerger
-                
-                merger = PdfMerger()
-                
-                for pdf_filename in successful_pdfs:
-                    pdf_path = os.path.join("results", "pdfs", pdf_filename)
-                    if os.path.exists(pdf_path):
-                        merger.append(pdf_path)
-                        self.logger.info(f"📄 Added {pdf_filename} to combined report")
-                
-                merger.write(combined_path)
-                merger.close()
-                
-                self.logger.info(f"✅ Combined {len(successful_pdfs)} PDFs into single report")
-                
-            except ImportError:
-                # Fallback: copy first PDF if PyPDF2 not available
-                self.logger.warning("⚠️ PyPDF2 not available, using first PDF as combined report")
-                if successful_pdfs:
-                    import shutil
-                    first_pdf_path = os.path.join("results", "pdfs", successful_pdfs[0])
-                    shutil.copy2(first_pdf_path, combined_path)
-                
+            combined_filename = os.path.basename(combiner.path)
+            self.logger.info(f"✅ Combined {combiner.document_count} PDFs into single report")
             self.logger.info(f"💾 Combined report saved: {combined_filename}")
             return combined_filename
             
@@ -375,6 +716,9 @@ class DamcoTrackingAutomation:
             # Generate timestamp
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             
+            # Totals were counted as results streamed in; data-only runs succeed without PDFs
+            journal = self.journal
+            
             # Create automation log file
             log_filename = f"automation_log_{timestamp}.txt"
             log_path = os.path.join("results", log_filename)
@@ -382,10 +726,10 @@ class DamcoTrackingAutomation:
             with open(log_path, 'w') as f:
                 f.write("=== DAMCO TRACKING AUTOMATION LOG ===\n")
                 f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Total Processed: {len(self.results)}\n")
-                f.write(f"Successful: {len(successful_pdfs)}\n")
-                f.write(f"Failed: {len(failed_bookings)}\n")
-                f.write(f"Success Rate: {(len(successful_pdfs) / len(self.results) * 100):.1f}%\n\n")
+                f.write(f"Total Processed: {journal.total}\n")
+                f.write(f"Successful: {journal.successful}\n")
+                f.write(f"Failed: {journal.failed}\n")
+                f.write(f"Success Rate: {journal.success_rate()}\n\n")
                 
                 f.write("=== SUCCESSFUL PDFS ===\n")
                 for pdf in successful_pdfs:
@@ -395,11 +739,16 @@ class DamcoTrackingAutomation:
                 for booking in failed_bookings:
                     f.write(f"❌ {booking}\n")
                 
+                if self.preflight and self.preflight.invalid:
+                    f.write("\n=== SKIPPED ROWS ===\n")
+                    for row in self.preflight.invalid:
+                        f.write(f"⏭️ Row {row['row']}: {row['value']} ({row['error']})\n")
+                
                 f.write("\n=== DETAILED RESULTS ===\n")
-                for result in self.results:
+                for result in journal.entries():
                     f.write(f"FCR: {result['fcr_number']} | Status: {result['status']} | Time: {result['timestamp']}\n")
                     if 'error' in result:
-                        f.write(f"   Error: {result['error']}\n")
+                        f.write(f"   Error ({result.get('error_kind', 'error')}): {result['error']}\n")
             
             # Generate JSON summary
             summary_filename = f"damco_tracking_summary_{timestamp}.json"
@@ -407,17 +756,23 @@ class DamcoTrackingAutomation:
             
             summary_data = {
                 'timestamp': datetime.now().isoformat(),
-                'total_processed': len(self.results),
-                'successful': len(successful_pdfs),
-                'failed': len(failed_bookings),
-                'success_rate': f"{(len(successful_pdfs) / len(self.results) * 100):.1f}%" if self.results else "0%",
+                'total_processed': journal.total,
+                'successful': journal.successful,
+                'failed': journal.failed,
+                'success_rate': journal.success_rate(),
+                'errors_by_kind': dict(journal.error_kinds),
                 'successful_pdfs': successful_pdfs,
                 'failed_bookings': failed_bookings,
-                'detailed_results': self.results
+                'data_file': self.data_file,
+                'timings': self.metrics.summary(),
+                'step_timeouts': self.timeouts.learned_timeouts(self.WAIT_STEPS),
+                'resource_blocking': self.block_resources,
+                'network': self.metrics.counters(),
+                'preflight': self.preflight.report() if self.preflight else None,
+                'journal': journal.path
             }
-            
-            with open(summary_path, 'w') as f:
-                json.dump(summary_data, f, indent=2)
+            # detailed_results are streamed from the journal
+            journal.write_summary(summary_path, summary_data)
                 
             self.logger.info(f"📋 Summary report saved: {summary_filename}")
             self.logger.info(f"📋 Log file saved: {log_filename}")
@@ -430,39 +785,102 @@ class DamcoTrackingAutomation:
             
     def cleanup(self):
         """Clean up resources"""
+        try:
+            self.close_driver()
+        finally:
+            # Chrome has exited (or failed to), so the profile slot can go to the next run
+            self.release_profile()
+            
+    def close_driver(self):
+        """Quit this job's browser session (only its own tabs when attached to the daemon)"""
         try:
             if self.driver:
                 self.logger.info("🔒 Closing browser and cleaning up...")
+                if self.attached:
+                    # Leave the daemon running; only close the tabs this job opened
+                    for handle in self.owned_windows:
+                        self.driver.switch_to.window(handle)
+                        self.driver.close()
                 self.driver.quit()
                 self.logger.info("✅ Cleanup completed")
         except Exception as e:
             self.logger.error(f"❌ Error during cleanup: {str(e)}")
+        finally:
+            self.driver = None
+            self.attached = False
+            self.owned_windows = []
+            
+    def release_profile(self):
+        if self.profile:
+            self.profile.release()
+            self.profile = None
+            
+    def open_journal(self, resume=None):
+        """Start a new checkpoint journal, or continue the one of the run being resumed"""
+        if resume:
+            self.resumed = RunJournal.load_completed(resume, 'fcr_number', self.logger, self.output)
+        journal_path = resume or RunJournal.new_path("damco_tracking")
+        self.journal = RunJournal(journal_path, self.logger)
+        self.logger.info(f"📒 Checkpoint journal: {journal_path}")
+        
+    def open_report(self):
+        """Start the combined PDF report; each booking is appended as soon as it finishes"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        combined_path = os.path.join("results", f"damco_tracking_report_{timestamp}.pdf")
+        self.combiner = IncrementalPdfCombiner(combined_path, self.logger)
+        
+    def open_data_writer(self):
+        """Start the tracking data file when records are requested (--output data|both)"""
+        if self.output != 'pdf':
+            self.data_writer = TrackingDataWriter("damco_tracking_data", self.logger)
+            self.logger.info(f"🗃️ Tracking data file: {self.data_writer.filename}")
+            
+    def close_data_writer(self):
+        """Finish the tracking data file, returns its filename or None"""
+        if self.data_writer:
+            self.data_file = self.data_writer.close()
+            self.data_writer = None
+        return self.data_file
+        
+    def write_metrics(self):
+        """Write the run's step metrics, also when it failed or stopped early"""
+        try:
+            os.makedirs("results", exist_ok=True)
+            self.logger.info(f"⏱️ Step metrics saved: {self.metrics.write_prometheus('damco_tracking')}")
+            self.metrics.log_summary()
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not write step metrics: {str(e)}")
             
-    def run_automation(self, file_path, headless=True):
+    def run_automation(self, file_path, headless=True, resume=None):
         """Main automation workflow"""
         try:
             self.logger.info("🚀 Starting Damco tracking automation...")
             
-            # Setup WebDriver
-            if not self.setup_driver():
-                return False
-                
-            # Navigate to Maersk portal
-            if not self.navigate_to_maersk():
+            # Setup WebDriver, portal and popups (worker pool sets up its own sessions)
+            if self.workers > 1:
+                self.logger.info(f"🧵 Parallel mode with {self.workers} browser workers")
+                os.makedirs("results", exist_ok=True)
+                os.makedirs("results/pdfs", exist_ok=True)
+            elif not self.warm_up():
                 return False
-                
-            # Handle cookie consent and coach popup ONCE
-            self.accept_cookies()
-            self.close_coach_popup()
             
             # Read booking numbers from file
-            booking_numbers = self.read_booking_numbers_from_file(file_path)
-            if not booking_numbers:
+            # Stream booking numbers from file; the first lookup starts as soon as one is read
+            booking_numbers = self.iter_booking_numbers_from_file(file_path)
+            first_booking = next(booking_numbers, None)
+            if first_booking is None:
                 self.logger.error("❌ No booking numbers found in file")
                 return False
+            booking_numbers = itertools.chain([first_booking], booking_numbers)
                 
+            self.open_journal(resume)
+            self.open_report()
+            self.open_data_writer()
+            
             # Process all bookings
             successful_pdfs, failed_bookings = self.process_all_bookings(booking_numbers)
+            self.preflight.log_summary()
+            data_file = self.close_data_writer()
             
             # Generate combined report
             combined_report = self.generate_combined_report(successful_pdfs)
@@ -474,14 +892,16 @@ class DamcoTrackingAutomation:
             result_files = []
             if combined_report:
                 result_files.append(combined_report)
+            if data_file:
+                result_files.append(data_file)
             result_files.extend(successful_pdfs)
             result_files.extend(summary_files)
             
             # Log final results
             self.logger.info("🎉 Damco tracking automation completed successfully!")
-            self.logger.info(f"📊 Total processed: {len(booking_numbers)}")
-            self.logger.info(f"✅ Successful: {len(successful_pdfs)}")
-            self.logger.info(f"❌ Failed: {len(failed_bookings)}")
+            self.logger.info(f"📊 Total processed: {self.journal.total}")
+            self.logger.info(f"✅ Successful: {self.journal.successful}")
+            self.logger.info(f"❌ Failed: {self.journal.failed}")
             
             if successful_pdfs:
                 self.logger.info("📄 Generated PDF files:")
@@ -495,23 +915,186 @@ class DamcoTrackingAutomation:
             return False
         finally:
             self.cleanup()
+            if self.cache:
+                self.cache.close()
+            if self.journal:
+                self.journal.close()
+            if self.combiner:
+                self.combiner.discard()
+            if self.data_writer:
+                self.data_writer.discard()
+            self.write_metrics()
+                
+    def run_watch(self, file_path, interval, cycles=0):
+        """
+        Watchlist mode: re-poll the same bookings every interval seconds (cycles=0 runs
+        until interrupted). Each poll is diffed against the stored snapshot; change events
+        go to a JSONL file and PDFs are only printed for bookings that changed.
+        """
+        try:
+            self.logger.info(f"👀 Starting Damco tracking watch (every {interval:g}s)...")
+            
+            # Snapshots are built from tracking records, and every poll must reach the portal
+            if self.output == 'pdf':
+                self.output = 'both'
+            if self.cache:
+                self.cache.close()
+                self.cache = None
+            self.cache_ttl = 0
+            
+            if self.workers > 1:
+                self.logger.info(f"🧵 Parallel mode with {self.workers} browser workers")
+                os.makedirs("results", exist_ok=True)
+                os.makedirs("results/pdfs", exist_ok=True)
+            elif not self.warm_up():
+                return False
+                
+            booking_numbers = self.read_booking_numbers_from_file(file_path)
+            if not booking_numbers:
+                self.logger.error("❌ No booking numbers found in file")
+                return False
+                
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            events_path = os.path.join("results", f"damco_tracking_events_{timestamp}.jsonl")
+            self.watchlist = Watchlist(self.logger, events_path)
+            self.logger.info(f"🔔 Change events: {events_path}")
+            
+            # One journal per poll, rewritten each cycle, so progress stays readable mid-cycle
+            journal_path = RunJournal.new_path("damco_tracking_watch")
+            
+            cycle = 0
+            while True:
+                cycle += 1
+                started = time.time()
+                self.journal = RunJournal(journal_path, self.logger, fresh=True)
+                self.logger.info(f"🔁 Watch cycle {cycle}: polling {len(booking_numbers)} FCR numbers")
+                
+                self.open_report()
+                changed_pdfs, _ = self.process_all_bookings(booking_numbers)
+                combined_report = self.generate_combined_report(changed_pdfs)
+                journal = self.journal
+                journal.close()
+                self.logger.info(f"📊 Cycle {cycle}: {journal.changed} changed, "
+                                 f"{journal.successful - journal.changed} unchanged, "
+                                 f"{journal.failed} failed in {time.time() - started:.1f}s")
+                if combined_report:
+                    self.logger.info(f"📄 Changes report: {combined_report}")
+                self.metrics.write_prometheus("damco_tracking_watch", timestamped=False)
+                    
+                if cycles and cycle >= cycles:
+                    break
+                time.sleep(max(0, interval - (time.time() - started)))
+                
+            return True
+            
+        except KeyboardInterrupt:
+            self.logger.info("⏹️ Watch stopped")
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Watch failed: {str(e)}")
+            return False
+        finally:
+            self.cleanup()
+            if self.watchlist:
+                self.watchlist.close()
+            if self.journal:
+                self.journal.close()
+            if self.combiner:
+                self.combiner.discard()
 
 def main():
     """Main function for command line usage"""
     if len(sys.argv) < 2:
-        print("Usage: python damco_tracking_maersk.py <file_path> [--headless]")
+        print("Usage: python damco_tracking_maersk.py <file_path> [--headless] [--workers N] [--max-wait SECONDS]")
+        print("       [--cache-ttl SECONDS] (0 disables the lookup cache)")
+        print("       [--resume JOURNAL] (skip items that already succeeded in that run)")
+        print("       [--no-daemon] (always start a fresh Chrome instead of attaching to browser_daemon.py)")
+        print("       [--output pdf|data|both] (data = tracking records only, no PDF printing)")
+        print("       [--watch SECONDS [--cycles N]] (re-poll on a schedule, PDFs only for changed FCRs)")
+        print("       [--portal-url URL] (e.g. the local mock portal started by benchmark.py)")
+        print("       [--block-resources] (skip third-party analytics, ads, embeds and web fonts while loading pages)")
+        print("       [--skip-validation] (only normalize and de-duplicate, no format or check digit test)")
+        print("       [--log-verbosity normal|summary] (summary folds per-item log lines into periodic counts)")
+        print("       [--persistent-profile] (keep cookie consent and dismissed popups across runs)")
+        print("       [--recycle-after 500] (restart Chrome after N items, 0 = never)")
+        print("       [--max-browser-mb 2048] (restart Chrome once it uses more memory, 0 = no limit)")
+        print("       [--retries 2] (retry timed-out or failed lookups with backoff, 0 = never)")
         print("Supported file types: .csv, .xlsx, .xls")
         sys.exit(1)
         
     file_path = sys.argv[1]
     headless = '--headless' in sys.argv or '--no-gui' in sys.argv
     
+    workers = 1
+    if '--workers' in sys.argv:
+        workers = int(sys.argv[sys.argv.index('--workers') + 1])
+    
+    max_wait = 10
+    if '--max-wait' in sys.argv:
+        max_wait = float(sys.argv[sys.argv.index('--max-wait') + 1])
+    
+    cache_ttl = 3600
+    if '--cache-ttl' in sys.argv:
+        cache_ttl = float(sys.argv[sys.argv.index('--cache-ttl') + 1])
+    
+    resume = None
+    if '--resume' in sys.argv:
+        resume = sys.argv[sys.argv.index('--resume') + 1]
+    
+    output = 'pdf'
+    if '--output' in sys.argv:
+        output = sys.argv[sys.argv.index('--output') + 1]
+        if output not in ('pdf', 'data', 'both'):
+            print(f"❌ Unknown output: {output} (use pdf, data or both)")
+            sys.exit(1)
+    
     if not os.path.exists(file_path):
         print(f"❌ File not found: {file_path}")
         sys.exit(1)
     
-    automation = DamcoTrackingAutomation(headless=headless)
-    success = automation.run_automation(file_path, headless)
+    watch = None
+    if '--watch' in sys.argv:
+        watch = float(sys.argv[sys.argv.index('--watch') + 1])
+    
+    cycles = 0
+    if '--cycles' in sys.argv:
+        cycles = int(sys.argv[sys.argv.index('--cycles') + 1])
+    
+    portal_url = "https://www.maersk.com/mymaersk-scm-track/"
+    if '--portal-url' in sys.argv:
+        portal_url = sys.argv[sys.argv.index('--portal-url') + 1]
+    
+    log_verbosity = 'normal'
+    if '--log-verbosity' in sys.argv:
+        log_verbosity = sys.argv[sys.argv.index('--log-verbosity') + 1]
+        if log_verbosity not in ('normal', 'summary'):
+            print(f"❌ Unknown log verbosity: {log_verbosity} (use normal or summary)")
+            sys.exit(1)
+    
+    recycle_after = DEFAULT_MAX_ITEMS
+    if '--recycle-after' in sys.argv:
+        recycle_after = int(sys.argv[sys.argv.index('--recycle-after') + 1])
+    
+    max_browser_mb = DEFAULT_MAX_RSS_MB
+    if '--max-browser-mb' in sys.argv:
+        max_browser_mb = int(sys.argv[sys.argv.index('--max-browser-mb') + 1])
+    
+    retries = DEFAULT_RETRIES
+    if '--retries' in sys.argv:
+        retries = int(sys.argv[sys.argv.index('--retries') + 1])
+    
+    automation = DamcoTrackingAutomation(headless=headless, workers=workers, max_wait=max_wait,
+                                         cache_ttl=cache_ttl, use_daemon='--no-daemon' not in sys.argv,
+                                         output=output, portal_url=portal_url,
+                                         block_resources='--block-resources' in sys.argv,
+                                         persistent_profile='--persistent-profile' in sys.argv,
+                                         validate_ids='--skip-validation' not in sys.argv,
+                                         log_verbosity=log_verbosity, recycle_after=recycle_after,
+                                         max_browser_mb=max_browser_mb, retries=retries)
+    if watch is not None:
+        success = automation.run_watch(file_path, watch, cycles=cycles)
+    else:
+        success = automation.run_automation(file_path, headless, resume=resume)
     
     sys.exit(0 if success else 1)
 
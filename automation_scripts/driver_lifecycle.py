@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Driver Lifecycle
+Decides when a long-running Chrome session should be replaced: after a number of
+items, when the browser's memory passes a ceiling, or when per-item latency has
+drifted well above where the session started. The automation then quits the driver
+and repeats its warm-up, so throughput stays flat over thousands of items.
+"""
+
+import os
+from collections import deque
+
+# Items per browser session before it is replaced regardless of health
+DEFAULT_MAX_ITEMS = 500
+
+# Resident memory of chromedriver plus the Chrome processes it launched
+DEFAULT_MAX_RSS_MB = 2048
+
+# Restart once the recent latency average is this many times the session's starting one
+SLOWDOWN_FACTOR = 2.0
+
+# Items averaged for the starting and the recent latency
+LATENCY_WINDOW = 25
+
+# Reading /proc for every process is not free, so memory is checked every few items
+RSS_CHECK_EVERY = 10
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of pid and all its descendants (Chrome included), Linux only"""
+    parents = {}
+    rss_pages = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        parents.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        total += rss_pages.get(current, 0)
+        pending.extend(parents.get(current, []))
+    return total * os.sysconf("SC_PAGE_SIZE")
+
+
+def browser_rss(driver):
+    """
+    Memory of the browser behind driver in bytes, or None when it cannot be measured
+    (no /proc, or attached to a daemon Chrome that chromedriver did not launch)
+    """
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    if process is None or not os.path.isdir("/proc"):
+        return None
+    return process_tree_rss(process.pid)
+
+
+class DriverRecycler:
+    """
+    Per-session bookkeeping for one driver. Call record() after every item that
+    used the browser; once due is set (the reason the session should be replaced)
+    it stays set until reset() after a successful restart. max_items or max_rss_mb
+    of 0 disables that limit.
+    """
+
+    def __init__(self, logger, max_items=DEFAULT_MAX_ITEMS, max_rss_mb=DEFAULT_MAX_RSS_MB,
+                 slowdown=SLOWDOWN_FACTOR, window=LATENCY_WINDOW):
+        self.logger = logger
+        self.max_items = max_items
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.slowdown = slowdown
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        """Start counting for a fresh browser session"""
+        self.items = 0
+        self.baseline = None
+        self.recent = deque(maxlen=self.window)
+        self.due = None
+
+    def record(self, driver, latency):
+        self.items += 1
+        self.recent.append(latency)
+        if self.baseline is None and len(self.recent) == self.window:
+            self.baseline = sum(self.recent) / self.window
+        if self.due is None:
+            self.due = self.check(driver)
+        return self.due
+
+    def check(self, driver):
+        if self.max_items and self.items >= self.max_items:
+            return f"{self.items} items in this session"
+
+        if self.max_rss and self.items % RSS_CHECK_EVERY == 0:
+            rss = browser_rss(driver)
+            if rss and rss > self.max_rss:
+                return f"browser memory {rss / (1024 * 1024):.0f} MB over {self.max_rss / (1024 * 1024):.0f} MB"
+
+        # Compare non-overlapping windows: the first one of the session against the latest
+        if self.baseline and self.items >= 2 * self.window:
+            average = sum(self.recent) / self.window
+            if average > self.baseline * self.slowdown:
+                return f"lookups slowed from {self.baseline:.1f}s to {average:.1f}s"
+        return None
+
+    def log_restart(self, reason):
+        self.logger.info(f"♻️ Restarting Chrome ({reason})")
@@ -7,8 +7,6 @@ Replace this with your actual automation logic
 import os
 import sys
 import time
-import logging
-import pandas as pd
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -18,33 +16,23 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import json
+from step_metrics import StepMetrics
+from logging_setup import log_item, setup_automation_logging
+from run_journal import RunJournal
 
 class ExampleAutomation:
-    def __init__(self, headless=True):
-        self.setup_logging()
+    def __init__(self, headless=True, log_verbosity='normal'):
+        self.setup_logging(log_verbosity)
         self.driver = None
         self.wait = None
         self.headless = headless
-        self.results = []
+        # Each item's result is streamed to this JSONL journal as soon as it finishes
+        self.journal = None
+        self.metrics = StepMetrics("example", self.logger)
         
-    def setup_logging(self):
-        """Setup logging configuration"""
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-            
-        log_filename = f"example_automation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        log_path = os.path.join(log_dir, log_filename)
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_path),
-                logging.StreamHandler(sys.stdout)
-            ]
-        )
-        self.logger = logging.getLogger('ExampleAutomation')
+    def setup_logging(self, verbosity='normal'):
+        """Setup logging configuration (queued, rotating JSON file in logs/ plus console)"""
+        self.logger = setup_automation_logging('ExampleAutomation', 'example_automation', verbosity)
         
     def setup_driver(self):
         """Setup Chrome WebDriver with options"""
@@ -81,6 +69,8 @@ class ExampleAutomation:
         try:
             self.logger.info(f"📋 Reading input data from file...")
             
+            import pandas as pd  # Heavy import, only needed once a file is actually read
+            
             # Auto-detect file type
             ext = os.path.splitext(file_path)[1].lower()
             
@@ -110,19 +100,23 @@ class ExampleAutomation:
             # Example: Navigate to website, fill forms, extract data
             
             # Navigate to target website
-            self.driver.get("https://example-website.com")
+            with self.metrics.span("navigate"):
+                self.driver.get("https://example-website.com")
             
             # Find input field and enter data
-            input_field = self.wait.until(EC.presence_of_element_located((By.ID, "search-input")))
-            input_field.clear()
-            input_field.send_keys(item)
+            with self.metrics.span("form_input"):
+                input_field = self.wait.until(EC.presence_of_element_located((By.ID, "search-input")))
+                input_field.clear()
+                input_field.send_keys(item)
             
             # Submit form
-            submit_btn = self.wait.until(EC.element_to_be_clickable((By.ID, "submit-btn")))
-            submit_btn.click()
+            with self.metrics.span("submit"):
+                submit_btn = self.wait.until(EC.element_to_be_clickable((By.ID, "submit-btn")))
+                submit_btn.click()
             
             # Wait for results and extract data
-            self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "results")))
+            with self.metrics.span("page_ready"):
+                self.wait.until(EC.presence_of_element_located((By.CLASS_NAME, "results")))
             
             # Extract result data (customize based on your needs)
             result_data = {
@@ -132,14 +126,14 @@ class ExampleAutomation:
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.results.append(result_data)
+            self.journal.write(index, result_data)
             self.logger.info(f"✅ Successfully processed: {item}")
             
             return True
             
         except Exception as e:
             self.logger.error(f"❌ Error processing {item}: {str(e)}")
-            self.results.append({
+            self.journal.write(index, {
                 'item': item,
                 'status': 'error',
                 'error': str(e),
@@ -173,9 +167,8 @@ class ExampleAutomation:
             return None
             
     def generate_html_report(self):
-        """Generate HTML report content"""
-        successful = [r for r in self.results if r['status'] == 'success']
-        failed = [r for r in self.results if r['status'] == 'error']
+        """Generate HTML report content from the result journal"""
+        journal = self.journal
         
         html = f"""
         <!DOCTYPE html>
@@ -201,10 +194,10 @@ class ExampleAutomation:
             
             <div class="summary">
                 <h2>📈 Summary</h2>
-                <p><strong>Total Processed:</strong> {len(self.results)}</p>
-                <p><strong class="success">Successful:</strong> {len(successful)}</p>
-                <p><strong class="error">Failed:</strong> {len(failed)}</p>
-                <p><strong>Success Rate:</strong> {(len(successful)/len(self.results)*100):.1f}%</p>
+                <p><strong>Total Processed:</strong> {journal.total}</p>
+                <p><strong class="success">Successful:</strong> {journal.successful}</p>
+                <p><strong class="error">Failed:</strong> {journal.failed}</p>
+                <p><strong>Success Rate:</strong> {journal.success_rate()}</p>
             </div>
             
             <h2>📋 Detailed Results</h2>
@@ -217,7 +210,7 @@ class ExampleAutomation:
                 </tr>
         """
         
-        for result in self.results:
+        for result in journal.entries():
             status_class = "success" if result['status'] == 'success' else "error"
             data_or_error = result.get('data', result.get('error', 'N/A'))
             html += f"""
@@ -253,8 +246,9 @@ class ExampleAutomation:
             self.logger.info("🚀 Starting example automation...")
             
             # Setup WebDriver
-            if not self.setup_driver():
-                return False
+            with self.metrics.span("driver_setup"):
+                if not self.setup_driver():
+                    return False
                 
             # Read input data
             data_list = self.read_input_file(file_path)
@@ -262,10 +256,15 @@ class ExampleAutomation:
                 self.logger.error("❌ No data found in input file")
                 return False
                 
+            journal_path = RunJournal.new_path("example_automation")
+            self.journal = RunJournal(journal_path, self.logger)
+            self.logger.info(f"📒 Result journal: {journal_path}")
+            
             # Process each item
             for i, item in enumerate(data_list, start=1):
-                self.logger.info(f"🔍 Processing item {i}/{len(data_list)}: {item}")
-                self.process_single_item(item, i)
+                with log_item(item):
+                    self.logger.info(f"🔍 Processing item {i}/{len(data_list)}: {item}")
+                    self.process_single_item(item, i)
                 
                 # Wait between requests to avoid rate limiting
                 time.sleep(2)
@@ -274,13 +273,10 @@ class ExampleAutomation:
             report_file = self.generate_report()
             
             # Log final results
-            successful = len([r for r in self.results if r['status'] == 'success'])
-            failed = len([r for r in self.results if r['status'] == 'error'])
-            
             self.logger.info("🎉 Example automation completed!")
-            self.logger.info(f"📊 Total processed: {len(data_list)}")
-            self.logger.info(f"✅ Successful: {successful}")
-            self.logger.info(f"❌ Failed: {failed}")
+            self.logger.info(f"📊 Total processed: {self.journal.total}")
+            self.logger.info(f"✅ Successful: {self.journal.successful}")
+            self.logger.info(f"❌ Failed: {self.journal.failed}")
             
             if report_file:
                 self.logger.info(f"📄 Report generated: {report_file}")
@@ -292,11 +288,24 @@ class ExampleAutomation:
             return False
         finally:
             self.cleanup()
+            if self.journal:
+                self.journal.close()
+            self.write_metrics()
+            
+    def write_metrics(self):
+        """Write the step timings of every run, failed ones included (they matter most there)"""
+        try:
+            os.makedirs("results", exist_ok=True)
+            self.logger.info(f"⏱️ Step metrics saved: {self.metrics.write_prometheus('example_automation')}")
+            self.metrics.log_summary()
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not write step metrics: {str(e)}")
 
 def main():
     """Main function for command line usage"""
     if len(sys.argv) < 2:
         print("Usage: python example_automation.py <file_path> [--headless]")
+        print("       [--log-verbosity normal|summary] (summary folds per-item log lines into periodic counts)")
         print("Supported file types: .csv, .xlsx, .xls")
         sys.exit(1)
         
@@ -307,7 +316,14 @@ def main():
         print(f"❌ File not found: {file_path}")
         sys.exit(1)
     
-    automation = ExampleAutomation(headless=headless)
+    log_verbosity = 'normal'
+    if '--log-verbosity' in sys.argv:
+        log_verbosity = sys.argv[sys.argv.index('--log-verbosity') + 1]
+        if log_verbosity not in ('normal', 'summary'):
+            print(f"❌ Unknown log verbosity: {log_verbosity} (use normal or summary)")
+            sys.exit(1)
+    
+    automation = ExampleAutomation(headless=headless, log_verbosity=log_verbosity)
     success = automation.run_automation(file_path, headless)
     
     sys.exit(0 if success else 1)
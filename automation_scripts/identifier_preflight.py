@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Identifier Pre-flight
+Normalizes, validates and de-duplicates lookup identifiers as they stream in from
+the upload, so malformed and repeated rows never cost a portal round trip
+"""
+
+import re
+import string
+
+# Owner code (3 letters) + category (U, J, Z or R) + 6-digit serial + check digit
+CONTAINER_PATTERN = re.compile(r"[A-Z]{3}[UJZR]\d{7}")
+
+# Office code + 7-digit serial, e.g. CTG2358534
+FCR_PATTERN = re.compile(r"[A-Z]{3}\d{7}")
+
+# Separators people type into container numbers ("MSKU 123456-7")
+CONTAINER_SEPARATORS = re.compile(r"[\s\-./]")
+
+
+def _letter_values():
+    values = {}
+    value = 10
+    for letter in string.ascii_uppercase:
+        # Letter values skip multiples of 11
+        if value % 11 == 0:
+            value += 1
+        values[letter] = value
+        value += 1
+    return values
+
+
+LETTER_VALUES = _letter_values()
+
+
+def iso6346_check_digit(code):
+    """Check digit for the first ten characters of a container number"""
+    total = sum((LETTER_VALUES[c] if c.isalpha() else int(c)) * 2 ** i for i, c in enumerate(code[:10]))
+    return total % 11 % 10
+
+
+def normalize_container_number(value):
+    return CONTAINER_SEPARATORS.sub("", str(value)).upper()
+
+
+def normalize_fcr_number(value):
+    return "".join(str(value).split()).upper()
+
+
+def container_number_error(number):
+    """Reason a normalized container number is invalid, or None"""
+    if not CONTAINER_PATTERN.fullmatch(number):
+        return "not in ISO 6346 format (4 letters ending in U/J/Z/R + 7 digits)"
+    expected = iso6346_check_digit(number)
+    if int(number[10]) != expected:
+        return f"check digit {number[10]} does not match, expected {expected}"
+    return None
+
+
+def fcr_number_error(number):
+    """Reason a normalized FCR number is invalid, or None"""
+    if not FCR_PATTERN.fullmatch(number):
+        return "not an FCR number (3 letters + 7 digits)"
+    return None
+
+
+KINDS = {
+    'container': (normalize_container_number, container_number_error, "container number"),
+    'fcr': (normalize_fcr_number, fcr_number_error, "FCR number")
+}
+
+
+class IdentifierPreflight:
+    """
+    Filters a stream of (row_number, value) pairs down to unique, valid identifiers.
+    Invalid rows are logged as soon as they are read; duplicate rows are mapped to
+    the first occurrence so one lookup serves all of them.
+    """
+
+    def __init__(self, kind, logger, validate=True):
+        self.normalize, self.error_for, self.label = KINDS[kind]
+        self.logger = logger
+        self.validate = validate
+        self.rows = {}
+        self.invalid = []
+
+    def filter(self, rows):
+        for row_number, value in rows:
+            identifier = self.normalize(value)
+            if identifier in self.rows:
+                self.rows[identifier].append(row_number)
+                self.logger.info(f"♻️ Row {row_number}: {identifier} duplicates row {self.rows[identifier][0]}, "
+                                 f"sharing its lookup")
+                continue
+
+            error = self.error_for(identifier) if self.validate else None
+            if error:
+                self.invalid.append({'row': row_number, 'value': str(value), 'error': error})
+                self.logger.error(f"❌ Row {row_number}: {value!r} skipped, {error}")
+                continue
+
+            self.rows[identifier] = [row_number]
+            yield identifier
+
+    def report(self):
+        """Pre-flight section for the JSON summary"""
+        return {
+            'unique': len(self.rows),
+            'invalid_rows': self.invalid,
+            'duplicates': {identifier: rows for identifier, rows in self.rows.items() if len(rows) > 1}
+        }
+
+    def log_summary(self):
+        duplicate_rows = sum(len(rows) - 1 for rows in self.rows.values())
+        if self.invalid or duplicate_rows:
+            self.logger.info(f"🧹 Pre-flight: {len(self.rows)} unique {self.label}s, "
+                             f"{duplicate_rows} duplicate rows merged, {len(self.invalid)} invalid rows skipped")
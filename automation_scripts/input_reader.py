@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Streaming Input Reader
+Detects the identifier column from the header row and streams only that column
+from CSV/Excel uploads, yielding identifiers lazily. Rows that cannot be read are
+logged and skipped; only a file that cannot be opened at all fails the run.
+"""
+
+import csv
+import itertools
+import os
+
+
+class BadRow:
+    """Yielded in place of a row that could not be read, so the stream can skip it"""
+
+    def __init__(self, reason):
+        self.reason = reason
+
+
+def detect_column(header, possible_columns, match_terms):
+    """Return the index of the identifier column, or None if no header matches"""
+    for position, name in enumerate(header):
+        col_lower = str(name if name is not None else "").lower().strip()
+        if col_lower in possible_columns or any(term in col_lower for term in match_terms):
+            return position
+    return None
+
+
+def clean_value(value):
+    """Turn a cell into an identifier string, or None for empty cells"""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        # Excel stores numeric identifiers as floats
+        value = int(value)
+    value = str(value).strip()
+    if not value or value.lower() == "nan":
+        return None
+    return value
+
+
+def open_identifier_stream(file_path, possible_columns, match_terms, logger, label="identifiers",
+                           with_rows=False):
+    """
+    Read the header and the first row eagerly (so a missing or unreadable file
+    fails before the first lookup) and return a generator that streams the
+    identifier column row by row. A row that cannot be read is logged with its
+    row number and skipped; if the file breaks off mid-way, the rows read so far
+    are kept and the stream ends, so a partial run still finishes and reports.
+    With with_rows, (row_number, value) pairs are yielded, numbered like the
+    sheet (the header is row 1).
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    logger.info(f"📄 File extension detected: {ext}")
+
+    if ext == ".csv":
+        header, rows, close = _open_csv(file_path)
+    elif ext == ".xlsx":
+        header, rows, close = _open_xlsx(file_path)
+    elif ext == ".xls":
+        header, rows, close = _open_xls(file_path)
+    else:
+        raise ValueError(f"Unsupported file type: {ext}. Please use .csv or .xlsx")
+
+    logger.info(f"📋 Columns found: {list(header)}")
+    column = detect_column(header, possible_columns, match_terms)
+    if column is None:
+        # If no specific column found, use first column
+        column = 0
+        logger.warning(f"⚠️ No {label} column found, using first column: {header[0] if header else 0}")
+    else:
+        logger.info(f"📋 Using column: {header[column]}")
+
+    numbered = enumerate(rows(column), start=2)
+    try:
+        first = next(numbered, None)
+    except Exception:
+        close()
+        raise
+
+    def stream():
+        count = 0
+        skipped = 0
+        row_number = 1
+        try:
+            for row_number, row in itertools.chain([first] if first else [], numbered):
+                if isinstance(row, BadRow):
+                    skipped += 1
+                    logger.error(f"❌ Row {row_number}: skipped, could not be read ({row.reason})")
+                    continue
+                value = clean_value(row)
+                if value is not None:
+                    count += 1
+                    yield (row_number, value) if with_rows else value
+        except Exception as e:
+            logger.error(f"❌ Could not read past row {row_number}: {str(e)}; the remaining rows were skipped")
+        finally:
+            close()
+            unreadable = f" ({skipped} unreadable rows skipped)" if skipped else ""
+            logger.info(f"📊 Read {count} {label} from file{unreadable}")
+
+    return stream()
+
+
+def _decoded(value):
+    """False if value still holds undecodable bytes (surrogateescape)"""
+    try:
+        value.encode("utf-8")
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def _open_csv(file_path):
+    # Undecodable bytes are kept as surrogates so only the rows that contain them are lost
+    f = open(file_path, newline="", encoding="utf-8-sig", errors="surrogateescape")
+    reader = csv.reader(f)
+    try:
+        header = next(reader, [])
+    except csv.Error:
+        f.close()
+        raise
+
+    def rows(column):
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield BadRow(str(e))
+                continue
+            value = row[column] if column < len(row) else None
+            yield BadRow("not valid UTF-8") if value and not _decoded(value) else value
+
+    return header, rows, f.close
+
+
+def _open_xlsx(file_path):
+    import openpyxl  # Only needed for Excel uploads
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    sheet = workbook.active
+    header = next(sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+
+    def rows(column):
+        for (value,) in sheet.iter_rows(min_row=2, min_col=column + 1, max_col=column + 1, values_only=True):
+            yield value
+
+    return list(header), rows, workbook.close
+
+
+def _open_xls(file_path):
+    import pandas as pd  # Legacy .xls has no streaming reader; load just the one column
+
+    header = list(pd.read_excel(file_path, engine="xlrd", nrows=0).columns)
+
+    def rows(column):
+        data = pd.read_excel(file_path, engine="xlrd", usecols=[column])
+        for value in data.iloc[:, 0]:
+            yield None if pd.isna(value) else value
+
+    return header, rows, lambda: None
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Logging Setup
+Queue-backed logging for the automation scripts: callers only enqueue records, a
+background listener thread formats them and does the file and console I/O. Files in
+logs/ are JSON Lines, rotated by size, and old runs are pruned. "summary" verbosity
+folds per-item INFO chatter into one line per interval.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+LOG_DIR = "logs"
+
+# Size-based rotation per run, plus a cap on how many runs per script are kept
+MAX_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+KEEP_RUNS = 50
+
+CONSOLE_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+VERBOSITY_LEVELS = ('normal', 'summary')
+
+# Seconds between summary lines in "summary" verbosity
+SUMMARY_INTERVAL = 30.0
+
+# Identifier the current thread is working on, attached to every record it logs
+_current_item = ContextVar("spf_log_item", default=None)
+
+
+@contextmanager
+def log_item(identifier):
+    """Tag all records logged inside the block with the item being processed"""
+    token = _current_item.set(identifier)
+    try:
+        yield
+    finally:
+        _current_item.reset(token)
+
+
+class ItemContextFilter(logging.Filter):
+    def filter(self, record):
+        record.item = _current_item.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, item, thread"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        if getattr(record, 'item', None):
+            entry['item'] = record.item
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class ItemSummaryHandler(logging.Handler):
+    """
+    Listener-side handler for "summary" verbosity. Per-item records below WARNING
+    are counted by their leading symbol instead of written; everything else is
+    passed through to the wrapped handlers unchanged.
+    """
+
+    def __init__(self, handlers, interval=SUMMARY_INTERVAL):
+        super().__init__()
+        self.targets = handlers
+        self.interval = interval
+        self.counts = Counter()
+        self.items = set()
+        self.window_start = time.monotonic()
+
+    def emit(self, record):
+        if getattr(record, 'item', None) and record.levelno < logging.WARNING:
+            message = record.getMessage()
+            self.counts[message.split(" ", 1)[0] if message else "-"] += 1
+            self.items.add(record.item)
+        else:
+            self.forward(record)
+        if time.monotonic() - self.window_start >= self.interval:
+            self.flush_summary()
+
+    def forward(self, record):
+        for handler in self.targets:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def flush_summary(self):
+        if self.counts:
+            parts = ", ".join(f"{count}× {kind}" for kind, count in self.counts.most_common())
+            self.forward(logging.makeLogRecord({
+                'name': 'LogSummary', 'levelno': logging.INFO, 'levelname': 'INFO',
+                'msg': f"🧾 {len(self.items)} items: {parts}", 'item': None
+            }))
+        self.counts.clear()
+        self.items.clear()
+        self.window_start = time.monotonic()
+
+    def close(self):
+        self.flush_summary()
+        for handler in self.targets:
+            handler.close()
+        super().close()
+
+
+def prune_old_logs(log_prefix, keep=KEEP_RUNS, log_dir=LOG_DIR):
+    """Delete the oldest runs' log files (and their rotated parts) beyond keep"""
+    runs = sorted(name for name in os.listdir(log_dir)
+                  if name.startswith(f"{log_prefix}_") and name.endswith(".log"))
+    for name in runs[:-keep] if keep else []:
+        for candidate in [name] + [f"{name}.{n}" for n in range(1, BACKUP_COUNT + 1)]:
+            try:
+                os.remove(os.path.join(log_dir, candidate))
+            except OSError:
+                pass
+
+
+def setup_automation_logging(logger_name, log_prefix, verbosity='normal'):
+    """
+    Route all logging through a queue to a rotating JSON Lines file in logs/ and the
+    console, and return the named logger. Like logging.basicConfig() this does
+    nothing when the root logger already has handlers (worker service, benchmark).
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return logging.getLogger(logger_name)
+    if verbosity not in VERBOSITY_LEVELS:
+        raise ValueError(f"Unknown log verbosity: {verbosity} (use {', '.join(VERBOSITY_LEVELS)})")
+
+    os.makedirs(LOG_DIR, exist_ok=True)
+    log_path = os.path.join(LOG_DIR, f"{log_prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+    file_handler = logging.handlers.RotatingFileHandler(log_path, maxBytes=MAX_BYTES,
+                                                        backupCount=BACKUP_COUNT, encoding="utf-8")
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    prune_old_logs(log_prefix)
+
+    handlers = [file_handler, console_handler]
+    if verbosity == 'summary':
+        handlers = [ItemSummaryHandler(handlers)]
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(ItemContextFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(logging.INFO)
+
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+
+    def stop():
+        # Drain what is still queued before the interpreter exits
+        listener.stop()
+        for handler in handlers:
+            handler.close()
+    atexit.register(stop)
+
+    return logging.getLogger(logger_name)
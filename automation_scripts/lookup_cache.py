@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Lookup Result Cache
+On-disk SQLite cache of rendered PDFs and extracted status per (portal, identifier).
+Freshness is decided per reader (its TTL); entries are only evicted by size, LRU first
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_CACHE_PATH = os.path.join("cache", "lookup_cache.sqlite3")
+
+
+class LookupCache:
+    """
+    Shared by all workers of a run and by concurrent runs (SQLite handles file locking).
+    Runs may use different TTLs, so an entry too old for this run is skipped, not
+    deleted: a run with a longer TTL can still use it.
+    """
+
+    def __init__(self, logger, path=DEFAULT_CACHE_PATH, ttl=3600, max_bytes=500 * 1024 * 1024):
+        self.logger = logger
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lookups (
+                portal TEXT NOT NULL,
+                identifier TEXT NOT NULL,
+                pdf BLOB,
+                status TEXT,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL,
+                PRIMARY KEY (portal, identifier)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS lookups_lru ON lookups (last_access)")
+        self.conn.commit()
+
+    def get(self, portal, identifier):
+        """Return {'pdf', 'status', 'fetched_at'} for an entry fresh by this cache's TTL, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT pdf, status, fetched_at FROM lookups WHERE portal = ? AND identifier = ? AND fetched_at >= ?",
+                (portal, identifier, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+
+            pdf, status, fetched_at = row
+
+            self.conn.execute(
+                "UPDATE lookups SET last_access = ? WHERE portal = ? AND identifier = ?",
+                (time.time(), portal, identifier)
+            )
+            self.conn.commit()
+
+        return {
+            'pdf': pdf,
+            'status': json.loads(status) if status else None,
+            'fetched_at': fetched_at
+        }
+
+    def put(self, portal, identifier, pdf=None, status=None):
+        """Store a fresh lookup result, then evict least recently used entries over the size limit"""
+        now = time.time()
+        size = len(pdf or b"") + len(json.dumps(status) if status is not None else "")
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO lookups (portal, identifier, pdf, status, fetched_at, last_access, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (portal, identifier, pdf, json.dumps(status) if status is not None else None, now, now, size)
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM lookups").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        evicted = 0
+        for portal, identifier, size in self.conn.execute(
+                "SELECT portal, identifier, size FROM lookups ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM lookups WHERE portal = ? AND identifier = ?", (portal, identifier))
+            total -= size
+            evicted += 1
+        self.logger.info(f"🧹 Evicted {evicted} cached lookups to stay under the cache size limit")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
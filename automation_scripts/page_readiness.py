@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Page Readiness
+Waits for real page-load signals (result selector, network idle, DOM quiescence)
+instead of fixed sleeps before a page is printed
+"""
+
+import json
+import time
+
+# Requests that may stay in flight on a page that counts as network-idle (like
+# Puppeteer's networkidle2): long-polls and analytics beacons that never finish
+# would otherwise hold every wait until max_wait
+MAX_INFLIGHT = 2
+
+# Request types that stay open for the life of the page; never tracked at all
+LONG_LIVED_TYPES = ("EventSource", "WebSocket")
+
+# Installs a MutationObserver in the current document (once).
+# window.__spfReady survives only as long as the document, so a navigation resets it.
+INSTALL_OBSERVER = """
+if (!window.__spfReady) {
+    window.__spfReady = {last: performance.now(), armed: null};
+    new MutationObserver(function () { window.__spfReady.last = performance.now(); })
+        .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+"""
+
+READINESS_SCRIPT = INSTALL_OBSERVER + """
+var selector = arguments[0];
+var now = performance.now();
+var state = window.__spfReady;
+return {
+    quiet: (now - state.last) / 1000,
+    changed: state.armed === null || state.last > state.armed,
+    complete: document.readyState === 'complete',
+    found: selector ? document.querySelector(selector) !== null : false
+};
+"""
+
+ARM_SCRIPT = INSTALL_OBSERVER + """
+window.__spfReady.armed = performance.now();
+"""
+
+
+class PageReadiness:
+    """Event-driven replacement for time.sleep() after navigation-triggering actions"""
+
+    def __init__(self, driver, logger, max_wait=10, network_idle=0.5, dom_quiet=0.5,
+                 max_inflight=MAX_INFLIGHT, use_network=True, poll_interval=0.1, metrics=None):
+        self.driver = driver
+        self.logger = logger
+        self.max_wait = max_wait
+        self.network_idle = network_idle
+        self.dom_quiet = dom_quiet
+        self.max_inflight = max_inflight
+        self.use_network = use_network
+        self.poll_interval = poll_interval
+        # Optional StepMetrics that receives request and byte counters
+        self.metrics = metrics
+        self.inflight = set()
+        self.last_network_activity = time.monotonic()
+
+    @staticmethod
+    def enable_network_events(chrome_options):
+        """Turn on the CDP performance log so Network.* events can be observed"""
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    def arm(self):
+        """
+        Call right before the click/submit that loads the page to wait for.
+        Marks the current document so it only counts as ready once it changed.
+        """
+        try:
+            self.driver.execute_script(ARM_SCRIPT)
+        except Exception:
+            pass
+        # Requests issued before the action must not hold up readiness
+        self.poll_network()
+        self.inflight.clear()
+        self.last_network_activity = time.monotonic()
+
+    def poll_network(self):
+        """Drain CDP network events from the performance log and track in-flight requests"""
+        if not self.use_network:
+            return
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            self.logger.warning(f"⚠️ Network events unavailable, using DOM signals only: {str(e)}")
+            self.use_network = False
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, ValueError):
+                continue
+            method = message.get("method", "")
+            params = message.get("params", {})
+            request_id = params.get("requestId")
+
+            if method == "Network.requestWillBeSent":
+                if params.get("type") in LONG_LIVED_TYPES:
+                    continue
+                if not params.get("request", {}).get("url", "").startswith("data:"):
+                    self.inflight.add(request_id)
+                    self.last_network_activity = time.monotonic()
+            elif method in ("Network.loadingFinished", "Network.loadingFailed"):
+                if request_id in self.inflight:
+                    # Only tracked requests count as activity (not long-lived or pre-arm ones)
+                    self.inflight.discard(request_id)
+                    self.last_network_activity = time.monotonic()
+                if self.metrics and method == "Network.loadingFinished":
+                    self.metrics.add("network_requests")
+                    self.metrics.add("network_bytes", int(params.get("encodedDataLength", 0)))
+                elif self.metrics and params.get("blockedReason"):
+                    self.metrics.add("blocked_requests")
+
+    def network_is_idle(self, settle=True):
+        """
+        At most max_inflight requests in flight (and none started/finished for
+        network_idle seconds if settle)
+        """
+        if not self.use_network:
+            return True
+        if len(self.inflight) > self.max_inflight:
+            return False
+        return not settle or time.monotonic() - self.last_network_activity >= self.network_idle
+
+    def wait_until_ready(self, result_selector=None, label="page"):
+        """
+        Block until the page is ready to print. Ready means the portal's result
+        selector is present, or the network is idle and the DOM stopped changing.
+        Returns False if max_wait elapsed first (the caller may still print).
+        """
+        start = time.monotonic()
+        deadline = start + self.max_wait
+
+        while True:
+            self.poll_network()
+            try:
+                state = self.driver.execute_script(READINESS_SCRIPT, result_selector)
+            except Exception:
+                # Document is being replaced mid-navigation; try again shortly
+                state = None
+
+            if state and state["changed"] and state["complete"]:
+                if state["found"] and self.network_is_idle(settle=False):
+                    break
+                if state["quiet"] >= self.dom_quiet and self.network_is_idle():
+                    break
+
+            if time.monotonic() >= deadline:
+                self.logger.warning(f"⚠️ {label} not ready after {self.max_wait}s, continuing anyway")
+                return False
+            time.sleep(self.poll_interval)
+
+        self.logger.info(f"⏱️ {label} ready after {time.monotonic() - start:.2f}s")
+        return True
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Streamed PDF Capture
+Prints the current page with Page.printToPDF in stream transfer mode and copies
+the document to disk chunk by chunk, so no full base64 copy is ever held in memory
+"""
+
+import base64
+import os
+import threading
+
+# Print settings shared by every tracking PDF
+PRINT_OPTIONS = {
+    "format": "A4",
+    "printBackground": True,
+    "marginTop": 0.4,
+    "marginBottom": 0.4,
+    "marginLeft": 0.4,
+    "marginRight": 0.4
+}
+
+# Bytes requested per IO.read call
+CHUNK_SIZE = 256 * 1024
+
+
+def _temp_path(pdf_path):
+    return f"{pdf_path}.{os.getpid()}.{threading.get_ident()}.part"
+
+
+def write_pdf_atomic(pdf_path, data):
+    """Write PDF bytes (e.g. from the lookup cache) so readers never see a partial file"""
+    tmp_path = _temp_path(pdf_path)
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, pdf_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def print_page_to_pdf(driver, pdf_path, options=None):
+    """
+    Print the driver's current page to pdf_path and return the number of bytes written.
+    The PDF is written to a temporary file first and renamed into place when complete.
+    """
+    params = dict(PRINT_OPTIONS, **(options or {}))
+    params["transferMode"] = "ReturnAsStream"
+
+    tmp_path = _temp_path(pdf_path)
+    size = 0
+    try:
+        result = driver.execute_cdp_cmd("Page.printToPDF", params)
+        stream = result.get("stream")
+        with open(tmp_path, "wb") as f:
+            if not stream:
+                # Older Chrome ignores transferMode and returns the whole document inline
+                data = base64.b64decode(result["data"])
+                f.write(data)
+                size = len(data)
+            else:
+                try:
+                    while True:
+                        chunk = driver.execute_cdp_cmd("IO.read", {"handle": stream, "size": CHUNK_SIZE})
+                        data = chunk.get("data", "")
+                        data = base64.b64decode(data) if chunk.get("base64Encoded") else data.encode("utf-8")
+                        f.write(data)
+                        size += len(data)
+                        if chunk.get("eof"):
+                            break
+                finally:
+                    driver.execute_cdp_cmd("IO.close", {"handle": stream})
+        os.replace(tmp_path, pdf_path)
+        return size
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+Incremental PDF Combiner
+Appends each tracking PDF to the combined report as soon as it is produced.
+Only one input document is held in memory at a time; the combined file is
+written sequentially and finished with a page tree and xref table on close.
+"""
+
+import os
+import re
+import threading
+import zlib
+
+WHITESPACE = b" \t\r\n\f\x00"
+DELIMITERS = b"()<>[]{}/%"
+
+OBJECT_HEADER = re.compile(rb"(\d+)\s+(\d+)\s+obj\b")
+REFERENCE = re.compile(rb"(\d+)\s+(\d+)\s+R\b")
+LENGTH = re.compile(rb"/Length\s+(\d+)(?:\s+(\d+)\s+R\b)?")
+ROOT = re.compile(rb"/Root\s+(\d+)\s+\d+\s+R\b")
+PAGES = re.compile(rb"/Pages\s+(\d+)\s+\d+\s+R\b")
+COUNT = re.compile(rb"/Count\s+(\d+)")
+PARENT = re.compile(rb"/Parent\s+\d+\s+\d+\s+R\b")
+TYPE = re.compile(rb"/Type\s*/(\w+)")
+FILTER = re.compile(rb"/Filter\s*(\[[^\]]*\]|/\w+)")
+OBJECT_COUNT = re.compile(rb"/N\s+(\d+)")
+FIRST_OFFSET = re.compile(rb"/First\s+(\d+)")
+
+# Object numbers reserved in the combined file for the catalog and the root page tree node
+CATALOG_NUMBER = 1
+ROOT_PAGES_NUMBER = 2
+
+
+class UnsupportedPdf(Exception):
+    """The input uses features (encryption, unusual stream filters) the built-in parser does not handle"""
+
+
+def _skip_whitespace(data, pos):
+    while pos < len(data):
+        if data[pos] in WHITESPACE:
+            pos += 1
+        elif data[pos] == ord("%"):
+            while pos < len(data) and data[pos] not in b"\r\n":
+                pos += 1
+        else:
+            break
+    return pos
+
+
+def _skip_string(data, pos):
+    """Skip a literal string starting at '(' (balanced parentheses, backslash escapes)"""
+    depth = 0
+    while pos < len(data):
+        c = data[pos]
+        if c == ord("\\"):
+            pos += 2
+            continue
+        if c == ord("("):
+            depth += 1
+        elif c == ord(")"):
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+        pos += 1
+    raise ValueError("Unterminated string")
+
+
+def _skip_value(data, pos):
+    """Return the position just after the PDF token/value starting at pos"""
+    pos = _skip_whitespace(data, pos)
+    if data.startswith(b"<<", pos):
+        pos += 2
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data.startswith(b">>", pos):
+                return pos + 2
+            if pos >= len(data):
+                raise ValueError("Unterminated dictionary")
+            pos = _skip_value(data, pos)
+    c = data[pos]
+    if c == ord("["):
+        pos += 1
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if data.startswith(b"]", pos):
+                return pos + 1
+            if pos >= len(data):
+                raise ValueError("Unterminated array")
+            pos = _skip_value(data, pos)
+    if c == ord("("):
+        return _skip_string(data, pos)
+    if c == ord("<"):
+        return data.index(b">", pos) + 1
+    if c == ord("/"):
+        pos += 1
+    elif c in DELIMITERS:
+        return pos + 1
+    while pos < len(data) and data[pos] not in WHITESPACE and data[pos] not in DELIMITERS:
+        pos += 1
+    return pos
+
+
+def _rewrite_references(body, mapping):
+    """Renumber 'N G R' references outside of literal strings"""
+    def replace(match):
+        number = mapping.get(int(match.group(1)))
+        return b"null" if number is None else b"%d 0 R" % number
+
+    out = []
+    pos = 0
+    start = 0
+    while pos < len(body):
+        c = body[pos]
+        if c == ord("("):
+            out.append(REFERENCE.sub(replace, body[start:pos]))
+            end = _skip_string(body, pos)
+            out.append(body[pos:end])
+            pos = start = end
+        elif c == ord("%"):
+            # Comments can hold parentheses; leave them to the regex chunk
+            while pos < len(body) and body[pos] not in b"\r\n":
+                pos += 1
+        else:
+            pos += 1
+    out.append(REFERENCE.sub(replace, body[start:]))
+    return b"".join(out)
+
+
+def _object_type(body):
+    object_type = TYPE.search(body)
+    return object_type.group(1) if object_type else None
+
+
+def _unpack_object_stream(body, stream):
+    """Yield (number, body) for the objects packed into a compressed object stream"""
+    filters = FILTER.search(body)
+    names = re.findall(rb"/(\w+)", filters.group(1)) if filters else []
+    if names not in ([], [b"FlateDecode"]) or b"/DecodeParms" in body:
+        raise UnsupportedPdf("PDF uses an object stream encoding other than plain Flate")
+    data = zlib.decompressobj().decompress(stream) if names else stream
+
+    count = int(OBJECT_COUNT.search(body).group(1))
+    first = int(FIRST_OFFSET.search(body).group(1))
+    header = data[:first].split()
+    starts = [(int(header[2 * i]), first + int(header[2 * i + 1])) for i in range(count)]
+    for i, (number, start) in enumerate(starts):
+        end = starts[i + 1][1] if i + 1 < count else len(data)
+        yield number, data[start:end].strip()
+
+
+def parse_pdf_objects(data):
+    """
+    Return ({number: (body, stream_bytes_or_None)}, trailer_bytes) for a PDF with
+    classic cross-reference tables or cross-reference and object streams (PDF 1.5).
+    """
+    objects = {}
+    indirect_lengths = {}
+    pos = 0
+    while True:
+        match = OBJECT_HEADER.search(data, pos)
+        if not match:
+            break
+        number = int(match.group(1))
+        body_start = match.end()
+
+        # Walk tokens until the object ends or its stream starts
+        pos = body_start
+        while True:
+            pos = _skip_whitespace(data, pos)
+            if pos >= len(data):
+                raise ValueError(f"Object {number} is not terminated")
+            if data.startswith(b"endobj", pos):
+                objects[number] = (data[body_start:pos].strip(), None)
+                pos += len(b"endobj")
+                break
+            if data.startswith(b"stream", pos) and data[pos + 6:pos + 7] in (b"\r", b"\n"):
+                body = data[body_start:pos].strip()
+                stream_start = pos + 6
+                stream_start += 2 if data.startswith(b"\r\n", stream_start) else 1
+
+                length = LENGTH.search(body)
+                stream_end = None
+                if length and not length.group(2):
+                    candidate = stream_start + int(length.group(1))
+                    if data.startswith(b"endstream", _skip_whitespace(data, candidate)):
+                        stream_end = candidate
+                if stream_end is None:
+                    stream_end = data.index(b"endstream", stream_start)
+                    if length and length.group(2):
+                        indirect_lengths[number] = int(length.group(1))
+
+                objects[number] = (body, data[stream_start:stream_end])
+                pos = data.index(b"endobj", stream_end) + len(b"endobj")
+                break
+            pos = _skip_value(data, pos)
+
+    # Trim streams whose /Length lives in another object now that all objects are known
+    for number, length_number in indirect_lengths.items():
+        body, stream = objects[number]
+        length_body = objects.get(length_number, (b"", None))[0]
+        if length_body.isdigit():
+            objects[number] = (body, stream[:int(length_body)])
+
+    # Unpack compressed objects; objects found in the file itself take precedence
+    for body, stream in list(objects.values()):
+        if _object_type(body) == b"ObjStm":
+            try:
+                for number, packed_body in _unpack_object_stream(body, stream):
+                    objects.setdefault(number, (packed_body, None))
+            except (AttributeError, IndexError, ValueError, zlib.error) as e:
+                raise ValueError(f"Unreadable object stream: {str(e)}")
+
+    # Classic trailers, plus cross-reference stream dictionaries which double as trailers.
+    # Linearized and incrementally updated files have several; use the last one naming /Root.
+    trailers = []
+    for match in re.finditer(rb"trailer", data):
+        start = _skip_whitespace(data, match.end())
+        trailers.append(data[start:_skip_value(data, start)])
+    for body, _ in objects.values():
+        if _object_type(body) == b"XRef":
+            trailers.append(body)
+
+    trailer = b""
+    for candidate in trailers:
+        if b"/Encrypt" in candidate:
+            raise UnsupportedPdf("PDF is encrypted")
+        if ROOT.search(candidate):
+            trailer = candidate
+    return objects, trailer
+
+
+def _normalize_with_pypdf(pdf_path):
+    """Rewrite a PDF without object streams, if pypdf/PyPDF2 is installed"""
+    try:
+        from pypdf import PdfReader, PdfWriter
+    except ImportError:
+        try:
+            from PyPDF2 import PdfReader, PdfWriter
+        except ImportError:
+            return None
+
+    import io
+    reader = PdfReader(pdf_path)
+    writer = PdfWriter()
+    for page in reader.pages:
+        writer.add_page(page)
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+class IncrementalPdfCombiner:
+    """Builds the combined report while lookups are still running"""
+
+    def __init__(self, path, logger):
+        self.path = path
+        self.logger = logger
+        self.tmp_path = f"{path}.{os.getpid()}.part"
+        self.lock = threading.Lock()
+        self.file = open(self.tmp_path, "wb")
+        self.file.write(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n")
+        self.offsets = {}
+        self.next_number = ROOT_PAGES_NUMBER + 1
+        self.kids = []
+        self.page_count = 0
+        self.document_count = 0
+
+        # Items finish out of order under worker pools; keep the report in input order
+        self.next_index = 1
+        self.pending = {}
+
+    def add(self, index, pdf_path):
+        """Report item index as finished; pdf_path is None for failed items"""
+        with self.lock:
+            self.pending[index] = pdf_path
+            while self.next_index in self.pending:
+                self._append(self.pending.pop(self.next_index))
+                self.next_index += 1
+
+    def _append(self, pdf_path):
+        if not pdf_path:
+            return
+        try:
+            with open(pdf_path, "rb") as f:
+                data = f.read()
+            try:
+                objects, trailer = parse_pdf_objects(data)
+            except UnsupportedPdf as e:
+                data = _normalize_with_pypdf(pdf_path)
+                if data is None:
+                    raise Exception(f"{str(e)} and pypdf/PyPDF2 is not installed")
+                objects, trailer = parse_pdf_objects(data)
+            self._write_document(objects, trailer)
+            self.logger.info(f"📄 Added {os.path.basename(pdf_path)} to combined report")
+        except Exception as e:
+            self.logger.error(f"❌ Could not add {os.path.basename(pdf_path)} to combined report: {str(e)}")
+
+    def _write_document(self, objects, trailer):
+        root = ROOT.search(trailer)
+        if not root or int(root.group(1)) not in objects:
+            raise ValueError("PDF catalog not found")
+        catalog_number = int(root.group(1))
+        pages = PAGES.search(objects[catalog_number][0])
+        if not pages or int(pages.group(1)) not in objects:
+            raise ValueError("PDF page tree not found")
+        pages_number = int(pages.group(1))
+
+        # The old catalog and xref streams are replaced by the combined file's own, and
+        # object streams were unpacked (their objects are written uncompressed)
+        skipped = {catalog_number}
+        for number, (body, _) in objects.items():
+            if _object_type(body) in (b"XRef", b"ObjStm"):
+                skipped.add(number)
+
+        mapping = {}
+        for number in sorted(objects):
+            if number not in skipped:
+                mapping[number] = self.next_number
+                self.next_number += 1
+
+        for number in sorted(mapping):
+            body, stream = objects[number]
+            body = _rewrite_references(body, mapping)
+            if number == pages_number:
+                # Hang this document's page tree under the combined root node
+                body = PARENT.sub(b"", body)
+                body = body.replace(b"<<", b"<< /Parent %d 0 R" % ROOT_PAGES_NUMBER, 1)
+                count = COUNT.search(body)
+                self.page_count += int(count.group(1)) if count else 0
+
+            self.offsets[mapping[number]] = self.file.tell()
+            self.file.write(b"%d 0 obj\n" % mapping[number])
+            self.file.write(body)
+            if stream is not None:
+                self.file.write(b"\nstream\n")
+                self.file.write(stream)
+                self.file.write(b"\nendstream")
+            self.file.write(b"\nendobj\n")
+
+        self.kids.append(mapping[pages_number])
+        self.document_count += 1
+
+    def close(self):
+        """Write the page tree, catalog and xref table; returns the number of documents combined"""
+        with self.lock:
+            for index in sorted(self.pending):
+                self._append(self.pending[index])
+            self.pending = {}
+
+            if self.document_count == 0:
+                self.file.close()
+                os.remove(self.tmp_path)
+                return 0
+
+            kids = b" ".join(b"%d 0 R" % kid for kid in self.kids)
+            self.offsets[ROOT_PAGES_NUMBER] = self.file.tell()
+            self.file.write(b"%d 0 obj\n<< /Type /Pages /Kids [%s] /Count %d >>\nendobj\n"
+                            % (ROOT_PAGES_NUMBER, kids, self.page_count))
+            self.offsets[CATALOG_NUMBER] = self.file.tell()
+            self.file.write(b"%d 0 obj\n<< /Type /Catalog /Pages %d 0 R >>\nendobj\n"
+                            % (CATALOG_NUMBER, ROOT_PAGES_NUMBER))
+
+            xref_offset = self.file.tell()
+            size = self.next_number
+            self.file.write(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+            for number in range(1, size):
+                offset = self.offsets.get(number)
+                if offset is None:
+                    self.file.write(b"0000000000 65535 f \n")
+                else:
+                    self.file.write(b"%010d 00000 n \n" % offset)
+            self.file.write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                            % (size, CATALOG_NUMBER, xref_offset))
+            self.file.close()
+            os.replace(self.tmp_path, self.path)
+            return self.document_count
+
+    def discard(self):
+        """Drop the partial report of a run that did not finish"""
+        with self.lock:
+            if not self.file.closed:
+                self.file.close()
+                os.remove(self.tmp_path)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Adaptive Rate Limiter
+AIMD request pacing per portal host, shared by all workers and all jobs on this machine
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl  # POSIX only; on Windows the budget is shared within one process
+except ImportError:
+    fcntl = None
+
+STATE_DIR = os.path.join(tempfile.gettempdir(), "spf_rate_limits")
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(host, logger, **kwargs):
+    """Return the process-wide limiter for a portal host"""
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = AdaptiveRateLimiter(host, logger, **kwargs)
+        return _limiters[host]
+
+
+class AdaptiveRateLimiter:
+    """
+    Spaces requests to one host by an interval that shrinks additively while
+    responses are fast and error-free, and grows multiplicatively on failures.
+    The interval and the next free slot live in a small state file guarded by
+    an exclusive file lock, so concurrent processes draw from one budget.
+    """
+
+    def __init__(self, host, logger, initial_interval=2.0, min_interval=0.25, max_interval=30.0,
+                 decrease_step=0.25, backoff_factor=2.0, slow_threshold=8.0, state_ttl=3600,
+                 state_dir=STATE_DIR):
+        self.host = host
+        self.logger = logger
+        self.initial_interval = initial_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.decrease_step = decrease_step
+        self.backoff_factor = backoff_factor
+        self.slow_threshold = slow_threshold
+        self.state_ttl = state_ttl
+        self.thread_lock = threading.Lock()
+
+        os.makedirs(state_dir, exist_ok=True)
+        self.state_path = os.path.join(state_dir, f"{host}.json")
+        self.lock_path = self.state_path + ".lock"
+
+    def _locked_update(self, update):
+        """Run update(state) -> result under the thread and file locks and persist the state"""
+        with self.thread_lock:
+            with open(self.lock_path, "a") as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    state = self._load_state()
+                    result = update(state)
+                    state["updated"] = time.time()
+                    tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+                    with open(tmp_path, "w") as f:
+                        json.dump(state, f)
+                    os.replace(tmp_path, self.state_path)
+                    return result
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            # Forget what we learned about a portal after a long idle period
+            if time.time() - state.get("updated", 0) <= self.state_ttl:
+                return state
+        except (OSError, ValueError):
+            pass
+        return {"interval": self.initial_interval, "next_slot": 0.0}
+
+    def acquire(self):
+        """Block until this caller may send its next request to the host"""
+        def reserve(state):
+            now = time.time()
+            slot = max(now, state["next_slot"])
+            state["next_slot"] = slot + state["interval"]
+            return slot - now
+
+        delay = self._locked_update(reserve)
+        if delay > 0:
+            time.sleep(delay)
+
+    def record_success(self, latency):
+        """Speed up additively after a fast, successful response"""
+        def update(state):
+            if latency < self.slow_threshold:
+                state["interval"] = max(self.min_interval, state["interval"] - self.decrease_step)
+            return state["interval"]
+
+        self._locked_update(update)
+
+    def record_failure(self):
+        """Back off multiplicatively after a timeout or error page"""
+        def update(state):
+            state["interval"] = min(self.max_interval, state["interval"] * self.backoff_factor)
+            return state["interval"]
+
+        interval = self._locked_update(update)
+        self.logger.warning(f"🐢 {self.host} struggling, request interval raised to {interval:.2f}s")
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Lean Page-Load Profiles
+Per-portal lists of third-party hosts (analytics, tag managers, ad networks, video
+embeds, web-font CDNs) that Chrome is told not to fetch via Network.setBlockedURLs,
+so a lookup only loads the portal's own documents, scripts, CSS and images
+"""
+
+import re
+
+# Third-party hosts no tracking PDF needs, blocked on every portal (subdomains included)
+COMMON_BLOCK_HOSTS = [
+    # Analytics, tag managers and ad networks
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net", "googlesyndication.com",
+    "facebook.net", "hotjar.com", "clarity.ms", "licdn.com", "adobedtm.com", "omtrdc.net",
+    "demdex.net", "newrelic.com", "nr-data.net", "optimizely.com", "qualtrics.com",
+    # Web fonts (pages fall back to system fonts)
+    "fonts.googleapis.com", "fonts.gstatic.com", "use.typekit.net"
+]
+
+# Tracking pixels on hosts that are otherwise left alone
+COMMON_BLOCK_URLS = ["*://www.facebook.com/tr*", "*://px.ads.linkedin.com/*", "*://bat.bing.com/*"]
+
+# Extra third-party hosts per portal (keyed like the lookup cache), and host globs
+# that must always load: a block pattern whose host could match one is dropped
+PROFILES = {
+    'maersk': {
+        'block': ["youtube.com", "ytimg.com", "vimeo.com", "vimeocdn.com"],
+        # Portal app and the damco-track iframe; accept_cookies() clicks the Cookie
+        # Information ("coi-") banner, so its host stays too
+        'allow': ["maersk.com", "*.maersk.com", "damco.com", "*.damco.com", "*.cookieinformation.com"]
+    },
+    'ctg': {
+        'block': [],
+        'allow': ["cpatos.gov.bd", "*.cpatos.gov.bd"]
+    }
+}
+
+
+def _globs_overlap(first, second):
+    """True if some string matches both '*'-globs (other characters are literal)"""
+    seen = set()
+    pending = [(0, 0)]
+    while pending:
+        i, j = pending.pop()
+        if (i, j) in seen:
+            continue
+        seen.add((i, j))
+        if i == len(first) and j == len(second):
+            return True
+        if i < len(first) and first[i] == "*":
+            pending.append((i + 1, j))
+            if j < len(second):
+                pending.append((i, j + 1))
+        if j < len(second) and second[j] == "*":
+            pending.append((i, j + 1))
+            if i < len(first):
+                pending.append((i + 1, j))
+        if i < len(first) and j < len(second) and first[i] == second[j] and "*" not in (first[i], second[j]):
+            pending.append((i + 1, j + 1))
+    return False
+
+
+def _pattern_host(pattern):
+    match = re.match(r"\*://([^/]+)/", pattern)
+    return match.group(1) if match else None
+
+
+def blocked_patterns(portal, logger=None):
+    """
+    Block patterns for a portal. Patterns are anchored to a host, so they can be
+    checked against the allowlist host by host; a pattern whose host could also
+    be an allowlisted one is dropped. File types (images, fonts) are not blocked
+    by extension: setBlockedURLs cannot exempt the portal's own assets.
+    """
+    profile = PROFILES.get(portal, {'block': [], 'allow': []})
+    candidates = []
+    for host in COMMON_BLOCK_HOSTS + profile['block']:
+        candidates += [f"*://{host}/*", f"*://*.{host}/*"]
+    candidates += COMMON_BLOCK_URLS
+
+    patterns = []
+    for pattern in candidates:
+        host = _pattern_host(pattern)
+        conflict = next((allowed for allowed in profile['allow'] if _globs_overlap(host, allowed)), None)
+        if conflict:
+            if logger:
+                logger.warning(f"⚠️ Not blocking {pattern}: its host may be allowlisted {conflict}")
+            continue
+        patterns.append(pattern)
+    return patterns
+
+
+def chrome_arguments():
+    """
+    Chrome flags for a blocking session. Blocked URLs apply per DevTools target and
+    cross-site iframes (e.g. damco-track) run as separate targets under site
+    isolation, so the frames are kept in the page's process.
+    """
+    return ["--disable-features=IsolateOrigins,site-per-process"]
+
+
+def apply_resource_blocking(driver, portal, logger):
+    """Install the portal's block list on the driver's current tab, returns True on success"""
+    patterns = blocked_patterns(portal, logger)
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+        logger.info(f"🚫 Blocking {len(patterns)} third-party URL patterns for {portal}")
+        return True
+    except Exception as e:
+        logger.warning(f"⚠️ Resource blocking unavailable, loading pages in full: {str(e)}")
+        return False
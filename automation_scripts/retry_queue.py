@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Retry Queue
+Classifies lookup errors and defers retryable failures with jittered exponential
+backoff, so a portal hiccup costs a few seconds instead of the item
+"""
+
+import random
+import socket
+import threading
+import time
+
+from selenium.common.exceptions import TimeoutException
+from urllib3.exceptions import HTTPError as Urllib3Error, TimeoutError as Urllib3Timeout
+
+# Error kinds recorded on failed results (result['error_kind'])
+TIMEOUT = 'timeout'          # page or element did not show up in time
+UNAVAILABLE = 'unavailable'  # 5xx/429, dropped connection, breaker gave up on the portal
+NOT_FOUND = 'not_found'      # the portal answered, it just has nothing for this identifier
+ERROR = 'error'              # anything else
+
+# Worth another attempt later; not_found never is
+RETRYABLE = (TIMEOUT, UNAVAILABLE, ERROR)
+
+# Kinds that say something about the portal's health (counted by the circuit breaker)
+PORTAL_FAILURES = (TIMEOUT, UNAVAILABLE)
+
+DEFAULT_RETRIES = 2
+BASE_DELAY = 2.0
+MAX_DELAY = 60.0
+
+
+class NotFoundError(Exception):
+    """The portal answered, but has no result for the identifier"""
+
+
+class PortalUnavailableError(Exception):
+    """The portal's circuit breaker has given up on it for this run"""
+
+
+def classify_error(error):
+    if isinstance(error, NotFoundError):
+        return NOT_FOUND
+    if isinstance(error, PortalUnavailableError):
+        return UNAVAILABLE
+    if isinstance(error, (TimeoutException, Urllib3Timeout, socket.timeout, TimeoutError)):
+        return TIMEOUT
+    status = getattr(error, 'status', None)
+    if status is not None:
+        return UNAVAILABLE if status >= 500 or status == 429 else ERROR
+    if isinstance(error, (ConnectionError, Urllib3Error)):
+        return UNAVAILABLE
+    # Stale elements, crashed tabs and the like: worth a retry, but not the portal's fault
+    return ERROR
+
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY):
+    """Full jitter: uniform between 0 and base * 2^(attempt - 1), capped"""
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+class RetryQueue:
+    """
+    Merges deferred retries into a stream of (index, item) pairs. Every pair taken
+    from items() must be settled exactly once with defer() (or release() if its
+    handler crashed); defer() decides whether the failure comes back later.
+    Only items currently waiting for a retry are held in memory.
+    """
+
+    def __init__(self, logger, retries=DEFAULT_RETRIES, base_delay=BASE_DELAY, metrics=None):
+        self.logger = logger
+        self.retries = retries
+        self.base_delay = base_delay
+        self.metrics = metrics
+        self.condition = threading.Condition()
+        # index -> (due_at, item, attempt) for items waiting to be retried
+        self.waiting = {}
+        # index -> attempt for items handed out and not settled yet
+        self.in_flight = {}
+
+    def items(self, source, batches=False):
+        """
+        Yield fresh items from source, interleaved with retries as they fall due.
+        With batches=True (a consumer that collects items into batches before
+        running them) None is yielded whenever the queue would otherwise wait on
+        items the consumer still holds, telling it to run its partial batch.
+        """
+        for index, item in source:
+            yield from self._due_retries(block=False, batches=batches)
+            with self.condition:
+                self.in_flight[index] = 1
+            yield index, item
+        # Input is exhausted; wait for the retries still outstanding
+        yield from self._due_retries(block=True, batches=batches)
+
+    def _due_retries(self, block, batches):
+        while True:
+            with self.condition:
+                while True:
+                    now = time.time()
+                    due = [index for index, (due_at, _, _) in self.waiting.items() if due_at <= now]
+                    if due:
+                        index = min(due)
+                        _, item, attempt = self.waiting.pop(index)
+                        self.in_flight[index] = attempt
+                        break
+                    if not block or (not self.waiting and not self.in_flight):
+                        return
+                    if batches and self.in_flight:
+                        index = None
+                        break
+                    next_due = min((due_at for due_at, _, _ in self.waiting.values()), default=now + 1)
+                    self.condition.wait(max(0.05, next_due - now))
+            if index is None:
+                yield None
+                continue
+            self.logger.info(f"🔁 Retrying {item} (attempt {attempt})")
+            yield index, item
+
+    def defer(self, index, item, result):
+        """
+        Settle a finished item. A retryable failure with attempts left is queued and
+        True returned (the caller should not record it yet); otherwise returns False.
+        """
+        with self.condition:
+            attempt = self.in_flight.pop(index, 1)
+            kind = result.get('error_kind') if result.get('status') != 'success' else None
+            if attempt > 1:
+                result['attempts'] = attempt
+            if kind in RETRYABLE and attempt <= self.retries:
+                delay = backoff_delay(attempt, self.base_delay)
+                self.waiting[index] = (time.time() + delay, item, attempt + 1)
+                self.condition.notify_all()
+            else:
+                self.condition.notify_all()
+                return False
+
+        self.logger.warning(f"⏳ {item} failed ({kind}), retrying in {delay:.1f}s")
+        if self.metrics:
+            self.metrics.add("retries")
+        return True
+
+    def release(self, index):
+        """Settle an item whose handler crashed; it is not retried"""
+        with self.condition:
+            self.in_flight.pop(index, None)
+            self.condition.notify_all()
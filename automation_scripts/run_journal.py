@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Run Journal
+Append-only JSONL checkpoint written after every processed item, used to resume interrupted
+runs. It is also the run's result stream: totals are counted as items are written, mirrored
+to a small progress file, and the final summary is built by re-reading the stream.
+Extracted tracking records go to a sidecar file next to it, so a resumed run can put them
+back into its data file without looking the items up again.
+"""
+
+import json
+import os
+import threading
+from collections import Counter
+from datetime import datetime
+
+
+class RunJournal:
+    """
+    One JSON line per finished item; each line is flushed and fsynced before moving on.
+    Only running totals stay in memory, so a run's footprint does not grow with its input.
+    """
+
+    def __init__(self, path, logger, fresh=False):
+        self.path = path
+        self.logger = logger
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.file = open(path, "w" if fresh else "a", encoding="utf-8")
+        # Terminate a line cut short by a crash so the next entry starts cleanly
+        if self.file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self.file.write("\n")
+            self.file.flush()
+        # Entries before this offset belong to the run being resumed
+        self.start_offset = self.file.tell()
+        # <journal>.progress.json, polled by the status endpoint while the run is going
+        self.progress_path = f"{os.path.splitext(path)[0]}.progress.json"
+        self.records_path = self.records_path_for(path)
+        # Opened on the first write_records(), so PDF-only runs leave no empty sidecar
+        self.records_file = None
+        self.records_mode = "w" if fresh else "a"
+        self.started_at = datetime.now().isoformat()
+        self.total = 0
+        self.successful = 0
+        self.changed = 0
+        # Failures by error_kind (timeout, unavailable, not_found, error)
+        self.error_kinds = Counter()
+        self.write_progress(running=True)
+
+    @property
+    def failed(self):
+        return self.total - self.successful
+
+    def success_rate(self):
+        return f"{(self.successful / self.total * 100):.1f}%" if self.total else "0%"
+
+    @staticmethod
+    def records_path_for(path):
+        """<journal>.records.jsonl: one {"id", "records"} line per extraction"""
+        return f"{os.path.splitext(path)[0]}.records.jsonl"
+
+    @staticmethod
+    def new_path(prefix):
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join("results", "journals", f"{prefix}_{timestamp}.jsonl")
+
+    def write(self, index, result):
+        entry = dict(result, index=index)
+        line = json.dumps(entry, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.total += 1
+            if result.get('status') == 'success':
+                self.successful += 1
+            else:
+                self.error_kinds[result.get('error_kind', 'error')] += 1
+            if result.get('changed'):
+                self.changed += 1
+            self.write_progress(running=True)
+
+    def write_records(self, identifier, records):
+        """
+        Keep an item's extracted records (JSON-safe, see records_to_json) for --resume.
+        Called before the item's journal entry is written, so a completed entry
+        always has its records on disk.
+        """
+        line = json.dumps({'id': identifier, 'records': records}, ensure_ascii=False)
+        with self.lock:
+            if self.records_file is None:
+                self.records_file = open(self.records_path, self.records_mode, encoding="utf-8")
+                if self.records_file.tell() > 0:
+                    # Terminate a line cut short by a crash, as for the journal itself
+                    with open(self.records_path, "rb") as f:
+                        f.seek(-1, os.SEEK_END)
+                        if f.read(1) != b"\n":
+                            self.records_file.write("\n")
+            self.records_file.write(line + "\n")
+            self.records_file.flush()
+            os.fsync(self.records_file.fileno())
+
+    def read_records(self, offset):
+        """Records stored by write_records() at a sidecar offset from load_completed(), None if unreadable"""
+        with self.lock:
+            if self.records_file is not None:
+                self.records_file.flush()
+        try:
+            with open(self.records_path, encoding="utf-8") as f:
+                f.seek(offset)
+                return json.loads(f.readline())['records']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def progress(self, running=False):
+        return {
+            'journal': self.path,
+            'running': running,
+            'started_at': self.started_at,
+            'updated_at': datetime.now().isoformat(),
+            'processed': self.total,
+            'successful': self.successful,
+            'failed': self.failed,
+            'errors_by_kind': dict(self.error_kinds)
+        }
+
+    def write_progress(self, running=False):
+        """Replace the progress file atomically so readers never see a partial one"""
+        tmp_path = f"{self.progress_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.progress(running), f)
+            os.replace(tmp_path, self.progress_path)
+        except OSError as e:
+            self.logger.warning(f"⚠️ Could not update progress file: {str(e)}")
+
+    def entries(self):
+        """Yield this run's entries in the order they finished, read back from disk"""
+        with self.lock:
+            if not self.file.closed:
+                self.file.flush()
+        with open(self.path, encoding="utf-8") as f:
+            f.seek(self.start_offset)
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    def write_summary(self, path, summary):
+        """
+        Write summary as a JSON object plus this run's entries as its "detailed_results",
+        streamed one line per entry instead of being collected first
+        """
+        head = json.dumps(summary, indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(head[:-2] + ',\n  "detailed_results": [' if summary else '{\n  "detailed_results": [')
+            separator = "\n    "
+            for entry in self.entries():
+                f.write(separator + json.dumps(entry, ensure_ascii=False))
+                separator = ",\n    "
+            f.write("\n  ]\n}\n")
+
+    def close(self):
+        with self.lock:
+            if self.records_file is not None and not self.records_file.closed:
+                self.records_file.close()
+            if not self.file.closed:
+                self.file.close()
+                self.write_progress(running=False)
+
+    @staticmethod
+    def load_completed(path, id_key, logger, output='pdf'):
+        """
+        Return {identifier: entry} for items that already succeeded with everything this
+        run's output ('pdf', 'data' or 'both') needs: the PDF/HTML file still on disk
+        and/or the extracted records in the sidecar (their offset is added to the entry
+        as 'records_at'). A truncated last line (process killed mid-write) is ignored.
+        """
+        completed = {}
+        if not os.path.exists(path):
+            logger.warning(f"⚠️ Journal not found, starting fresh: {path}")
+            return completed
+
+        records_at = RunJournal._index_records(RunJournal.records_path_for(path)) if output != 'pdf' else {}
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                identifier = entry.get(id_key)
+                if entry.get('status') != 'success' or not identifier:
+                    continue
+                if output != 'data':
+                    if entry.get('pdf_file'):
+                        output_path = os.path.join("results", "pdfs", entry['pdf_file'])
+                    elif entry.get('html_file'):
+                        output_path = os.path.join("results", "html", entry['html_file'])
+                    else:
+                        continue
+                    if not os.path.exists(output_path):
+                        continue
+                if output != 'pdf':
+                    if identifier not in records_at:
+                        continue
+                    entry['records_at'] = records_at[identifier]
+                completed[identifier] = entry
+
+        logger.info(f"📒 Resuming from journal: {len(completed)} items already completed")
+        return completed
+
+    @staticmethod
+    def _index_records(records_path):
+        """{identifier: offset of its latest complete line} in a records sidecar"""
+        offsets = {}
+        if not os.path.exists(records_path):
+            return offsets
+        with open(records_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    offsets[json.loads(line)['id']] = offset
+                except (ValueError, KeyError):
+                    pass
+                offset += len(line)
+        return offsets
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Step Metrics
+Span timers for every step of a lookup, collected into latency histograms and
+exported as a Prometheus text file plus a timing section for the JSON summary
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Raw samples kept per step for percentiles; older samples are dropped beyond this
+MAX_SAMPLES = 10000
+
+
+class StepHistogram:
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+        # Successful spans only; failed ones mostly measure how long a wait gave up after
+        self.successes = []
+
+    def observe(self, seconds, failed=False):
+        for position, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[position] += 1
+                break
+        self.count += 1
+        self.errors += 1 if failed else 0
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for samples in (self.samples,) if failed else (self.samples, self.successes):
+            samples.append(seconds)
+            if len(samples) > MAX_SAMPLES:
+                del samples[:len(samples) - MAX_SAMPLES]
+
+    def percentile(self, fraction, samples=None):
+        samples = self.samples if samples is None else samples
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class StepMetrics:
+    """Per-run step timings; one instance is shared by all workers of a run"""
+
+    def __init__(self, service, logger):
+        self.service = service
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.steps = {}
+        self.totals = {}
+
+    @contextmanager
+    def span(self, step):
+        """Time the enclosed block as one observation of step (failures are counted too)"""
+        started = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.observe(step, time.perf_counter() - started, failed)
+
+    def observe(self, step, seconds, failed=False):
+        with self.lock:
+            self.steps.setdefault(step, StepHistogram()).observe(seconds, failed)
+
+    def latency(self, step, fraction):
+        """(successful span count, percentile of their durations) for one step, (0, 0.0) if unseen"""
+        with self.lock:
+            h = self.steps.get(step)
+            if h is None:
+                return 0, 0.0
+            return len(h.successes), h.percentile(fraction, h.successes)
+
+    def add(self, counter, amount=1):
+        """Increase a plain counter (e.g. network_bytes) exported next to the step histograms"""
+        with self.lock:
+            self.totals[counter] = self.totals.get(counter, 0) + amount
+
+    def counters(self):
+        with self.lock:
+            return dict(self.totals)
+
+    def summary(self):
+        """{step: {count, errors, total, mean, p50, p95, p99, max}} in seconds, for the JSON summary"""
+        with self.lock:
+            return {
+                step: {
+                    'count': h.count,
+                    'errors': h.errors,
+                    'total': round(h.total, 3),
+                    'mean': round(h.total / h.count, 3) if h.count else 0.0,
+                    'p50': round(h.percentile(0.50), 3),
+                    'p95': round(h.percentile(0.95), 3),
+                    'p99': round(h.percentile(0.99), 3),
+                    'max': round(h.max, 3)
+                }
+                for step, h in self.steps.items()
+            }
+
+    def log_summary(self):
+        for step, timing in sorted(self.summary().items(), key=lambda item: -item[1]['total']):
+            self.logger.info(f"⏱️ {step}: {timing['count']}x, p50 {timing['p50']:.2f}s, "
+                             f"p95 {timing['p95']:.2f}s, total {timing['total']:.1f}s")
+        for counter, value in sorted(self.counters().items()):
+            self.logger.info(f"🌐 {counter}: {value}")
+
+    def write_prometheus(self, prefix, timestamped=True):
+        """
+        Write the histograms in Prometheus text format, returns the filename.
+        Long-running modes pass timestamped=False to keep rewriting one file.
+        """
+        if timestamped:
+            filename = f"{prefix}_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.prom"
+        else:
+            filename = f"{prefix}_metrics.prom"
+        path = os.path.join("results", filename)
+
+        lines = [
+            "# HELP spf_step_duration_seconds Duration of one automation step",
+            "# TYPE spf_step_duration_seconds histogram"
+        ]
+        errors = [
+            "# HELP spf_step_errors_total Steps that raised an error",
+            "# TYPE spf_step_errors_total counter"
+        ]
+        counters = []
+        with self.lock:
+            for counter, value in sorted(self.totals.items()):
+                counters.append(f"# TYPE spf_{counter}_total counter")
+                counters.append(f'spf_{counter}_total{{service="{self.service}"}} {value}')
+            for step, h in sorted(self.steps.items()):
+                labels = f'service="{self.service}",step="{step}"'
+                cumulative = 0
+                for bound, bucket_count in zip(BUCKETS, h.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'spf_step_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'spf_step_duration_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f'spf_step_duration_seconds_sum{{{labels}}} {h.total:.6f}')
+                lines.append(f'spf_step_duration_seconds_count{{{labels}}} {h.count}')
+                errors.append(f'spf_step_errors_total{{{labels}}} {h.errors}')
+
+        # Written to a temp file and renamed so a textfile collector never reads half a file
+        tmp_path = f"{path}.{os.getpid()}.part"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines + errors + counters) + "\n")
+        os.replace(tmp_path, path)
+        return filename
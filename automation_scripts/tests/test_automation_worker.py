@@ -0,0 +1,82 @@
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+
+from automation_worker import MAX_ATTEMPTS, JobQueue
+
+logger = logging.getLogger("test")
+
+
+def claim_all(queue_path, claimed):
+    """Worker-process stand-in: claim jobs until the queue is empty"""
+    queue = JobQueue(queue_path)
+    while True:
+        job = queue.claim()
+        if job is None:
+            break
+        claimed.put(job['id'])
+    queue.close()
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_claim_takes_oldest_job_and_marks_it_running(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    first = queue.submit("ctg-port-tracking", "a.csv", {'tabs': 2})
+    queue.submit("ctg-port-tracking", "b.csv")
+
+    job = queue.claim()
+    assert job['id'] == first
+    assert job['status'] == 'running'
+    assert job['worker_pid'] == os.getpid()
+    assert job['attempts'] == 1
+    assert job['params'] == {'tabs': 2}
+    queue.close()
+
+
+def test_concurrent_workers_claim_each_job_once(tmp_path):
+    queue_path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue(queue_path)
+    submitted = {queue.submit("example-automation", f"{n}.csv") for n in range(40)}
+
+    claimed = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=claim_all, args=(queue_path, claimed)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+    claims = [claimed.get(timeout=5) for _ in range(len(submitted))]
+
+    assert sorted(claims) == sorted(submitted)
+    assert claimed.empty()
+    assert queue.claim() is None
+    queue.close()
+
+
+def test_requeue_stale_requeues_jobs_of_dead_workers(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    alive = queue.submit("example-automation", "alive.csv")
+    orphaned = queue.submit("example-automation", "orphaned.csv")
+    exhausted = queue.submit("example-automation", "exhausted.csv")
+    for _ in range(3):
+        queue.claim()
+    pid = dead_pid()
+    queue.conn.execute("UPDATE jobs SET worker_pid = ? WHERE id IN (?, ?)", (pid, orphaned, exhausted))
+    queue.conn.execute("UPDATE jobs SET attempts = ? WHERE id = ?", (MAX_ATTEMPTS, exhausted))
+
+    queue.requeue_stale(logger)
+
+    assert queue.get(alive)['status'] == 'running'
+    assert queue.get(orphaned)['status'] == 'queued'
+    assert queue.get(orphaned)['worker_pid'] is None
+    assert queue.get(exhausted)['status'] == 'failed'
+    # The requeued job is claimed again, counting a second attempt
+    job = queue.claim()
+    assert (job['id'], job['attempts']) == (orphaned, 2)
+    queue.close()
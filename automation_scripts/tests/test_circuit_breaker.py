@@ -0,0 +1,58 @@
+import logging
+import time
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, CircuitBreaker
+from retry_queue import TIMEOUT, UNAVAILABLE, PortalUnavailableError
+
+logger = logging.getLogger("test")
+
+
+def tripped_breaker(**kwargs):
+    options = dict(window=4, min_requests=2, cooldown=0.05, max_cooldown=0.1, give_up_after=0.2)
+    options.update(kwargs)
+    breaker = CircuitBreaker("portal.test", logger, **options)
+    breaker.record(TIMEOUT)
+    breaker.record(UNAVAILABLE)
+    return breaker
+
+
+def test_trips_and_closes_after_successful_probe():
+    breaker = tripped_breaker()
+    breaker.wait()
+    assert breaker.state == HALF_OPEN
+    breaker.record(None)
+    assert breaker.state == CLOSED
+    breaker.wait()
+
+
+def test_recovers_after_giving_up():
+    breaker = tripped_breaker()
+    deadline = time.time() + 2
+    while time.time() < deadline:
+        breaker.wait()
+        breaker.record(TIMEOUT)
+        if time.time() - breaker.failing_since >= breaker.give_up_after:
+            break
+
+    # Past give-up: callers fail fast while the next probe is not due yet
+    with pytest.raises(PortalUnavailableError):
+        breaker.wait()
+
+    # The portal comes back: the probe still goes through and closes the breaker
+    time.sleep(breaker.max_cooldown)
+    breaker.wait()
+    breaker.record(None)
+    assert breaker.state == CLOSED
+    breaker.wait()
+
+
+def test_begin_run_restarts_give_up_clock():
+    breaker = tripped_breaker(cooldown=5.0, max_cooldown=5.0)
+    breaker.failing_since = time.time() - breaker.give_up_after
+    with pytest.raises(PortalUnavailableError):
+        breaker.wait()
+
+    breaker.begin_run()
+    assert time.time() - breaker.failing_since < breaker.give_up_after
@@ -0,0 +1,135 @@
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from ctg_http_engine import CtgHttpEngine, HTTPStatusError, has_results
+from tracking_extractor import extract_tracking_records
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "ctg")
+
+logger = logging.getLogger("test")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class StandInPortal:
+    """Serves the fixture pages the way the portal flows: form, POST, redirect to the result"""
+
+    def __init__(self):
+        self.requests = []
+        portal = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def send_page(self, name, status=200, headers=()):
+                data = fixture(name).encode("utf-8") if name else b""
+                self.send_response(status)
+                for header, value in headers:
+                    self.send_header(header, value)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                portal.requests.append(("GET", self.path, self.headers.get("Cookie"), None))
+                if url.path == "/pcs/":
+                    self.send_page("search_form.html", headers=[("Set-Cookie", "PHPSESSID=s3ss10n; path=/")])
+                elif query.get("r") == ["site/containerResult"]:
+                    found = query["id"] == ["MSKU1234565"]
+                    self.send_page("result.html" if found else "not_found.html")
+                elif url.path == "/down/":
+                    self.send_page(None, status=503)
+                else:
+                    self.send_page(None, status=404)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0)).decode("utf-8")
+                fields = parse_qs(body, keep_blank_values=True)
+                portal.requests.append(("POST", self.path, self.headers.get("Cookie"), fields))
+                location = f"index.php?r=site/containerResult&id={fields['containerNo'][0]}"
+                self.send_page(None, status=302, headers=[("Location", location),
+                                                          ("Set-Cookie", "PCSRESULT=r1; path=/")])
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def portal():
+    server = StandInPortal()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def engine(portal):
+    engine = CtgHttpEngine(f"{portal.url}/pcs/", logger)
+    yield engine
+    engine.close()
+
+
+def test_search_form_and_hidden_fields(engine, portal):
+    form = engine.load_form()
+    assert form['url'] == f"{portal.url}/pcs/index.php?r=site/containerSearch"
+    assert form['method'] == "post"
+    assert form['input_name'] == "containerNo"
+    # Hidden tokens, the checked checkbox and the clicked submit button only
+    assert form['fields'] == {'csrf_token': "3f9c2a1e7b", 'searchType': "container",
+                              'showHistory': "1", 'search': "Search"}
+    assert form['hidden'] == ['csrf_token', 'searchType']
+    assert not form['reusable']
+
+
+def test_lookup_posts_search_and_follows_redirect_with_cookies(engine, portal):
+    result_url, html = engine.lookup("MSKU1234565")
+
+    get_form, post, get_result = portal.requests
+    assert get_form[:2] == ("GET", "/pcs/")
+    assert post[:3] == ("POST", "/pcs/index.php?r=site/containerSearch", "PHPSESSID=s3ss10n")
+    assert post[3]['containerNo'] == ["MSKU1234565"]
+    assert post[3]['csrf_token'] == ["3f9c2a1e7b"]
+    # The session cookie and the one set on the redirect are both sent to the result page
+    assert get_result[0] == "GET"
+    assert get_result[2] == "PHPSESSID=s3ss10n; PCSRESULT=r1"
+    assert result_url == f"{portal.url}/pcs/index.php?r=site/containerResult&id=MSKU1234565"
+    assert has_results(html)
+
+
+def test_result_table_records(engine):
+    _, html = engine.lookup("MSKU1234565")
+    records = extract_tracking_records(html, "MSKU1234565", "ctg")
+    assert [record['status'] for record in records] == ["Discharged", "Assigned for delivery"]
+    assert records[0]['location'] == "CCT Yard 3"
+    assert records[0]['vessel'] == "MAERSK NESNA"
+
+
+def test_not_found_page(engine):
+    _, html = engine.lookup("TCLU7654320")
+    assert not has_results(html)
+    assert extract_tracking_records(html, "TCLU7654320", "ctg") == []
+
+
+def test_server_error_raises_with_status(portal):
+    engine = CtgHttpEngine(f"{portal.url}/down/", logger)
+    with pytest.raises(HTTPStatusError) as error:
+        engine.load_form()
+    assert error.value.status == 503
+    engine.close()
@@ -0,0 +1,175 @@
+import os
+import time
+
+import pytest
+from selenium.common.exceptions import NoSuchElementException
+
+from ctg_port_tracking import CtgPortTrackingAutomation
+from page_readiness import PageReadiness
+from rate_limiter import AdaptiveRateLimiter
+from retry_queue import NOT_FOUND
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "ctg")
+
+PORTAL = "http://portal.test/pcs/"
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+class FakeTab:
+    def __init__(self):
+        # Pages in history: "form" or a container number (its result page)
+        self.history = []
+        self.position = -1
+        self.stale = False
+        self.typed = None
+
+    @property
+    def page(self):
+        return self.history[self.position] if self.history else None
+
+    def visit(self, page):
+        self.history = self.history[:self.position + 1] + [page]
+        self.position += 1
+        self.stale = False
+
+
+class FakeElement:
+    def __init__(self, browser, element_id):
+        self.browser = browser
+        self.element_id = element_id
+
+    def clear(self):
+        pass
+
+    def send_keys(self, value):
+        self.browser.tab.typed = value
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        tab = self.browser.tab
+        time.sleep(self.browser.delays.get(tab.typed, 0))
+        tab.visit(tab.typed)
+
+
+class FakeBrowser:
+    """
+    Serves the captured CTG pages in any number of tabs: the search form, then the
+    result page for the typed container, with back() through each tab's history
+    """
+
+    def __init__(self, results, handles=("tab-1",)):
+        self.results = results
+        self.delays = {}
+        self.tabs = {handle: FakeTab() for handle in handles}
+        self.handle = handles[0]
+        self.loads = []
+        self.switch_to = self
+
+    def window(self, handle):
+        self.handle = handle
+
+    @property
+    def tab(self):
+        return self.tabs[self.handle]
+
+    @property
+    def current_url(self):
+        return PORTAL if self.tab.page else "about:blank"
+
+    @property
+    def page_source(self):
+        if self.tab.page == "form":
+            return fixture("search_form.html")
+        return self.results[self.tab.page]
+
+    def get(self, url):
+        self.loads.append(("get", self.handle))
+        self.tab.visit("form")
+
+    def back(self):
+        self.loads.append(("back", self.handle))
+        self.tab.position -= 1
+        self.tab.stale = False
+
+    def find_element(self, by, value):
+        if self.tab.page != "form":
+            raise NoSuchElementException(value)
+        return FakeElement(self, value)
+
+    def find_elements(self, by, value):
+        return [FakeElement(self, value)] if self.tab.page == "form" else []
+
+    def execute_script(self, script, *args):
+        if "__ctgStale = true" in script:
+            self.tab.stale = True
+        elif "__ctgStale !== true" in script:
+            return not self.tab.stale
+        elif "arguments[0]" in script:
+            return {"quiet": 10.0, "changed": True, "complete": True, "found": False}
+        return None
+
+
+@pytest.fixture
+def make_automation(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    def make(tabs=1):
+        automation = CtgPortTrackingAutomation(base_url=PORTAL, cache_ttl=0, use_daemon=False, output='data',
+                                               reuse_form=True, tabs=tabs)
+        handles = tuple(f"tab-{n}" for n in range(1, tabs + 1))
+        automation.driver = FakeBrowser({"MSKU1234565": fixture("result.html"),
+                                         "TCLU7654320": fixture("not_found.html")}, handles)
+        automation.tab_handles = list(handles)
+        automation.readiness = PageReadiness(automation.driver, automation.logger, max_wait=1, dom_quiet=0,
+                                             use_network=False, poll_interval=0.01)
+        automation.rate_limiter = AdaptiveRateLimiter("portal.test", automation.logger, initial_interval=0,
+                                                      min_interval=0, state_dir=str(tmp_path))
+        return automation
+    return make
+
+
+def test_selenium_lookup_records_result_rows(make_automation):
+    automation = make_automation()
+    automation.fetch_container_number("MSKU1234565", 1)
+    assert automation.last_result['status'] == 'success'
+    assert automation.last_result['records'] == 2
+
+
+def test_selenium_lookup_of_empty_result_table_is_not_found(make_automation):
+    automation = make_automation()
+    automation.fetch_container_number("TCLU7654320", 2)
+    assert automation.last_result['status'] == 'error'
+    assert automation.last_result['error_kind'] == NOT_FOUND
+
+
+def test_tabs_reuse_the_search_form_after_the_first_batch(make_automation):
+    automation = make_automation(tabs=2)
+    first = [{'index': 1, 'container': "MSKU1234565"}, {'index': 2, 'container': "TCLU7654320"}]
+    automation.process_container_batch(first)
+    assert automation.driver.loads == [("get", "tab-1"), ("get", "tab-2")]
+
+    second = [{'index': 3, 'container': "TCLU7654320"}, {'index': 4, 'container': "MSKU1234565"}]
+    automation.process_container_batch(second)
+    # Each tab goes back to its form instead of reloading the portal
+    assert automation.driver.loads[2:] == [("back", "tab-1"), ("back", "tab-2")]
+    assert [slot['result']['status'] for slot in second] == ['error', 'success']
+    assert second[1]['result']['records'] == 2
+    assert automation.metrics.counters()['form_back'] == 2
+
+
+def test_tabs_record_latency_per_container(make_automation):
+    automation = make_automation(tabs=2)
+    automation.driver.delays["TCLU7654320"] = 0.3
+    slots = [{'index': 1, 'container': "MSKU1234565"}, {'index': 2, 'container': "TCLU7654320"}]
+    automation.process_container_batch(slots)
+    # The slow lookup in the second tab is not charged to the first
+    assert slots[0]['latency'] < 0.3 <= slots[1]['latency']
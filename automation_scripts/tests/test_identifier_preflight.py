@@ -0,0 +1,80 @@
+import logging
+
+import pytest
+
+from identifier_preflight import (IdentifierPreflight, container_number_error, fcr_number_error,
+                                  iso6346_check_digit, normalize_container_number, normalize_fcr_number)
+
+logger = logging.getLogger("test")
+
+
+@pytest.mark.parametrize("number, digit", [
+    ("CSQU3054383", 3),   # ISO 6346 reference example
+    ("MSKU1234565", 5),
+    ("TCLU7654320", 0),
+    ("ABCU0000070", 0),   # Remainder 10 maps to 0
+])
+def test_iso6346_check_digit(number, digit):
+    assert iso6346_check_digit(number) == digit
+    assert container_number_error(number) is None
+
+
+@pytest.mark.parametrize("number, reason", [
+    ("CSQU3054384", "check digit 4 does not match, expected 3"),
+    ("CSQX3054383", "not in ISO 6346 format"),    # Category must be U, J, Z or R
+    ("CSQU305438", "not in ISO 6346 format"),     # Too short
+    ("CSQU30543833", "not in ISO 6346 format"),   # Too long
+    ("C5QU3054383", "not in ISO 6346 format"),
+    ("", "not in ISO 6346 format"),
+])
+def test_invalid_container_numbers(number, reason):
+    assert container_number_error(number).startswith(reason)
+
+
+@pytest.mark.parametrize("value, normalized", [
+    ("csqu3054383", "CSQU3054383"),
+    ("CSQU 305438-3", "CSQU3054383"),
+    (" CSQU.305438/3\t", "CSQU3054383"),
+])
+def test_normalize_container_number(value, normalized):
+    assert normalize_container_number(value) == normalized
+
+
+@pytest.mark.parametrize("value, error", [
+    ("CTG2358534", None),
+    ("ctg 2358534", None),
+    ("CTG235853", "not an FCR number"),
+    ("CTG23585340", "not an FCR number"),
+    ("CT12358534", "not an FCR number"),
+    ("CTG-2358534", "not an FCR number"),
+])
+def test_fcr_numbers(value, error):
+    reason = fcr_number_error(normalize_fcr_number(value))
+    if error is None:
+        assert reason is None
+    else:
+        assert reason.startswith(error)
+
+
+def test_duplicates_map_to_the_first_occurrence():
+    preflight = IdentifierPreflight('container', logger)
+    rows = [(2, "CSQU3054383"), (3, "MSKU1234565"), (4, "csqu 305438 3"), (5, "CSQU3054384"),
+            (6, "MSKU1234565"), (7, "CSQU3054383")]
+
+    assert list(preflight.filter(rows)) == ["CSQU3054383", "MSKU1234565"]
+    report = preflight.report()
+    assert report['unique'] == 2
+    assert report['duplicates'] == {"CSQU3054383": [2, 4, 7], "MSKU1234565": [3, 6]}
+    assert [(row['row'], row['value']) for row in report['invalid_rows']] == [(5, "CSQU3054384")]
+
+
+def test_validation_can_be_switched_off():
+    preflight = IdentifierPreflight('container', logger, validate=False)
+    assert list(preflight.filter([(2, "CSQU3054384"), (3, "csqu3054384")])) == ["CSQU3054384"]
+    assert preflight.report()['invalid_rows'] == []
+
+
+def test_fcr_preflight_skips_invalid_rows():
+    preflight = IdentifierPreflight('fcr', logger)
+    assert list(preflight.filter([(2, "CTG2358534"), (3, "bogus"), (4, "ctg2358534")])) == ["CTG2358534"]
+    assert preflight.report()['duplicates'] == {"CTG2358534": [2, 4]}
@@ -0,0 +1,74 @@
+import logging
+
+import pytest
+
+from input_reader import open_identifier_stream
+
+logger = logging.getLogger("test")
+
+COLUMNS = ['container_number', 'container']
+TERMS = ['container']
+
+
+def stream(path):
+    return list(open_identifier_stream(str(path), COLUMNS, TERMS, logger, with_rows=True))
+
+
+def test_bad_rows_are_skipped_with_their_row_number(tmp_path, caplog):
+    path = tmp_path / "containers.csv"
+    path.write_bytes(b"Container Number,Note\n"
+                     b"MSKU1234565,ok\n"
+                     b"CSQU30\xff\xfe4383,bad bytes\n"
+                     b"TCLU7654320,ok\n")
+    with caplog.at_level(logging.INFO):
+        assert stream(path) == [(2, "MSKU1234565"), (4, "TCLU7654320")]
+    assert "Row 3: skipped, could not be read (not valid UTF-8)" in caplog.text
+    assert "1 unreadable rows skipped" in caplog.text
+
+
+def test_undecodable_bytes_in_other_columns_do_not_matter(tmp_path):
+    path = tmp_path / "containers.csv"
+    path.write_bytes(b"Container Number,Note\nMSKU1234565,caf\xe9\n")
+    assert stream(path) == [(2, "MSKU1234565")]
+
+
+def test_malformed_csv_row_is_skipped(tmp_path, caplog):
+    path = tmp_path / "containers.csv"
+    path.write_text("Container Number\nMSKU1234565\n\"" + "x" * 200000 + "\"\nTCLU7654320\n")
+    assert stream(path) == [(2, "MSKU1234565"), (4, "TCLU7654320")]
+    assert "Row 3: skipped" in caplog.text
+
+
+def test_file_level_errors_fail_before_streaming(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        open_identifier_stream(str(tmp_path / "missing.csv"), COLUMNS, TERMS, logger)
+    with pytest.raises(ValueError):
+        open_identifier_stream(str(tmp_path / "containers.txt"), COLUMNS, TERMS, logger)
+
+
+def test_file_breaking_off_keeps_rows_read_so_far(tmp_path, monkeypatch, caplog):
+    import input_reader
+
+    def broken_csv(file_path):
+        def rows(column):
+            yield "MSKU1234565"
+            raise OSError("Input/output error")
+        return ["Container Number"], rows, lambda: None
+
+    monkeypatch.setattr(input_reader, "_open_csv", broken_csv)
+    assert stream(tmp_path / "containers.csv") == [(2, "MSKU1234565")]
+    assert "Could not read past row 2: Input/output error" in caplog.text
+
+
+def test_unreadable_first_row_fails_up_front(tmp_path, monkeypatch):
+    import input_reader
+
+    def broken_csv(file_path):
+        def rows(column):
+            raise OSError("Input/output error")
+            yield
+        return ["Container Number"], rows, lambda: None
+
+    monkeypatch.setattr(input_reader, "_open_csv", broken_csv)
+    with pytest.raises(OSError):
+        open_identifier_stream(str(tmp_path / "containers.csv"), COLUMNS, TERMS, logger)
@@ -0,0 +1,51 @@
+import logging
+import time
+
+import pytest
+
+from lookup_cache import LookupCache
+
+logger = logging.getLogger("test")
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "lookup_cache.sqlite3")
+
+
+def age(cache, identifier, seconds):
+    with cache.lock:
+        cache.conn.execute("UPDATE lookups SET fetched_at = ? WHERE identifier = ?",
+                           (time.time() - seconds, identifier))
+        cache.conn.commit()
+
+
+def test_short_ttl_run_leaves_entries_for_longer_ttl_runs(cache_path):
+    long_run = LookupCache(logger, path=cache_path, ttl=3600)
+    short_run = LookupCache(logger, path=cache_path, ttl=60)
+    long_run.put("ctg", "MSKU1234565", pdf=b"%PDF", status={'status': 'success'})
+    age(long_run, "MSKU1234565", 600)
+
+    # Too old for the short TTL: skipped on read, and kept through its writes
+    assert short_run.get("ctg", "MSKU1234565") is None
+    short_run.put("ctg", "TCLU7654320", pdf=b"%PDF")
+    assert long_run.get("ctg", "MSKU1234565")['pdf'] == b"%PDF"
+
+    age(long_run, "MSKU1234565", 7200)
+    assert long_run.get("ctg", "MSKU1234565") is None
+    long_run.close()
+    short_run.close()
+
+
+def test_size_limit_evicts_least_recently_used(cache_path):
+    cache = LookupCache(logger, path=cache_path, max_bytes=250)
+    cache.put("ctg", "first", pdf=b"1" * 100)
+    cache.put("ctg", "second", pdf=b"2" * 100)
+    time.sleep(0.01)
+    assert cache.get("ctg", "first") is not None
+
+    cache.put("ctg", "third", pdf=b"3" * 100)
+    assert cache.get("ctg", "second") is None
+    assert cache.get("ctg", "first")['pdf'] == b"1" * 100
+    assert cache.get("ctg", "third")['pdf'] == b"3" * 100
+    cache.close()
@@ -0,0 +1,58 @@
+import json
+import logging
+import time
+
+from page_readiness import PageReadiness
+
+logger = logging.getLogger("test")
+
+
+def event(method, request_id, **params):
+    return {"message": json.dumps({"message": {"method": method, "params": dict(params, requestId=request_id)}})}
+
+
+def started(request_id, kind="XHR", url="https://portal.test/api"):
+    return event("Network.requestWillBeSent", request_id, type=kind, request={"url": url})
+
+
+def finished(request_id):
+    return event("Network.loadingFinished", request_id, encodedDataLength=100)
+
+
+class FakeDriver:
+    """Returns queued performance-log batches and a page that is complete and quiet"""
+
+    def __init__(self, *batches):
+        self.batches = list(batches)
+
+    def get_log(self, kind):
+        return self.batches.pop(0) if self.batches else []
+
+    def execute_script(self, script, *args):
+        return {"quiet": 10.0, "changed": True, "complete": True, "found": False}
+
+
+def readiness(driver, **kwargs):
+    options = dict(max_wait=2, network_idle=0.05, dom_quiet=0.05, poll_interval=0.01)
+    options.update(kwargs)
+    return PageReadiness(driver, logger, **options)
+
+
+def test_long_poll_and_beacon_do_not_hold_readiness():
+    driver = FakeDriver([started("poll"), started("beacon", kind="Ping"), started("page")], [finished("page")])
+    started_at = time.monotonic()
+    assert readiness(driver).wait_until_ready(label="test")
+    assert time.monotonic() - started_at < 1
+
+
+def test_event_streams_are_not_tracked():
+    driver = FakeDriver([started("sse", kind="EventSource"), started("a"), started("b"), started("c")],
+                        [finished("c")])
+    page = readiness(driver)
+    assert page.wait_until_ready(label="test")
+    assert page.inflight == {"a", "b"}
+
+
+def test_busy_network_waits():
+    driver = FakeDriver([started("a"), started("b"), started("c")])
+    assert not readiness(driver, max_wait=0.3).wait_until_ready(label="test")
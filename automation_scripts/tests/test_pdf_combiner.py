@@ -0,0 +1,197 @@
+import logging
+import re
+import struct
+import sys
+import zlib
+
+import pytest
+
+from pdf_combiner import IncrementalPdfCombiner, parse_pdf_objects
+
+logger = logging.getLogger("test")
+
+
+@pytest.fixture(autouse=True)
+def without_pypdf(monkeypatch):
+    """The built-in parser has to cope on its own"""
+    monkeypatch.setitem(sys.modules, "pypdf", None)
+    monkeypatch.setitem(sys.modules, "PyPDF2", None)
+
+
+def document_objects(markers, nested=False):
+    """{number: (body, stream)} of a document with one page per marker, catalog is object 1"""
+    font = 3
+    objects = {
+        1: (b"<< /Type /Catalog /Pages 2 0 R >>", None),
+        font: (b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>", None)
+    }
+    next_number = 4
+    # Nested documents split their pages over two intermediate page tree nodes
+    groups = [markers[:1], markers[1:]] if nested else [markers]
+    tree_kids = []
+    for group in groups:
+        parent = 2
+        if nested:
+            parent = next_number
+            next_number += 1
+            tree_kids.append(parent)
+        kids = []
+        for marker in group:
+            page, content = next_number, next_number + 1
+            next_number += 2
+            objects[page] = (b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] "
+                             b"/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>"
+                             % (parent, font, content), None)
+            text = b"BT /F1 24 Tf 72 720 Td (%s) Tj ET" % marker.encode()
+            objects[content] = (b"<< /Length %d >>" % len(text), text)
+            kids.append(page)
+        if nested:
+            objects[parent] = (b"<< /Type /Pages /Parent 2 0 R /Kids [%s] /Count %d >>"
+                               % (b" ".join(b"%d 0 R" % kid for kid in kids), len(kids)), None)
+        else:
+            tree_kids = kids
+    objects[2] = (b"<< /Type /Pages /Kids [%s] /Count %d >>"
+                  % (b" ".join(b"%d 0 R" % kid for kid in tree_kids), len(markers)), None)
+    return objects
+
+
+def write_object(out, number, body, stream):
+    out.append(b"%d 0 obj\n%s" % (number, body))
+    if stream is not None:
+        out.append(b"\nstream\n%s\nendstream" % stream)
+    out.append(b"\nendobj\n")
+
+
+def build_pdf(path, markers, layout="classic", nested=False):
+    """
+    Write a PDF in one of three layouts: a classic xref table, an xref stream, or an
+    xref stream with every non-stream object packed into a compressed object stream
+    """
+    objects = document_objects(markers, nested)
+    size = max(objects) + 1
+    out = [b"%PDF-1.5\n"]
+    entries = {}
+
+    packed = {}
+    if layout == "object-stream":
+        packed = {number: body for number, (body, stream) in objects.items() if stream is None}
+    for number in sorted(objects):
+        if number not in packed:
+            entries[number] = (1, sum(map(len, out)), 0)
+            write_object(out, number, *objects[number])
+
+    if packed:
+        object_stream = size
+        size += 1
+        header = []
+        bodies = b""
+        for position, number in enumerate(sorted(packed)):
+            header.append(b"%d %d" % (number, len(bodies)))
+            bodies += packed[number] + b"\n"
+            entries[number] = (2, object_stream, position)
+        header = b" ".join(header) + b"\n"
+        data = zlib.compress(header + bodies)
+        entries[object_stream] = (1, sum(map(len, out)), 0)
+        write_object(out, object_stream, b"<< /Type /ObjStm /N %d /First %d /Filter /FlateDecode /Length %d >>"
+                     % (len(packed), len(header), len(data)), data)
+
+    if layout == "classic":
+        xref_offset = sum(map(len, out))
+        out.append(b"xref\n0 %d\n0000000000 65535 f \n" % size)
+        for number in range(1, size):
+            out.append(b"%010d 00000 n \n" % entries[number][1])
+        out.append(b"trailer\n<< /Size %d /Root 1 0 R >>\n" % size)
+    else:
+        xref_number = size
+        size += 1
+        xref_offset = sum(map(len, out))
+        entries[xref_number] = (1, xref_offset, 0)
+        rows = struct.pack(">BIH", 0, 0, 65535)
+        for number in range(1, size):
+            rows += struct.pack(">BIH", *entries[number])
+        data = zlib.compress(rows)
+        write_object(out, xref_number, b"<< /Type /XRef /Size %d /W [1 4 2] /Root 1 0 R /Filter /FlateDecode "
+                     b"/Length %d >>" % (size, len(data)), data)
+    out.append(b"startxref\n%d\n%%%%EOF\n" % xref_offset)
+
+    with open(path, "wb") as f:
+        f.write(b"".join(out))
+    return str(path)
+
+
+def page_markers(path):
+    """Markers of the combined file's pages in page tree order, checking /Count and the xref table"""
+    with open(path, "rb") as f:
+        data = f.read()
+    objects, trailer = parse_pdf_objects(data)
+
+    # Every xref entry in use points at its object
+    xref = data[data.rindex(b"xref\n"):]
+    for number, entry in enumerate(re.findall(rb"(\d{10}) \d{5} ([nf])", xref)):
+        if entry[1] == b"n":
+            assert data.startswith(b"%d 0 obj" % number, int(entry[0]))
+
+    def reference(body, key):
+        return int(re.search(rb"/%s\s+(\d+) 0 R" % key, body).group(1))
+
+    def walk(number):
+        body = objects[number][0]
+        if b"/Type /Pages" in body:
+            kids = [int(kid) for kid in re.findall(rb"(\d+) 0 R", re.search(rb"/Kids\s*\[([^\]]*)\]", body).group(1))]
+            markers = [marker for kid in kids for marker in walk(kid)]
+            assert int(re.search(rb"/Count\s+(\d+)", body).group(1)) == len(markers)
+            return markers
+        content = objects[reference(body, b"Contents")][1]
+        return [re.search(rb"\((.*?)\) Tj", content).group(1).decode()]
+
+    catalog = objects[int(re.search(rb"/Root\s+(\d+)", trailer).group(1))][0]
+    return walk(reference(catalog, b"Pages"))
+
+
+def test_combines_every_layout_in_input_order(tmp_path):
+    classic = build_pdf(tmp_path / "1.pdf", ["A1", "A2"])
+    packed = build_pdf(tmp_path / "3.pdf", ["C1", "C2", "C3"], layout="object-stream", nested=True)
+    xref_stream = build_pdf(tmp_path / "4.pdf", ["D1"], layout="xref-stream")
+
+    combiner = IncrementalPdfCombiner(str(tmp_path / "report.pdf"), logger)
+    # Worker pools finish out of order; item 2 failed
+    combiner.add(4, xref_stream)
+    combiner.add(3, packed)
+    combiner.add(1, classic)
+    combiner.add(2, None)
+    assert combiner.close() == 3
+
+    assert page_markers(tmp_path / "report.pdf") == ["A1", "A2", "C1", "C2", "C3", "D1"]
+
+
+def test_items_after_a_missing_one_are_written_on_close(tmp_path):
+    second = build_pdf(tmp_path / "2.pdf", ["B1"], layout="object-stream")
+    third = build_pdf(tmp_path / "3.pdf", ["C1", "C2"])
+
+    combiner = IncrementalPdfCombiner(str(tmp_path / "report.pdf"), logger)
+    combiner.add(3, third)
+    combiner.add(2, second)
+    assert combiner.close() == 2
+
+    assert page_markers(tmp_path / "report.pdf") == ["B1", "C1", "C2"]
+
+
+def test_unreadable_input_is_left_out(tmp_path):
+    first = build_pdf(tmp_path / "1.pdf", ["A1"])
+    broken = tmp_path / "2.pdf"
+    broken.write_bytes(b"%PDF-1.4\nnot a pdf\n")
+    third = build_pdf(tmp_path / "3.pdf", ["C1"], layout="xref-stream")
+
+    combiner = IncrementalPdfCombiner(str(tmp_path / "report.pdf"), logger)
+    for index, path in enumerate([first, str(broken), third], start=1):
+        combiner.add(index, path)
+    assert combiner.close() == 2
+
+    assert page_markers(tmp_path / "report.pdf") == ["A1", "C1"]
+
+
+def test_nothing_combined_leaves_no_file(tmp_path):
+    combiner = IncrementalPdfCombiner(str(tmp_path / "report.pdf"), logger)
+    combiner.add(1, None)
+    assert combiner.close() == 0
+    assert list(tmp_path.iterdir()) == []
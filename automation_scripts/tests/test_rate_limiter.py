@@ -0,0 +1,99 @@
+import json
+import logging
+import multiprocessing
+import time
+
+import pytest
+
+from rate_limiter import AdaptiveRateLimiter
+
+logger = logging.getLogger("test")
+
+
+@pytest.fixture
+def make_limiter(tmp_path):
+    def make(**kwargs):
+        options = dict(initial_interval=2.0, min_interval=0.25, max_interval=30.0, decrease_step=0.25,
+                       backoff_factor=2.0, slow_threshold=8.0, state_dir=str(tmp_path))
+        options.update(kwargs)
+        return AdaptiveRateLimiter("portal.test", logger, **options)
+    return make
+
+
+def record_successes(state_dir, count):
+    limiter = AdaptiveRateLimiter("portal.test", logger, initial_interval=30.0, state_dir=state_dir)
+    for _ in range(count):
+        limiter.record_success(0.1)
+
+
+def interval(limiter):
+    with open(limiter.state_path) as f:
+        return json.load(f)["interval"]
+
+
+def test_interval_shrinks_additively_on_fast_success(make_limiter):
+    limiter = make_limiter()
+    limiter.record_success(0.5)
+    assert interval(limiter) == pytest.approx(1.75)
+    limiter.record_success(0.5)
+    assert interval(limiter) == pytest.approx(1.5)
+
+
+def test_slow_success_keeps_the_interval(make_limiter):
+    limiter = make_limiter()
+    limiter.record_success(9.0)
+    assert interval(limiter) == pytest.approx(2.0)
+
+
+def test_interval_grows_multiplicatively_on_failure(make_limiter):
+    # Timeouts and error pages are both reported as failures
+    limiter = make_limiter()
+    limiter.record_failure()
+    assert interval(limiter) == pytest.approx(4.0)
+    limiter.record_failure()
+    assert interval(limiter) == pytest.approx(8.0)
+
+
+def test_interval_is_clamped(make_limiter):
+    limiter = make_limiter()
+    for _ in range(20):
+        limiter.record_success(0.1)
+    assert interval(limiter) == pytest.approx(0.25)
+    for _ in range(20):
+        limiter.record_failure()
+    assert interval(limiter) == pytest.approx(30.0)
+
+
+def test_instances_for_one_host_share_state(make_limiter):
+    # Stand-ins for two processes: separate objects, one state file
+    first = make_limiter(initial_interval=0.3)
+    second = make_limiter(initial_interval=0.3)
+    first.record_failure()
+    assert interval(second) == pytest.approx(0.6)
+    second.record_success(0.1)
+    assert interval(first) == pytest.approx(0.35)
+
+    # A slot reserved by one instance delays the other
+    first.acquire()
+    started = time.monotonic()
+    second.acquire()
+    assert time.monotonic() - started >= 0.3
+
+
+def test_concurrent_processes_do_not_lose_updates(make_limiter, tmp_path):
+    processes = [multiprocessing.Process(target=record_successes, args=(str(tmp_path), 25)) for _ in range(4)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(timeout=60)
+    # Every one of the 100 decreases went through the file lock
+    assert interval(make_limiter()) == pytest.approx(30.0 - 100 * 0.25)
+
+
+def test_state_is_forgotten_after_idle_ttl(make_limiter):
+    limiter = make_limiter(state_ttl=0)
+    limiter.record_failure()
+    time.sleep(0.01)
+    limiter.record_success(0.1)
+    # The doubled interval had expired, so the decrease starts from the initial one
+    assert interval(limiter) == pytest.approx(1.75)
@@ -0,0 +1,48 @@
+from fnmatch import fnmatchcase
+
+import pytest
+
+from resource_blocking import PROFILES, _globs_overlap, blocked_patterns
+
+
+def blocked(portal, url):
+    # Network.setBlockedURLs patterns only know "*", like fnmatchcase without "?" and "[...]"
+    return any(fnmatchcase(url, pattern) for pattern in blocked_patterns(portal))
+
+
+@pytest.mark.parametrize("portal, url", [
+    ('maersk', "https://www.maersk.com/mymaersk-scm-track/assets/icons/status-icon.svg"),
+    ('maersk', "https://www.maersk.com/mymaersk-scm-track/static/fonts/maersk-text.woff2"),
+    ('maersk', "https://www.maersk.com/mymaersk-scm-track/styles.css"),
+    ('maersk', "https://policy.app.cookieinformation.com/uc.js"),
+    ('ctg', "https://cpatos.gov.bd/pcs/images/logo.png"),
+    ('ctg', "https://cpatos.gov.bd/pcs/index.php"),
+])
+def test_portal_content_loads(portal, url):
+    assert not blocked(portal, url)
+
+
+@pytest.mark.parametrize("portal, url", [
+    ('maersk', "https://www.google-analytics.com/analytics.js"),
+    ('maersk', "https://www.googletagmanager.com/gtm.js?id=GTM-1"),
+    ('maersk', "https://i.ytimg.com/vi/abc/hqdefault.jpg"),
+    ('ctg', "https://fonts.gstatic.com/s/roboto/v30/roboto.woff2"),
+    ('ctg', "https://www.facebook.com/tr?id=1&ev=PageView"),
+])
+def test_third_party_requests_are_blocked(portal, url):
+    assert blocked(portal, url)
+
+
+def test_allowlisted_host_is_never_blocked(monkeypatch):
+    monkeypatch.setitem(PROFILES, 'maersk', dict(PROFILES['maersk'], block=["maersk.com", "vimeo.com"]))
+    patterns = blocked_patterns('maersk')
+    assert "*://maersk.com/*" not in patterns and "*://*.maersk.com/*" not in patterns
+    assert "*://*.vimeo.com/*" in patterns
+
+
+def test_globs_overlap():
+    assert _globs_overlap("*.maersk.com", "www.maersk.com")
+    assert _globs_overlap("*.damco.com", "*damco*")
+    assert _globs_overlap("*.google-analytics.com", "*damco*")
+    assert not _globs_overlap("*.google-analytics.com", "*.maersk.com")
+    assert not _globs_overlap("fonts.gstatic.com", "*.damco.com")
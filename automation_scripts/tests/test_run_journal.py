@@ -0,0 +1,64 @@
+import logging
+import os
+
+from run_journal import RunJournal
+
+logger = logging.getLogger("test")
+
+RECORDS = [{'container_number': 'MSKU1234565', 'event': 'Discharged', 'event_time': None}]
+
+
+def finished_run(tmp_path, pdf=True, records=True):
+    path = str(tmp_path / "journal.jsonl")
+    journal = RunJournal(path, logger)
+    result = {'container_number': 'MSKU1234565', 'status': 'success', 'timestamp': '2026-01-01T00:00:00'}
+    if pdf:
+        os.makedirs("results/pdfs", exist_ok=True)
+        open("results/pdfs/001_MSKU1234565_tracking.pdf", "wb").close()
+        result['pdf_file'] = "001_MSKU1234565_tracking.pdf"
+    if records:
+        journal.write_records('MSKU1234565', RECORDS)
+        result['records'] = len(RECORDS)
+    journal.write(1, result)
+    journal.write(2, {'container_number': 'TCLU7654320', 'status': 'error', 'error': 'boom'})
+    journal.close()
+    return path
+
+
+def test_data_only_run_resumes_with_records(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = finished_run(tmp_path, pdf=False)
+
+    completed = RunJournal.load_completed(path, 'container_number', logger, output='data')
+    assert list(completed) == ['MSKU1234565']
+
+    journal = RunJournal(path, logger)
+    assert journal.read_records(completed['MSKU1234565']['records_at']) == RECORDS
+    journal.close()
+
+
+def test_resume_needs_every_output_of_the_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = finished_run(tmp_path, records=False)
+
+    assert list(RunJournal.load_completed(path, 'container_number', logger, output='pdf')) == ['MSKU1234565']
+    # Records were not extracted in that run, so a data run has to look the item up again
+    assert RunJournal.load_completed(path, 'container_number', logger, output='both') == {}
+
+    os.remove("results/pdfs/001_MSKU1234565_tracking.pdf")
+    assert RunJournal.load_completed(path, 'container_number', logger, output='pdf') == {}
+
+
+def test_truncated_records_line_is_ignored(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = finished_run(tmp_path, pdf=False)
+    with open(RunJournal.records_path_for(path), "a") as f:
+        f.write('{"id": "CSQU3054383", "reco')
+
+    journal = RunJournal(path, logger)
+    journal.write_records('CSQU3054383', RECORDS)
+    journal.close()
+
+    completed = RunJournal.load_completed(path, 'container_number', logger, output='data')
+    assert list(completed) == ['MSKU1234565']
+    assert RunJournal._index_records(RunJournal.records_path_for(path)).keys() == {'MSKU1234565', 'CSQU3054383'}
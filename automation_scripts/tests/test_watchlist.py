@@ -0,0 +1,48 @@
+import json
+import logging
+from datetime import datetime
+
+import pytest
+
+from watchlist import Watchlist
+
+logger = logging.getLogger("test")
+
+GATE_IN = {'status': "Gate in", 'location': "CCT", 'vessel': None,
+           'event_time': datetime(2026, 1, 12, 9, 0), 'event_time_text': "12-01-2026 09:00"}
+DISCHARGED = {'status': "Discharged", 'location': "CCT", 'vessel': "NESNA",
+              'event_time': datetime(2026, 1, 13, 14, 35), 'event_time_text': "13-01-2026 14:35"}
+
+
+@pytest.fixture
+def watchlist(tmp_path):
+    watchlist = Watchlist(logger, str(tmp_path / "events.jsonl"), path=str(tmp_path / "watchlist.sqlite3"))
+    yield watchlist
+    watchlist.close()
+
+
+def events(watchlist):
+    with open(watchlist.events_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_change_is_only_stored_on_commit(watchlist):
+    first = watchlist.check("ctg", "MSKU1234565", [GATE_IN])
+    assert first['change'] == "new"
+    # Outputs were not written (e.g. the PDF failed), so the retry sees the same change
+    again = watchlist.check("ctg", "MSKU1234565", [GATE_IN])
+    assert again['change'] == "new"
+    assert events(watchlist) == []
+
+    watchlist.commit(again, [GATE_IN])
+    assert watchlist.check("ctg", "MSKU1234565", [GATE_IN]) is None
+    assert [event['change'] for event in events(watchlist)] == ["new"]
+
+
+def test_changed_snapshot_reports_added_events(watchlist):
+    watchlist.commit(watchlist.check("ctg", "MSKU1234565", [GATE_IN]), [GATE_IN])
+    event = watchlist.check("ctg", "MSKU1234565", [GATE_IN, DISCHARGED])
+    assert event['change'] == "changed"
+    assert (event['previous_status'], event['status']) == ("Gate in", "Discharged")
+    assert [added['status'] for added in event['added']] == ["Discharged"]
+    assert event['removed'] == []
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Tracking Data Extractor
+Parses portal result tables into typed tracking records (status, location, vessel,
+event time) and streams them to a columnar Parquet file, or JSON Lines when
+pyarrow is not installed
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+from ctg_http_engine import parse_tables
+
+# Header keywords per field, checked in this order so "Event Date" is a time, not a status
+FIELD_TERMS = [
+    ('event_time', ['date', 'time', 'eta', 'etd', 'ata', 'atd']),
+    ('vessel', ['vessel', 'ship', 'vsl']),
+    ('location', ['location', 'place', 'port', 'yard', 'terminal', 'berth', 'depot', 'city']),
+    ('status', ['status', 'event', 'activity', 'description', 'remarks', 'state'])
+]
+
+TIME_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d",
+    "%d-%m-%Y %H:%M:%S",
+    "%d-%m-%Y %H:%M",
+    "%d-%m-%Y",
+    "%d/%m/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M",
+    "%d/%m/%Y",
+    "%d-%b-%Y %H:%M",
+    "%d-%b-%Y",
+    "%d %b %Y %H:%M",
+    "%d %b %Y",
+    "%b %d, %Y %H:%M",
+    "%b %d, %Y"
+]
+
+RECORD_FIELDS = ['portal', 'identifier', 'table', 'row', 'status', 'location', 'vessel',
+                 'event_time', 'event_time_text', 'raw']
+
+
+def field_for_header(header):
+    """Return the record field a column header maps to, or None"""
+    header = str(header or "").lower().strip()
+    if not header:
+        return None
+    for field, terms in FIELD_TERMS:
+        if any(term in header for term in terms):
+            return field
+    return None
+
+
+def parse_event_time(text):
+    """Parse a portal date/time cell, returns a datetime or None"""
+    text = " ".join(str(text or "").split())
+    if not text:
+        return None
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def _make_record(portal, identifier, table, row, values):
+    record = {
+        'portal': portal,
+        'identifier': identifier,
+        'table': table,
+        'row': row,
+        'status': None,
+        'location': None,
+        'vessel': None,
+        'event_time': None,
+        'event_time_text': None,
+        'raw': json.dumps(values, ensure_ascii=False)
+    }
+    for header, value in values.items():
+        field = field_for_header(header)
+        if not field or not value:
+            continue
+        # The first matching column wins; the parsed time keeps its original text alongside
+        key = 'event_time_text' if field == 'event_time' else field
+        if record[key] is None:
+            record[key] = value
+            if field == 'event_time':
+                record['event_time'] = parse_event_time(value)
+    return record
+
+
+def extract_tracking_records(html, identifier, portal):
+    """
+    Return one record per data row of every tracking table in the page.
+    Tables with a header row give one record per row; two-column label/value
+    tables (e.g. "Vessel Name | MAERSK XYZ") give a single record.
+    """
+    records = []
+    for table_number, rows in enumerate(parse_tables(html), start=1):
+        rows = [row for row in rows if any(cell.strip() for cell in row)]
+        if not rows:
+            continue
+
+        pairs = [row for row in rows if len(row) == 2]
+        labelled = [row for row in pairs if field_for_header(row[0])]
+        if len(labelled) >= 2 and len(pairs) * 2 >= len(rows):
+            values = {row[0].strip().rstrip(":").strip(): row[1].strip() for row in pairs}
+            records.append(_make_record(portal, identifier, table_number, 1, values))
+            continue
+
+        header = [cell.strip() for cell in rows[0]]
+        if len(rows) < 2 or not any(field_for_header(cell) for cell in header):
+            continue
+        for row_number, row in enumerate(rows[1:], start=1):
+            values = {header[i] or f"column_{i + 1}": cell.strip()
+                      for i, cell in enumerate(row) if i < len(header)}
+            records.append(_make_record(portal, identifier, table_number, row_number, values))
+    return records
+
+
+def records_to_json(records):
+    """JSON-safe copy of records (datetimes as ISO strings), e.g. for the lookup cache"""
+    return [dict(r, event_time=r['event_time'].isoformat() if r['event_time'] else None) for r in records]
+
+
+def records_from_json(records):
+    """Inverse of records_to_json"""
+    return [dict(r, event_time=datetime.fromisoformat(r['event_time']) if r['event_time'] else None)
+            for r in records]
+
+
+class TrackingDataWriter:
+    """Appends records to one data file per run; safe to share between worker threads"""
+
+    def __init__(self, prefix, logger, batch_size=500):
+        self.logger = logger
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.record_count = 0
+
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self.pa = pa
+            self.schema = pa.schema([
+                ('portal', pa.string()),
+                ('identifier', pa.string()),
+                ('table', pa.int32()),
+                ('row', pa.int32()),
+                ('status', pa.string()),
+                ('location', pa.string()),
+                ('vessel', pa.string()),
+                ('event_time', pa.timestamp('s')),
+                ('event_time_text', pa.string()),
+                ('raw', pa.string())
+            ])
+            extension = "parquet"
+        except ImportError:
+            self.pa = None
+            extension = "jsonl"
+
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.path = os.path.join("results", f"{prefix}_{timestamp}.{extension}")
+        self.tmp_path = f"{self.path}.{os.getpid()}.part"
+        if self.pa:
+            self.writer = pq.ParquetWriter(self.tmp_path, self.schema)
+        else:
+            self.logger.warning("⚠️ pyarrow not installed, writing tracking data as JSON Lines")
+            self.writer = open(self.tmp_path, "w", encoding="utf-8")
+
+    @property
+    def filename(self):
+        return os.path.basename(self.path)
+
+    def write(self, records):
+        with self.lock:
+            self.buffer.extend(records)
+            self.record_count += len(records)
+            if len(self.buffer) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        if self.pa:
+            columns = {name: [r[name] for r in self.buffer] for name in RECORD_FIELDS}
+            self.writer.write_table(self.pa.Table.from_pydict(columns, schema=self.schema))
+        else:
+            for record in records_to_json(self.buffer):
+                self.writer.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self.writer.flush()
+        self.buffer = []
+
+    def close(self):
+        """Finish the data file, returns its filename or None when no records were written"""
+        with self.lock:
+            self._flush()
+            self.writer.close()
+            if self.record_count == 0:
+                os.remove(self.tmp_path)
+                return None
+            os.replace(self.tmp_path, self.path)
+            self.logger.info(f"💾 Tracking data saved: {self.filename} ({self.record_count} records)")
+            return self.filename
+
+    def discard(self):
+        """Drop the partial data file of a run that did not finish"""
+        with self.lock:
+            self.writer.close()
+            if os.path.exists(self.tmp_path):
+                os.remove(self.tmp_path)
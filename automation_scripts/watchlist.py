@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Watchlist Snapshot Store
+Keeps the last extracted tracking snapshot per (portal, identifier) in SQLite so
+re-polls only report, and re-render, identifiers whose tracking actually changed
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from tracking_extractor import records_to_json
+
+DEFAULT_WATCHLIST_PATH = os.path.join("cache", "watchlist.sqlite3")
+
+# Fields that make up a tracking event; raw cells (e.g. "page generated at") are ignored
+SNAPSHOT_FIELDS = ('status', 'location', 'vessel', 'event_time_text')
+
+
+def _event_key(record):
+    return tuple(record.get(field) or "" for field in SNAPSHOT_FIELDS)
+
+
+def snapshot_digest(records):
+    """Order-independent digest of the tracking events in a snapshot"""
+    keys = sorted(_event_key(record) for record in records)
+    return hashlib.sha256(json.dumps(keys, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def latest_status(records):
+    """Status of the most recent event, falling back to the first row that has one"""
+    timed = [r for r in records if r.get('status') and r.get('event_time')]
+    if timed:
+        return max(timed, key=lambda r: str(r['event_time']))['status']
+    for record in records:
+        if record.get('status'):
+            return record['status']
+    return None
+
+
+class Watchlist:
+    """Snapshot store plus an append-only JSONL file of change events; shared by all workers"""
+
+    def __init__(self, logger, events_path, path=DEFAULT_WATCHLIST_PATH):
+        self.logger = logger
+        self.events_path = events_path
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                portal TEXT NOT NULL,
+                identifier TEXT NOT NULL,
+                digest TEXT NOT NULL,
+                records TEXT NOT NULL,
+                changed_at REAL NOT NULL,
+                PRIMARY KEY (portal, identifier)
+            )
+        """)
+        self.conn.commit()
+
+        os.makedirs(os.path.dirname(events_path) or ".", exist_ok=True)
+        self.events = open(events_path, "a", encoding="utf-8")
+
+    def check(self, portal, identifier, records):
+        """
+        Compare records with the stored snapshot (one indexed read, no writes). Returns
+        the change as an event dict, or None when nothing changed. The snapshot is only
+        replaced by commit(), once the identifier's outputs are written, so a lookup
+        that fails after the check finds the same change again when it is retried.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT digest, records FROM snapshots WHERE portal = ? AND identifier = ?",
+                (portal, identifier)
+            ).fetchone()
+        if row and row[0] == snapshot_digest(records):
+            return None
+
+        previous = json.loads(row[1]) if row else []
+        previous_keys = {_event_key(r) for r in previous}
+        current_keys = {_event_key(r) for r in records}
+        return {
+            'portal': portal,
+            'identifier': identifier,
+            'change': 'changed' if row else 'new',
+            'previous_status': latest_status(previous),
+            'status': latest_status(records),
+            'added': [dict(zip(SNAPSHOT_FIELDS, key)) for key in sorted(current_keys - previous_keys)],
+            'removed': [dict(zip(SNAPSHOT_FIELDS, key)) for key in sorted(previous_keys - current_keys)],
+            'detected_at': datetime.now().isoformat()
+        }
+
+    def commit(self, event, records):
+        """Store the records a change from check() was found in and append the event to the JSONL file"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO snapshots (portal, identifier, digest, records, changed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (event['portal'], event['identifier'], snapshot_digest(records),
+                 json.dumps(records_to_json(records), ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+
+            self.events.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self.events.flush()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+            if not self.events.closed:
+                self.events.close()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Browser Worker Pool
+Runs lookups across several independent browser sessions that share one work queue
+"""
+
+import queue
+import threading
+
+
+class BrowserWorkerPool:
+    """Pool of warmed-up automation workers, each owning its own browser session"""
+
+    def __init__(self, worker_factory, size, logger):
+        self.worker_factory = worker_factory
+        self.size = max(1, int(size))
+        self.logger = logger
+        self.workers = []
+
+    def start(self):
+        """Create and warm up all workers in parallel, returns number of ready workers"""
+        self.logger.info(f"🧵 Starting {self.size} browser workers...")
+
+        ready = []
+        lock = threading.Lock()
+
+        def create(worker_id):
+            try:
+                worker = self.worker_factory(worker_id)
+            except Exception as e:
+                self.logger.error(f"❌ Worker {worker_id} failed to start: {str(e)}")
+                return
+            if worker is not None:
+                with lock:
+                    ready.append(worker)
+
+        threads = [threading.Thread(target=create, args=(worker_id,), daemon=True)
+                   for worker_id in range(1, self.size + 1)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.workers = ready
+        self.logger.info(f"✅ {len(self.workers)}/{self.size} browser workers ready")
+        return len(self.workers)
+
+    def run(self, items, handler):
+        """
+        Process (index, item) pairs with handler(worker, index, item).
+        Items may be a lazy iterator; it is consumed as workers free up.
+        Returns a list of (index, item, result) tuples ordered by index.
+        """
+        if not self.workers:
+            raise RuntimeError("No browser workers available")
+
+        tasks = queue.Queue(maxsize=len(self.workers) * 2)
+        results = []
+        results_lock = threading.Lock()
+
+        def work(worker):
+            while True:
+                task = tasks.get()
+                if task is None:
+                    break
+                index, item = task
+                try:
+                    result = handler(worker, index, item)
+                except Exception as e:
+                    self.logger.error(f"❌ Worker failed on item {index} ({item}): {str(e)}")
+                    result = None
+                with results_lock:
+                    results.append((index, item, result))
+
+        threads = [threading.Thread(target=work, args=(worker,), daemon=True) for worker in self.workers]
+        for thread in threads:
+            thread.start()
+
+        for index, item in items:
+            tasks.put((index, item))
+        for _ in threads:
+            tasks.put(None)
+
+        for thread in threads:
+            thread.join()
+
+        results.sort(key=lambda entry: entry[0])
+        return results
+
+    def close(self):
+        """Shut down every worker's browser"""
+        for worker in self.workers:
+            try:
+                worker.cleanup()
+            except Exception as e:
+                self.logger.error(f"❌ Error closing worker: {str(e)}")
+        self.workers = []
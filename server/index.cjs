@@ -176,6 +176,34 @@ app.post('/api/upload', upload.array('files', 10), (req, res) => {
 
 // ==================== AUTOMATION ROUTES ====================
 
+const { execFile } = require('child_process');
+
+// Jobs are run by the automation worker service (automation_scripts/automation_worker.py serve),
+// a fixed pool of warm workers sharing one Chrome daemon; the routes below only queue and poll them
+const workerScript = path.join(__dirname, '..', 'automation_scripts', 'automation_worker.py');
+
+// processId -> queued job ids (one per uploaded file); kept in memory, the jobs themselves are durable
+const automationJobs = new Map();
+
+// Run an automation_worker.py command and parse the JSON line it prints
+function runWorkerCommand(args) {
+  return new Promise((resolve, reject) => {
+    execFile('python3', [workerScript, ...args], { cwd: path.join(__dirname, '..') }, (error, stdout) => {
+      const output = (stdout || '').trim();
+      try {
+        const result = JSON.parse(output.split('\n').pop());
+        if (result.error) {
+          reject(new Error(result.error));
+        } else {
+          resolve(result);
+        }
+      } catch (parseError) {
+        reject(new Error(output || (error && error.message) || 'No output from automation worker'));
+      }
+    });
+  });
+}
+
 // Start automation process
 app.post('/api/automation/start', async (req, res) => {
   try {
@@ -211,10 +239,21 @@ app.post('/api/automation/start', async (req, res) => {
       });
     }
     
-    // For now, return success - actual automation would be implemented here
+    // Queue one job per uploaded file; a burst of requests waits for a free worker
+    // instead of starting one Chrome each
+    const workerParams = Object.entries(parameters || {})
+      .flatMap(([key, value]) => ['--param', `${key}=${JSON.stringify(value)}`]);
+    const jobIds = [];
+    for (const file of files) {
+      const job = await runWorkerCommand(['submit', serviceId, path.resolve('uploads', file.filename), ...workerParams]);
+      jobIds.push(job.job_id);
+    }
+    automationJobs.set(processId, jobIds);
+    console.log(`📥 Queued ${jobIds.length} automation jobs for process ${processId}`);
+    
     res.json({
       success: true,
-      message: 'Automation started successfully',
+      message: 'Automation queued successfully',
       processId: processId,
       status: 'running'
     });
@@ -228,21 +267,40 @@ app.post('/api/automation/start', async (req, res) => {
   }
 });
 
-// Get automation status
-app.get('/api/automation/status/:processId', (req, res) => {
-  // Mock status response - would be implemented with actual process tracking
-  res.json({
-    success: true,
-    status: 'completed',
-    progress: 100,
-    output: [
-      '🚀 Automation started successfully',
-      '📋 Processing files...',
-      '✅ Automation completed successfully'
-    ],
-    resultFiles: ['sample_report.pdf', 'automation_log.txt'],
-    endTime: new Date().toISOString()
-  });
+// Get automation status (from the worker service's job queue)
+app.get('/api/automation/status/:processId', async (req, res) => {
+  const jobIds = automationJobs.get(req.params.processId);
+  if (!jobIds) {
+    return res.status(404).json({
+      success: false,
+      message: 'Automation process not found'
+    });
+  }
+  
+  try {
+    const jobs = await Promise.all(jobIds.map(jobId => runWorkerCommand(['status', jobId])));
+    const finished = jobs.filter(job => job.status === 'completed' || job.status === 'failed');
+    let status = 'running';
+    if (finished.length === jobs.length) {
+      status = jobs.some(job => job.status === 'failed') ? 'failed' : 'completed';
+    }
+    const icons = { queued: '⏳', running: '🚀', completed: '✅', failed: '❌' };
+    
+    res.json({
+      success: true,
+      status: status,
+      progress: Math.round((finished.length / jobs.length) * 100),
+      output: jobs.map(job => `${icons[job.status] || '📋'} Job ${job.id}: ${job.status}${job.error ? ` (${job.error})` : ''}`),
+      resultFiles: [],
+      endTime: status === 'running' ? undefined : jobs.map(job => job.finished_at).sort().pop()
+    });
+  } catch (error) {
+    console.error('❌ Automation status error:', error);
+    res.status(500).json({
+      success: false,
+      message: 'Failed to get automation status: ' + error.message
+    });
+  }
 });
 
 // Stop automation process
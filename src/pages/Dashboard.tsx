@@ -481,7 +481,7 @@ export default function Dashboard() {
         filename = 'sample_cash_incentive_data.csv';
         break;
       case 'ctg-port-tracking':
-        csvContent = 'Container Number\nCTGU1234567\nCTGU2345678\nCTGU3456789\nCTGU4567890';
+        csvContent = 'Container Number\nCTGU1234562\nCTGU2345679\nCTGU3456785\nCTGU4567891';
         filename = 'sample_container_numbers.csv';
         break;
       default: